@@ -0,0 +1,99 @@
+# benchmarks/bench_fleet.py
+"""
+Measure the fleet client following many stand-in collectors on loopback:
+CPU time per second spent receiving and decoding, and the cost of a
+cross-host top-N selection.
+
+    python -m benchmarks.bench_fleet --hosts 100 --seconds 10
+"""
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from utils.fleet import FleetClient, FleetTop
+
+
+def start_standin_process(hosts, processes):
+    """Run the stand-ins in a child process so their CPU is not counted"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fleet_standin",
+         "--count", str(hosts), "--processes", str(processes)],
+        stdout=subprocess.PIPE, text=True)
+    endpoints = json.loads(process.stdout.readline())
+    return process, endpoints
+
+
+def run(hosts, processes, seconds):
+    standins, endpoints = start_standin_process(hosts, processes)
+    fleet = FleetClient(endpoints)
+    published = []
+    fleet.subscribe(published.append)
+    try:
+        fleet.start()
+        # Wait for every host to connect and deliver a full table
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            snapshot = fleet.snapshot()
+            if all(status.snapshot is not None and status.snapshot.process_columns is not None
+                   for status in snapshot.hosts):
+                break
+            time.sleep(0.2)
+
+        published.clear()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        time.sleep(seconds)
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+
+        snapshot = fleet.snapshot()
+        top = FleetTop()
+        start = time.perf_counter()
+        top.select(snapshot.hosts, "cpu", True, 50)
+        top_cold = time.perf_counter() - start
+        start = time.perf_counter()
+        top.select(snapshot.hosts, "cpu", True, 50)
+        top_cached = time.perf_counter() - start
+
+        return {
+            "hosts": hosts,
+            "processes_per_host": processes,
+            "connected": sum(status.connected for status in snapshot.hosts),
+            "threads": threading.active_count(),
+            "publishes_per_second": len(published) / wall,
+            "client_cpu_per_second": cpu / wall,
+            "top50_cold": top_cold,
+            "top50_cached": top_cached,
+        }
+    finally:
+        fleet.stop()
+        standins.terminate()
+        standins.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    result = run(args.hosts, args.processes, args.seconds)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"hosts connected:      {result['connected']}/{result['hosts']}")
+    print(f"client threads:       {result['threads']}")
+    print(f"publishes per second: {result['publishes_per_second']:.2f}")
+    print(f"client CPU:           {result['client_cpu_per_second'] * 100:.1f}% of one core")
+    print(f"top 50 across hosts:  {result['top50_cold'] * 1000:.1f} ms "
+          f"(cached {result['top50_cached'] * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_proc_reader.py
+"""
+Compare the batched /proc collector with the psutil.process_iter loop the
+Processes tab used to run, on a synthetic fake /proc tree.
+
+    python -m benchmarks.bench_proc_reader --sizes 1000 5000 20000
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+import psutil
+
+from benchmarks.fake_procfs import build_fake_procfs, remove_fake_procfs
+from utils.proc_reader import DEFAULT_FIELDS, ProcfsCollector
+from utils.process_table import ProcessTable
+from utils.system_utils import get_size
+
+
+def process_iter_loop():
+    """The collection loop from the original update_processes"""
+    processes = []
+    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info',
+                                      'status', 'create_time']):
+        try:
+            info = proc.info
+            memory = get_size(info['memory_info'].rss)
+            created = datetime.fromtimestamp(info['create_time']).strftime('%Y-%m-%d %H:%M:%S')
+            processes.append({
+                'pid': info['pid'],
+                'name': info['name'],
+                'cpu': info['cpu_percent'],
+                'memory': memory,
+                'memory_raw': info['memory_info'].rss,
+                'status': info['status'],
+                'created': created
+            })
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+    return processes
+
+
+def best_of(func, repeat):
+    """Run func once to warm up, then return the best of repeat timings"""
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes, repeat):
+    results = []
+    for size in sizes:
+        root = build_fake_procfs(size)
+        try:
+            collector = ProcfsCollector(procfs=root)
+            table = ProcessTable(collector)
+            result = {
+                "processes": size,
+                "procfs_collect": best_of(collector.collect, repeat),
+                "procfs_table_update": best_of(table.update, repeat),
+                # With the I/O rate columns shown
+                "procfs_collect_io": best_of(lambda: collector.collect(DEFAULT_FIELDS | {"io"}), repeat),
+            }
+
+            # psutil can only be pointed at a different procfs on Linux
+            if sys.platform.startswith("linux"):
+                original = psutil.PROCFS_PATH
+                psutil.PROCFS_PATH = root
+                try:
+                    result["psutil_process_iter"] = best_of(process_iter_loop, repeat)
+                finally:
+                    psutil.PROCFS_PATH = original
+            results.append(result)
+        finally:
+            remove_fake_procfs(root)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'processes':>10} {'process_iter':>14} {'procfs':>10} {'table':>10} {'speedup':>8} "
+          f"{'with io':>10}")
+    for r in results:
+        baseline = r.get("psutil_process_iter")
+        speedup = f"{baseline / r['procfs_table_update']:.1f}x" if baseline else "n/a"
+        baseline_text = f"{baseline * 1000:.1f}ms" if baseline else "n/a"
+        print(f"{r['processes']:>10} {baseline_text:>14} "
+              f"{r['procfs_collect'] * 1000:>8.1f}ms {r['procfs_table_update'] * 1000:>8.1f}ms "
+              f"{speedup:>8} {r['procfs_collect_io'] * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# benchmarks/fake_nvidia_smi.py
+"""
+Stand-in for nvidia-smi in query loop mode, for running GpuTelemetry
+without a GPU. Accepts the flags GpuTelemetry passes and prints one CSV
+line per fake GPU every --loop-ms, then exits after --blocks readings.
+
+    python benchmarks/fake_nvidia_smi.py --gpus 2 --blocks 3 --loop-ms=100
+
+Block b of GPU i reports a load of (10 * b + 7 * i) % 100 percent and
+1000 + 100 * b MiB of 8192 in use. GPUs listed in --unknown report
+"[N/A]" load and memory and an unsupported temperature.
+"""
+import argparse
+import time
+
+MEMORY_TOTAL = 8192
+
+
+def reading(block, index, unknown):
+    if index in unknown:
+        return f"{index}, Fake GPU {index}, [N/A], [N/A], {MEMORY_TOTAL}, [Not Supported]"
+    load = (10 * block + 7 * index) % 100
+    return f"{index}, Fake GPU {index}, {load}, {1000 + 100 * block}, {MEMORY_TOTAL}, {40 + block}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--query-gpu", default="")
+    parser.add_argument("--format", default="")
+    parser.add_argument("--loop-ms", type=int, default=1000)
+    parser.add_argument("--gpus", type=int, default=2)
+    parser.add_argument("--blocks", type=int, default=3)
+    parser.add_argument("--unknown", type=int, nargs="*", default=[], metavar="INDEX")
+    args = parser.parse_args()
+
+    for block in range(args.blocks):
+        if block:
+            time.sleep(args.loop_ms / 1000)
+        for index in range(args.gpus):
+            print(reading(block, index, args.unknown), flush=True)
+
+
+if __name__ == "__main__":
+    main()
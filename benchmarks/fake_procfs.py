@@ -0,0 +1,62 @@
+# benchmarks/fake_procfs.py
+import os
+import random
+import shutil
+import tempfile
+
+BOOT_TIME = 1700000000
+NAMES = ["python3", "bash", "sshd", "postgres", "nginx", "java",
+         "systemd-journald", "node", "chrome", "kworker/0:1"]
+
+
+def stat_line(pid, ppid, name, state, utime, stime, starttime, rss_pages):
+    """Build a /proc/<pid>/stat line with the kernel's 52 fields"""
+    fields = [
+        str(pid), f"({name})", state, str(ppid), str(pid), str(pid), "0", "-1",
+        "4194304", "100", "0", "0", "0", str(utime), str(stime), "0", "0",
+        "20", "0", "1", "0", str(starttime), str(rss_pages * 4096 * 4),
+        str(rss_pages),
+    ]
+    fields += ["0"] * (52 - len(fields))
+    return " ".join(fields) + "\n"
+
+
+def io_text(read_bytes, write_bytes, syscalls):
+    """Build /proc/<pid>/io; rchar and wchar include everything read or written"""
+    return (f"rchar: {read_bytes * 2}\nwchar: {write_bytes * 2}\nsyscr: {syscalls // 2}\n"
+            f"syscw: {syscalls - syscalls // 2}\nread_bytes: {read_bytes}\n"
+            f"write_bytes: {write_bytes}\ncancelled_write_bytes: 0\n")
+
+
+def build_fake_procfs(count, root=None, seed=0):
+    """
+    Create a deterministic fake /proc tree with count processes and return
+    its path. Each process has stat, statm, io and cmdline files.
+    """
+    rng = random.Random(seed)
+    root = root or tempfile.mkdtemp(prefix="fake-procfs-")
+
+    with open(os.path.join(root, "stat"), "w") as f:
+        f.write("cpu  100 0 100 1000 0 0 0 0 0 0\n")
+        f.write(f"btime {BOOT_TIME}\n")
+
+    for pid in range(1, count + 1):
+        name = rng.choice(NAMES)
+        rss_pages = rng.randint(100, 200000)
+        directory = os.path.join(root, str(pid))
+        os.mkdir(directory)
+        with open(os.path.join(directory, "stat"), "w") as f:
+            f.write(stat_line(pid, max(1, pid // 2), name, rng.choice("RSSSSDI"),
+                              rng.randint(0, 100000), rng.randint(0, 50000),
+                              rng.randint(0, 10000000), rss_pages))
+        with open(os.path.join(directory, "statm"), "w") as f:
+            f.write(f"{rss_pages * 4} {rss_pages} 100 10 0 {rss_pages} 0\n")
+        with open(os.path.join(directory, "io"), "w") as f:
+            f.write(io_text(rng.randint(0, 1 << 30), rng.randint(0, 1 << 28), rng.randint(0, 100000)))
+        with open(os.path.join(directory, "cmdline"), "w") as f:
+            f.write(f"/usr/bin/{name}\0--worker\0{pid}\0")
+    return root
+
+
+def remove_fake_procfs(root):
+    shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,154 @@
+# benchmarks/fixtures.py
+"""
+Deterministic in-memory stand-ins for what the collectors read from the
+system: process tables, network counters, sensors and GPUs. Every fixture
+takes a seed, so two runs see exactly the same data.
+"""
+import random
+from collections import namedtuple
+
+from utils.gpu_telemetry import GpuSample
+from utils.proc_reader import ProcessRecord
+
+NAMES = ["python3", "bash", "sshd", "postgres", "nginx", "java", "node", "chrome",
+         "redis-server", "systemd-journald", "kworker/0:1", "containerd-shim"]
+USERS = ["root", "postgres", "www-data", "alice", "bob"]
+STATUSES = ["running", "sleeping", "sleeping", "sleeping", "idle", "disk-sleep"]
+BOOT_TIME = 1700000000.0
+
+VirtualMemory = namedtuple("svmem", ["total", "available", "percent", "used", "free"])
+NetIO = namedtuple("snetio", ["bytes_sent", "bytes_recv", "packets_sent", "packets_recv",
+                              "errin", "errout", "dropin", "dropout"])
+DiskUsage = namedtuple("sdiskusage", ["total", "used", "free", "percent"])
+Battery = namedtuple("sbattery", ["percent", "secsleft", "power_plugged"])
+Temperature = namedtuple("shwtemp", ["label", "current", "high", "critical"])
+
+
+class FakeCollector:
+    """
+    Process collector with the ProcfsCollector interface over a synthetic
+    table of count processes. Every collect() is one tick: a churn fraction
+    of processes use CPU or change memory and status, and one in a hundred
+    exit and are replaced, their children moving to PID 1. Parents are any
+    older process, or with parent_span one of the parent_span PIDs just
+    before, which makes very deep trees.
+    """
+
+    def __init__(self, count, seed=0, churn=0.1, parent_span=None):
+        self.rng = random.Random(seed)
+        self.churn = churn
+        self.parent_span = parent_span
+        self.next_pid = 1
+        self.records = {}
+        self.static = {}
+        for _ in range(count):
+            self.spawn()
+
+    def spawn(self):
+        rng = self.rng
+        pid = self.next_pid
+        self.next_pid += 1
+        name = rng.choice(NAMES)
+        if self.parent_span:
+            ppid = pid - rng.randint(1, self.parent_span)
+        else:
+            ppid = rng.randrange(pid)
+        self.records[pid] = ProcessRecord(
+            pid=pid,
+            name=name,
+            create_time=BOOT_TIME + pid,
+            cpu_time=rng.uniform(0, 1000),
+            memory_raw=rng.randint(1, 2000) * 1024 * 1024,
+            status=rng.choice(STATUSES),
+            ppid=ppid if ppid in self.records else (1 if pid > 1 else 0),
+        )
+        self.static[pid] = (f"/usr/bin/{name}", f"/usr/bin/{name} --worker {pid}", rng.choice(USERS))
+        return pid
+
+    def tick(self):
+        rng = self.rng
+        records = self.records
+        # PID 1 never exits, as on a real system
+        exiting = [pid for pid in rng.sample(list(records), len(records) // 100) if pid != 1]
+        for pid in exiting:
+            del records[pid]
+            del self.static[pid]
+        if exiting:
+            orphaned = set(exiting)
+            adopter = 1 if 1 in records else 0
+            for pid, record in records.items():
+                if record.ppid in orphaned:
+                    records[pid] = record._replace(ppid=adopter)
+        for _ in exiting:
+            self.spawn()
+        for pid in rng.sample(list(records), int(len(records) * self.churn)):
+            record = records[pid]
+            used = rng.expovariate(5.0)
+            # I/O follows CPU use, so the random sequence stays as it was
+            records[pid] = record._replace(
+                cpu_time=record.cpu_time + used,
+                memory_raw=max(4096, record.memory_raw + rng.randint(-64, 64) * 4096),
+                status=rng.choice(STATUSES),
+                read_bytes=record.read_bytes + int(used * 64 * 1024 * 1024),
+                write_bytes=record.write_bytes + int(used * 16 * 1024 * 1024) * (pid % 3),
+                syscalls=record.syscalls + int(used * 100000),
+            )
+
+    def collect(self, fields=None):
+        self.tick()
+        return dict(self.records)
+
+    def read_name(self, pid, name):
+        return name
+
+    def read_exe(self, pid):
+        return self.static.get(pid, ("", "", ""))[0]
+
+    def read_cmdline(self, pid):
+        return self.static.get(pid, ("", "", ""))[1]
+
+    def read_username(self, pid):
+        return self.static.get(pid, ("", "", ""))[2]
+
+
+class FakeNetCounters:
+    """Callable standing in for psutil.net_io_counters, growing every call"""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.sent = 0
+        self.recv = 0
+
+    def __call__(self, pernic=False, nowrap=True):
+        self.sent += self.rng.randint(0, 5_000_000)
+        self.recv += self.rng.randint(0, 20_000_000)
+        return NetIO(self.sent, self.recv, self.sent // 1500, self.recv // 1500, 0, 0, 0, 0)
+
+
+def fake_sensors(seed=0):
+    """Return (sensors_temperatures result, sensors_battery result)"""
+    rng = random.Random(seed)
+    temperatures = {"coretemp": [Temperature("Package id 0", rng.uniform(40, 80), 90.0, 100.0)]}
+    return temperatures, Battery(rng.uniform(10, 100), 3600, rng.random() > 0.5)
+
+
+def fake_gpus(count=2, seed=0):
+    """A tuple of GpuSample like the nvidia-smi reader publishes"""
+    rng = random.Random(seed)
+    gpus = []
+    for index in range(count):
+        used = rng.uniform(500, 20000)
+        gpus.append(GpuSample(index, f"Fake GPU {index}", rng.random(), used / 24576,
+                              used, 24576.0, rng.uniform(30, 85)))
+    return tuple(gpus)
+
+
+def fake_host(seed=0):
+    """Host-wide readings for a Snapshot: memory, disk, temperature, battery"""
+    rng = random.Random(seed)
+    total = 64 * 1024 ** 3
+    used = total * rng.uniform(0.2, 0.9)
+    memory = VirtualMemory(total, total - used, round(used / total * 100, 1), used, total - used)
+    disk = DiskUsage(1024 ** 4, 400 * 1024 ** 3, 624 * 1024 ** 3, 39.1)
+    temperatures, battery = fake_sensors(seed)
+    return memory, disk, temperatures["coretemp"][0].current, battery
@@ -0,0 +1,197 @@
+# benchmarks/fleet_standin.py
+"""
+Run stand-in collectors on loopback that publish synthetic snapshots, for
+testing fleet mode without a fleet.
+
+    python -m benchmarks.fleet_standin --count 100 --processes 300
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from utils.collector_server import CollectorServer
+from utils.metric_history import MetricHistory
+from utils.process_columns import ColumnTable
+from utils.process_table import ProcessDelta, ProcessInfo
+from utils.sampling import Snapshot
+
+VirtualMemory = namedtuple("svmem", ["total", "available", "percent", "used", "free"])
+NetIO = namedtuple("snetio", ["bytes_sent", "bytes_recv", "packets_sent", "packets_recv"])
+DiskUsage = namedtuple("sdiskusage", ["total", "used", "free", "percent"])
+
+NAMES = ["python3", "bash", "sshd", "postgres", "nginx", "java", "node", "redis-server"]
+MEMORY_TOTAL = 16 * 1024 ** 3
+
+
+class StandInEngine:
+    """
+    Enough of the SamplingEngine interface for CollectorServer, publishing
+    a deterministic synthetic host. A fraction of the processes changes on
+    every tick and a few start and exit.
+    """
+
+    def __init__(self, process_count=300, seed=0, churn=0.1, interval=1.0):
+        self.rng = random.Random(seed)
+        self.interval = interval
+        self.churn = churn
+        self.store = None
+        self.latest = None
+        self.history = MetricHistory(capacity=60)
+        self.collect_process_data = False
+        self.next_pid = 1
+        self.processes = {}
+        self.columns = ColumnTable()
+        self.bytes_sent = 0
+        self.bytes_recv = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+        for _ in range(process_count):
+            self.spawn()
+        self.columns.update(list(self.processes.values()))
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def set_collect_processes(self, enabled):
+        self.collect_process_data = enabled
+
+    def set_process_io(self, enabled):
+        pass
+
+    def pin_processes(self, pinned):
+        pass
+
+    def request_sample(self):
+        pass
+
+    def spawn(self):
+        pid = self.next_pid
+        self.next_pid += 1
+        name = self.rng.choice(NAMES)
+        self.processes[pid] = ProcessInfo(
+            pid=pid, name=name, exe=f"/usr/bin/{name}", cmdline=f"{name} --worker {pid}",
+            username="svc", create_time=1700000000.0 + pid, created="2023-11-14 22:13:20",
+            cpu=0.0, memory_raw=self.rng.randint(1, 512) * 1024 * 1024, status="sleeping",
+            ppid=1, read_rate=0.0, write_rate=0.0, syscall_rate=0.0)
+        return pid
+
+    def tick(self):
+        rng = self.rng
+        added = set()
+        removed = set()
+        changed = set()
+
+        pids = list(self.processes)
+        for pid in rng.sample(pids, max(1, len(pids) // 100)):
+            del self.processes[pid]
+            removed.add(pid)
+        for _ in range(len(removed)):
+            added.add(self.spawn())
+        for pid in rng.sample(list(self.processes), int(len(self.processes) * self.churn)):
+            if pid in added:
+                continue
+            self.processes[pid] = self.processes[pid]._replace(
+                cpu=round(rng.expovariate(0.2), 1), status=rng.choice(["running", "sleeping"]))
+            changed.add(pid)
+        self.columns.update([self.processes[pid] for pid in added | changed], removed)
+
+        cpu = min(100.0, rng.gauss(35, 15) if rng.random() > 0.05 else 95.0)
+        used = MEMORY_TOTAL * rng.uniform(0.3, 0.7)
+        self.bytes_sent += rng.randint(0, 2_000_000)
+        self.bytes_recv += rng.randint(0, 8_000_000)
+
+        collecting = self.collect_process_data
+        snapshot = Snapshot(
+            timestamp=time.time(),
+            interval=self.interval,
+            cpu_percent=round(max(cpu, 0.0), 1),
+            memory=VirtualMemory(MEMORY_TOTAL, MEMORY_TOTAL - used, round(used / MEMORY_TOTAL * 100, 1),
+                                 used, MEMORY_TOTAL - used),
+            net_io=NetIO(self.bytes_sent, self.bytes_recv, 0, 0),
+            net_sent_speed=rng.uniform(0, 2),
+            net_recv_speed=rng.uniform(0, 8),
+            disk=DiskUsage(500 * 1024 ** 3, 200 * 1024 ** 3, 300 * 1024 ** 3, 40.0),
+            temperature=None,
+            battery=None,
+            processes=MappingProxyType(dict(self.processes)) if collecting else None,
+            process_changes=ProcessDelta(frozenset(added), frozenset(removed), frozenset(changed))
+            if collecting else None,
+            gpus=(),
+            process_columns=self.columns.snapshot() if collecting else None,
+        )
+        self.latest = snapshot
+        self.history.record(snapshot)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(snapshot)
+
+
+def start_standins(count, processes=300, host="127.0.0.1", port=0, interval=1.0):
+    """
+    Start count stand-in collectors on consecutive ports (or free ports
+    with port 0) and one thread ticking them all. Returns (servers, stop).
+    """
+    engines = []
+    servers = []
+    for index in range(count):
+        engine = StandInEngine(processes, seed=index, interval=interval)
+        server = CollectorServer(engine, listen=(host, port + index if port else 0))
+        server.start()
+        engines.append(engine)
+        servers.append(server)
+
+    stopped = threading.Event()
+
+    def ticker():
+        next_time = time.monotonic()
+        while not stopped.is_set():
+            for engine in engines:
+                engine.tick()
+            next_time += interval
+            stopped.wait(max(0.0, next_time - time.monotonic()))
+
+    threading.Thread(target=ticker, daemon=True).start()
+
+    def stop():
+        stopped.set()
+        for server in servers:
+            server.stop()
+
+    return servers, stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=300)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="first port; 0 picks free ports")
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    servers, stop = start_standins(args.count, args.processes, args.host, args.port, args.interval)
+    # One JSON line with the endpoints, for scripts that start us
+    print(json.dumps([f"{host}:{port}" for server in servers
+                      for host, port in server.addresses[:1]]), flush=True)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# benchmarks/suite.py
+"""
+Time the collection and rendering paths on deterministic synthetic data and
+compare the results with a stored baseline. Needs no display: charts are
+drawn on matplotlib's Agg canvas and no Tk window is created.
+
+    python -m benchmarks.suite                      # run and compare
+    python -m benchmarks.suite --save-baseline      # record a new baseline
+    python -m benchmarks.suite --sizes 100 1000 --output results.json
+
+Exits with status 1 when a benchmark is slower than the baseline by more
+than --tolerance. Baselines are specific to the machine they were recorded
+on; record one per CI runner.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from benchmarks.bench_proc_reader import best_of
+from benchmarks.fixtures import FakeCollector, FakeNetCounters, fake_gpus, fake_host, fake_sensors
+from utils.proc_reader import DEFAULT_FIELDS
+from utils.process_search import ProcessSearchIndex, parse_query
+from utils.process_table import ProcessTable
+from utils.process_tree import ProcessTree
+from utils.sampling import SamplingEngine, Snapshot
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+DISPLAY_LIMIT = 25
+DEEP_TREE_SIZE = 20000
+
+
+class ReplayCollector:
+    """Hand out pre-generated ticks, so timings exclude building the fixture"""
+
+    def __init__(self, source, ticks):
+        self.source = source
+        self.ticks = [source.collect() for _ in range(ticks)]
+        self.index = 0
+
+    def collect(self, fields=None):
+        records = self.ticks[self.index % len(self.ticks)]
+        self.index += 1
+        return records
+
+    def __getattr__(self, name):
+        # read_name, read_exe, ... come from the fixture
+        return getattr(self.source, name)
+
+
+class Ticks:
+    """Call func with successive items, one per call, cycling at the end"""
+
+    def __init__(self, func, items):
+        self.func = func
+        self.items = items
+        self.index = 0
+
+    def __call__(self):
+        item = self.items[self.index % len(self.items)]
+        self.index += 1
+        return self.func(item)
+
+
+@contextlib.contextmanager
+def patched(module, name, value):
+    original = getattr(module, name)
+    setattr(module, name, value)
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+
+def per_call(func, calls):
+    """Wrap func so one timing covers calls calls; divide the result back"""
+    def run():
+        for _ in range(calls):
+            func()
+    return run
+
+
+def records_bytes(processes, shared=None):
+    """
+    Bytes of a pid -> ProcessInfo mapping: the dict, every record and the
+    values it refers to, each object counted once. Objects also held by
+    shared, an earlier mapping, are left out.
+    """
+    seen = set()
+    for info in (shared or {}).values():
+        seen.add(id(info))
+        seen.update(id(value) for value in info)
+    total = sys.getsizeof(processes)
+    for info in processes.values():
+        if id(info) in seen:
+            continue
+        seen.add(id(info))
+        total += sys.getsizeof(info)
+        for value in info:
+            if id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+    return total
+
+
+def table_states(size, ticks, parent_span=None):
+    """
+    Successive (processes, process columns) of a FakeCollector as the
+    engine publishes them
+    """
+    table = ProcessTable(ReplayCollector(FakeCollector(size, seed=size, parent_span=parent_span), ticks))
+    states = []
+    for _ in range(ticks):
+        table.update(elapsed=1.0)
+        states.append((dict(table.processes), table.columns.snapshot()))
+    return states
+
+
+def bench_processes(size, repeat):
+    ticks = repeat + 2
+    results = {}
+
+    # Collection into the incremental table, as SamplingEngine does per tick
+    table = ProcessTable(ReplayCollector(FakeCollector(size, seed=size), ticks))
+    table.update(elapsed=1.0)
+    results[f"processes.table_update[{size}]"] = best_of(lambda: table.update(elapsed=1.0), repeat)
+    results[f"processes.columns_snapshot[{size}]"] = best_of(table.columns.snapshot, repeat)
+
+    # The same with the I/O rate columns shown
+    table = ProcessTable(ReplayCollector(FakeCollector(size, seed=size), ticks), DEFAULT_FIELDS | {"io"})
+    table.update(elapsed=1.0)
+    results[f"processes.table_update_io[{size}]"] = best_of(lambda: table.update(elapsed=1.0), repeat)
+
+    states = table_states(size, ticks)
+    # Memory, not times. A published snapshot holds the ProcessInfo
+    # mapping as well as the columns; kept snapshots share unchanged
+    # records, so each further tick adds the dict and the changed records.
+    # Fleet hosts and the metric store keep only the columns.
+    (previous, _), (processes, columns) = states[-2:]
+    results[f"processes.snapshot_bytes[{size}]"] = records_bytes(processes) + columns.nbytes
+    results[f"processes.snapshot_tick_bytes[{size}]"] = \
+        records_bytes(processes, shared=previous) + columns.nbytes
+    results[f"processes.columns_bytes[{size}]"] = columns.nbytes
+
+    # Sorting and limiting as in ProcessManagerFrame.update_processes
+    def sort_and_limit(state):
+        processes, columns = state
+        order = columns.order("cpu", True, DISPLAY_LIMIT)
+        return [processes[pid] for pid in columns.pid[order].tolist()]
+
+    results[f"processes.sort_limit[{size}]"] = best_of(Ticks(sort_and_limit, states), repeat)
+
+    # Searching as in filter_processes/apply_search, then limiting
+    index = ProcessSearchIndex()
+    terms = parse_query("py user:ro")
+
+    def search(state):
+        processes, columns = state
+        index.update(processes)
+        rows = columns.rows_for_pids(index.search(terms))
+        order = columns.order("cpu", True, DISPLAY_LIMIT, rows)
+        return [processes[pid] for pid in columns.pid[order].tolist()]
+
+    results[f"processes.filter[{size}]"] = best_of(Ticks(search, states), repeat)
+
+    # Tree mode: rollups kept up to date per tick, then the rows shown
+    results.update(bench_tree(f"{size}", states, repeat))
+    return results
+
+
+def bench_tree(label, states, repeat):
+    tree = ProcessTree()
+    return {
+        f"processes.tree_update[{label}]": best_of(Ticks(lambda state: tree.update(state[0]), states), repeat),
+        f"processes.tree_rows[{label}]": best_of(
+            lambda: tree.rows("cpu", True, limit=DISPLAY_LIMIT), repeat),
+    }
+
+
+def bench_host(repeat, calls=2000):
+    import utils.sampling as sampling
+
+    engine = SamplingEngine()
+    temperatures, battery = fake_sensors()
+    results = {}
+    with patched(sampling.psutil, "net_io_counters", FakeNetCounters()):
+        engine.collect_network(1.0)
+        results["host.network_rate"] = best_of(
+            per_call(lambda: engine.collect_network(1.0), calls), repeat) / calls
+    with patched(sampling.psutil, "sensors_temperatures", lambda: temperatures), \
+            patched(sampling.psutil, "sensors_battery", lambda: battery):
+        results["host.sensors"] = best_of(
+            per_call(lambda: (engine.collect_temperature(), engine.collect_battery()), calls),
+            repeat) / calls
+    return results
+
+
+def chart_snapshots(count):
+    snapshots = []
+    net = FakeNetCounters()
+    for i in range(count):
+        memory, disk, temperature, battery = fake_host(seed=i)
+        net_io = net()
+        snapshots.append(Snapshot(
+            timestamp=1700000000.0 + i, interval=1.0, cpu_percent=(i * 37) % 100,
+            memory=memory, net_io=net_io, net_sent_speed=(i * 13) % 50 / 10,
+            net_recv_speed=(i * 29) % 80 / 10, disk=disk, temperature=temperature,
+            battery=battery, processes=None, process_changes=None, gpus=fake_gpus(2, seed=i),
+            process_columns=None,
+        ))
+    return snapshots
+
+
+def bench_charts(repeat, updates=20):
+    # Imported here: the module pulls in customtkinter, which is not
+    # needed by the other benchmarks
+    from components.performance import PerformanceCharts
+
+    snapshots = chart_snapshots(updates * 2)
+    results = {}
+    for blit in (True, False):
+        fig = Figure(figsize=(12, 8))
+        canvas = FigureCanvasAgg(fig)
+        charts = PerformanceCharts(fig, canvas, 50, blit=blit)
+        canvas.draw()
+        for snapshot in snapshots[:updates]:
+            charts.update(snapshot)
+        name = "charts.update_blit" if blit else "charts.update_full"
+        results[name] = best_of(per_call(Ticks(charts.update, snapshots), updates), repeat) / updates
+    return results
+
+
+def run(sizes, repeat, groups):
+    results = {}
+    if "processes" in groups:
+        for size in sizes:
+            results.update(bench_processes(size, repeat))
+        # Chains hundreds of processes deep
+        states = table_states(DEEP_TREE_SIZE, repeat + 2, parent_span=3)
+        results.update(bench_tree(f"deep {DEEP_TREE_SIZE}", states, repeat))
+    if "host" in groups:
+        results.update(bench_host(repeat))
+    if "charts" in groups:
+        results.update(bench_charts(repeat))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": time.time(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return [(name, baseline, current, ratio, regressed)] for shared names"""
+    rows = []
+    for name, current in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None or previous <= 0:
+            continue
+        ratio = current / previous
+        rows.append((name, previous, current, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def format_result(name, value):
+    if "bytes" in name:
+        return f"{value / 1024:.1f} KiB"
+    return format_seconds(value)
+
+
+def format_seconds(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--groups", nargs="+", default=["processes", "host", "charts"],
+                        choices=["processes", "host", "charts"])
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to --baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="allowed slowdown before a result counts as a regression")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.groups)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline with {len(results['results'])} results written to {args.baseline}")
+        return
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if baseline is None:
+        for name, seconds in results["results"].items():
+            print(f"{name:<36} {format_result(name, seconds):>12}")
+        return
+
+    rows = compare(results, baseline, args.tolerance)
+    compared = {row[0] for row in rows}
+    print(f"{'benchmark':<36} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, previous, current, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<36} {format_result(name, previous):>12} {format_result(name, current):>12} "
+              f"{ratio:>6.2f}x{flag}")
+    for name, seconds in results["results"].items():
+        if name not in compared:
+            print(f"{name:<36} {'-':>12} {format_result(name, seconds):>12}      new")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
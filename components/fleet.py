@@ -0,0 +1,161 @@
+# components/fleet.py
+import time
+
+import customtkinter as ctk
+from utils.fleet import FleetTop, is_stale
+from utils.system_utils import get_size
+
+class FleetFrame(ctk.CTkFrame):
+    def __init__(self, master, fleet, pump):
+        super().__init__(master)
+
+        self.fleet = fleet
+        self.pump = pump
+        self.snapshot = None
+        self.top = FleetTop()
+        self.sort_by = "cpu"
+        self.sort_reverse = True
+        self.top_limit = 25
+        self.active = True
+
+        self.host_columns = [
+            ("Host", 220), ("State", 110), ("CPU %", 80), ("Memory %", 90),
+            ("Download", 110), ("Upload", 110), ("Processes", 90),
+        ]
+        self.process_columns = [
+            ("Host", 220), ("PID", 80), ("Name", 220), ("CPU %", 80), ("Memory", 110), ("Status", 100),
+        ]
+
+        self.create_host_table()
+        self.create_process_table()
+
+        # Fleet snapshots arrive once per interval from the fleet thread
+        self.fleet.subscribe(self.pump.subscriber("fleet", self.apply_snapshot))
+
+    def create_header(self, parent, columns):
+        header = ctk.CTkFrame(parent)
+        header.pack(fill="x", padx=5, pady=(5, 0))
+        for name, width in columns:
+            cell = ctk.CTkFrame(header, width=width, height=28)
+            cell.pack_propagate(False)
+            cell.pack(side="left", padx=1)
+            ctk.CTkLabel(cell, text=name, font=("Arial", 12, "bold")).pack(fill="both", expand=True)
+
+    def create_row(self, parent, columns):
+        frame = ctk.CTkFrame(parent, height=26)
+        frame.pack(fill="x", pady=1)
+        labels = []
+        for name, width in columns:
+            cell = ctk.CTkFrame(frame, width=width, height=26)
+            cell.pack_propagate(False)
+            cell.pack(side="left", padx=1)
+            label = ctk.CTkLabel(cell, text="")
+            label.pack(fill="both", expand=True)
+            labels.append(label)
+        return {"labels": labels, "texts": [""] * len(labels)}
+
+    def fill_row(self, row, texts):
+        # Only touch the labels whose text actually changed
+        for i, text in enumerate(texts):
+            if row["texts"][i] != text:
+                row["labels"][i].configure(text=text)
+                row["texts"][i] = text
+
+    def create_host_table(self):
+        title = ctk.CTkLabel(self, text="Hosts", font=("Arial", 16, "bold"))
+        title.pack(anchor="w", padx=10, pady=(5, 0))
+        self.create_header(self, self.host_columns)
+
+        # One row per configured host, created once
+        self.host_list = ctk.CTkScrollableFrame(self, height=250)
+        self.host_list.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        self.host_rows = [self.create_row(self.host_list, self.host_columns) for _ in self.fleet.hosts]
+
+        self.summary_label = ctk.CTkLabel(self, text="")
+        self.summary_label.pack(anchor="w", padx=10)
+
+    def create_process_table(self):
+        header = ctk.CTkFrame(self)
+        header.pack(fill="x", padx=5, pady=(10, 0))
+        title = ctk.CTkLabel(header, text="Top Processes", font=("Arial", 16, "bold"))
+        title.pack(side="left", padx=5)
+
+        self.sort_combobox = ctk.CTkComboBox(
+            header,
+            values=["CPU", "Memory", "Name", "PID"],
+            command=self.change_sort,
+            width=100
+        )
+        self.sort_combobox.pack(side="right", padx=5)
+        self.sort_combobox.set("CPU")
+        ctk.CTkLabel(header, text="Sort by:").pack(side="right", padx=5)
+
+        self.create_header(self, self.process_columns)
+        self.process_list = ctk.CTkScrollableFrame(self, height=300)
+        self.process_list.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        self.process_rows = [self.create_row(self.process_list, self.process_columns)
+                             for _ in range(self.top_limit)]
+
+    def host_texts(self, status, now):
+        snapshot = status.snapshot
+        # The numbers stay up, but a silent host's are marked as old
+        if is_stale(status, now):
+            state = "Stale"
+        elif status.connected:
+            state = "Connected"
+        elif status.error:
+            state = "Unreachable"
+        else:
+            state = "Connecting"
+        if snapshot is None:
+            return (status.name, state, "", "", "", "", "")
+        return (
+            status.name,
+            state,
+            f"{snapshot.cpu_percent:.1f}",
+            f"{snapshot.memory.percent:.1f}" if snapshot.memory is not None else "",
+            f"{snapshot.net_recv_speed:.2f} MB/s",
+            f"{snapshot.net_sent_speed:.2f} MB/s",
+            str(len(snapshot.process_columns)) if snapshot.process_columns is not None else "",
+        )
+
+    def apply_snapshot(self, snapshot):
+        self.snapshot = snapshot
+        if self.active:
+            self.update_view()
+
+    def set_active(self, active):
+        # Collectors only send process tables while this tab is showing
+        self.active = active
+        self.fleet.set_collect_processes(active)
+        if active:
+            self.update_view()
+
+    def update_view(self):
+        if self.snapshot is None:
+            return
+
+        hosts = self.snapshot.hosts
+        now = time.monotonic()
+        for row, status in zip(self.host_rows, hosts):
+            self.fill_row(row, self.host_texts(status, now))
+        connected = sum(status.connected for status in hosts)
+        stale = sum(is_stale(status, now) for status in hosts)
+        summary = f"{connected} of {len(hosts)} hosts connected"
+        if stale:
+            summary += f", {stale} stale"
+        self.summary_label.configure(text=summary)
+
+        top = self.top.select(hosts, self.sort_by, self.sort_reverse, self.top_limit)
+        for i, row in enumerate(self.process_rows):
+            if i < len(top):
+                name, process = top[i]
+                texts = (name, str(process.pid), process.name, f"{process.cpu:.1f}%",
+                         get_size(process.memory_raw), str(process.status))
+            else:
+                texts = ("",) * len(self.process_columns)
+            self.fill_row(row, texts)
+
+    def change_sort(self, choice):
+        self.sort_by = choice.lower()
+        self.update_view()
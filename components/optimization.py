@@ -8,9 +8,12 @@ from tkinter import messagebox
 import os
 
 class OptimizationFrame(ctk.CTkFrame):
-    def __init__(self, master):
+    def __init__(self, master, engine, pump):
         super().__init__(master)
         
+        self.engine = engine
+        self.pump = pump
+        
         # Create main scrollable frame
         self.main_frame = ctk.CTkScrollableFrame(self)
         self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -33,6 +36,10 @@ class OptimizationFrame(ctk.CTkFrame):
         
         # Initialize optimization status
         self.is_optimizing = False
+        self.active = True
+        
+        # Receive usage data from the shared sampling engine
+        self.engine.subscribe(self.pump.subscriber("optimization", self.apply_snapshot))
     
     def create_performance_section(self):
         """Create the performance mode section"""
@@ -77,6 +84,8 @@ class OptimizationFrame(ctk.CTkFrame):
         
         self.memory_label = ctk.CTkLabel(memory_frame, text="Memory Usage: 0%")
         self.memory_label.pack(pady=2)
+        self.memory_trend_label = ctk.CTkLabel(memory_frame, text="")
+        self.memory_trend_label.pack(pady=2)
         
         # Memory optimization options
         options_frame = ctk.CTkFrame(memory_frame)
@@ -110,6 +119,8 @@ class OptimizationFrame(ctk.CTkFrame):
         
         self.cpu_label = ctk.CTkLabel(cpu_frame, text="CPU Usage: 0%")
         self.cpu_label.pack(pady=2)
+        self.cpu_trend_label = ctk.CTkLabel(cpu_frame, text="")
+        self.cpu_trend_label.pack(pady=2)
         
         # CPU optimization options
         options_frame = ctk.CTkFrame(cpu_frame)
@@ -182,13 +193,6 @@ class OptimizationFrame(ctk.CTkFrame):
             font=("Arial", 12)
         )
         self.status_label.pack(pady=5)
-        
-        # Start monitoring thread
-        self.monitoring_thread = threading.Thread(
-            target=self.monitor_system,
-            daemon=True
-        )
-        self.monitoring_thread.start()
     
     def change_mode(self):
         """Handle performance mode changes"""
@@ -219,6 +223,10 @@ class OptimizationFrame(ctk.CTkFrame):
                 f"Failed to change performance mode: {str(e)}"
             )
     
+    def set_status(self, text):
+        """Show a status message; safe to call from worker threads"""
+        self.pump.post("optimization.status", self.status_label.configure, text=text)
+    
     def optimize_memory(self):
         """Optimize system memory"""
         if self.is_optimizing:
@@ -227,14 +235,18 @@ class OptimizationFrame(ctk.CTkFrame):
         self.is_optimizing = True
         self.status_label.configure(text="Optimizing memory...")
         
+        # Read widget state here; the worker thread must not touch Tk
+        clear_standby = self.clear_standby.get()
+        clear_cache = self.clear_cache.get()
+        
         def optimize():
             try:
                 if platform.system() == "Windows":
-                    if self.clear_standby.get():
+                    if clear_standby:
                         subprocess.run(["powershell", "Clear-RecycleBin", "-Force"],
                                     capture_output=True)
                     
-                    if self.clear_cache.get():
+                    if clear_cache:
                         subprocess.run(["ipconfig", "/flushdns"], capture_output=True)
                         if os.path.exists(os.path.expanduser("~\\AppData\\Local\\Temp")):
                             for item in os.listdir(os.path.expanduser("~\\AppData\\Local\\Temp")):
@@ -246,14 +258,12 @@ class OptimizationFrame(ctk.CTkFrame):
                                     pass
                 
                 elif platform.system() == "Linux":
-                    if self.clear_cache.get():
+                    if clear_cache:
                         os.system("sync && echo 3 > /proc/sys/vm/drop_caches")
                 
-                self.status_label.configure(text="Memory optimization completed")
+                self.set_status("Memory optimization completed")
             except Exception as e:
-                self.status_label.configure(
-                    text=f"Memory optimization failed: {str(e)}"
-                )
+                self.set_status(f"Memory optimization failed: {str(e)}")
             finally:
                 self.is_optimizing = False
         
@@ -267,17 +277,21 @@ class OptimizationFrame(ctk.CTkFrame):
         self.is_optimizing = True
         self.status_label.configure(text="Optimizing CPU...")
         
+        # Read widget state here; the worker thread must not touch Tk
+        optimize_services = self.optimize_services.get()
+        optimize_processes = self.optimize_processes.get()
+        
         def optimize():
             try:
                 if platform.system() == "Windows":
-                    if self.optimize_services.get():
+                    if optimize_services:
                         # Optimize non-essential services
                         subprocess.run(
                             ["sc", "config", "SysMain", "start=", "disabled"],
                             capture_output=True
                         )
                     
-                    if self.optimize_processes.get():
+                    if optimize_processes:
                         # Set process priorities
                         for proc in psutil.process_iter(['name', 'pid']):
                             try:
@@ -287,11 +301,9 @@ class OptimizationFrame(ctk.CTkFrame):
                             except Exception:
                                 continue
                 
-                self.status_label.configure(text="CPU optimization completed")
+                self.set_status("CPU optimization completed")
             except Exception as e:
-                self.status_label.configure(
-                    text=f"CPU optimization failed: {str(e)}"
-                )
+                self.set_status(f"CPU optimization failed: {str(e)}")
             finally:
                 self.is_optimizing = False
         
@@ -305,58 +317,75 @@ class OptimizationFrame(ctk.CTkFrame):
         self.is_optimizing = True
         self.status_label.configure(text="Optimizing battery...")
         
+        # Read widget state here; the worker thread must not touch Tk
+        screen_brightness = self.screen_brightness.get()
+        background_apps = self.background_apps.get()
+        
         def optimize():
             try:
                 if platform.system() == "Windows":
-                    if self.screen_brightness.get():
+                    if screen_brightness:
                         # Reduce screen brightness
                         subprocess.run(
                             ["powershell", "(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,50)"],
                             capture_output=True
                         )
                     
-                    if self.background_apps.get():
+                    if background_apps:
                         # Limit background apps
                         subprocess.run(
                             ["powercfg", "/setacvalueindex", "scheme_current", "sub_processor", "PROCTHROTTLEMAX", "50"],
                             capture_output=True
                         )
                 
-                self.status_label.configure(text="Battery optimization completed")
+                self.set_status("Battery optimization completed")
             except Exception as e:
-                self.status_label.configure(
-                    text=f"Battery optimization failed: {str(e)}"
-                )
+                self.set_status(f"Battery optimization failed: {str(e)}")
             finally:
                 self.is_optimizing = False
         
         threading.Thread(target=optimize, daemon=True).start()
     
-    def monitor_system(self):
-        """Monitor system resources"""
-        while True:
-            try:
-                # Update CPU usage
-                cpu_percent = psutil.cpu_percent()
-                self.cpu_progress.set(cpu_percent / 100)
-                self.cpu_label.configure(text=f"CPU Usage: {cpu_percent}%")
-                
-                # Update memory usage
-                memory = psutil.virtual_memory()
-                self.memory_progress.set(memory.percent / 100)
-                self.memory_label.configure(text=f"Memory Usage: {memory.percent}%")
-                
-                # Update battery status if available
-                if hasattr(psutil, "sensors_battery"):
-                    battery = psutil.sensors_battery()
-                    if battery:
-                        status = "Plugged In" if battery.power_plugged else "On Battery"
-                        self.battery_label.configure(
-                            text=f"Battery Status: {battery.percent}% ({status})"
-                        )
+    def update_trend(self, label, name):
+        """Show the 10 minute average, p95 and peak of a series"""
+        stats = self.engine.analytics.stats(name, 600)
+        if stats is not None:
+            label.configure(
+                text=f"Last 10 min: avg {stats.mean:.1f}%, p95 {stats.p95:.1f}%, peak {stats.max:.1f}%"
+            )
+    
+    def set_active(self, active):
+        """Start or stop showing live usage when the tab is shown or hidden"""
+        self.active = active
+        if active and self.engine.latest is not None:
+            self.apply_snapshot(self.engine.latest)
+    
+    def apply_snapshot(self, snapshot):
+        """Show system resource usage from a snapshot"""
+        if not self.active:
+            return
+        try:
+            # Update CPU usage
+            cpu_percent = snapshot.cpu_percent
+            self.cpu_progress.set(cpu_percent / 100)
+            self.cpu_label.configure(text=f"CPU Usage: {cpu_percent}%")
             
-            except Exception:
-                pass
+            # Update memory usage
+            memory = snapshot.memory
+            self.memory_progress.set(memory.percent / 100)
+            self.memory_label.configure(text=f"Memory Usage: {memory.percent}%")
+
+            # Sustained load matters more than the current reading here
+            self.update_trend(self.cpu_trend_label, "cpu")
+            self.update_trend(self.memory_trend_label, "memory")
             
-            finally:
-                threading.Event().wait(2)  # Update every 2 seconds
\ No newline at end of file
+            # Update battery status if available
+            battery = snapshot.battery
+            if battery and hasattr(self, "battery_label"):
+                status = "Plugged In" if battery.power_plugged else "On Battery"
+                self.battery_label.configure(
+                    text=f"Battery Status: {battery.percent}% ({status})"
+                )
+        
+        except Exception:
+            pass
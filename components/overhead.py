@@ -0,0 +1,169 @@
+# components/overhead.py
+
+import time
+from tkinter import filedialog
+
+import customtkinter as ctk
+
+class OverheadFrame(ctk.CTkFrame):
+    def __init__(self, master, engine, pump):
+        super().__init__(master)
+
+        self.engine = engine
+        self.pump = pump
+        self.instruments = engine.instruments
+        self.active = True
+        self.refresh_every = 1.0  # seconds
+        self.last_refresh = 0.0
+        self.shown_results = (None, None)
+
+        self.columns = [
+            ("Stage", 260), ("Count", 90), ("Mean ms", 90), ("p50 ms", 90),
+            ("p95 ms", 90), ("p99 ms", 90), ("Max ms", 90),
+        ]
+        self.stage_rows = {}
+
+        self.create_controls()
+        self.create_stage_table()
+        self.create_results()
+
+        self.engine.subscribe(self.pump.subscriber("overhead", self.apply_snapshot))
+
+    def create_controls(self):
+        controls = ctk.CTkFrame(self)
+        controls.pack(fill="x", padx=5, pady=5)
+
+        self.export_btn = ctk.CTkButton(controls, text="Export JSON", command=self.export, width=120)
+        self.export_btn.pack(side="left", padx=5)
+
+        self.profile_btn = ctk.CTkButton(controls, text="Start cProfile",
+                                         command=self.toggle_profile, width=140)
+        self.profile_btn.pack(side="left", padx=5)
+
+        self.trace_btn = ctk.CTkButton(controls, text="Start tracemalloc",
+                                       command=self.toggle_tracemalloc, width=140)
+        self.trace_btn.pack(side="left", padx=5)
+
+        self.summary_label = ctk.CTkLabel(self, text="", anchor="w", justify="left")
+        self.summary_label.pack(fill="x", padx=10, pady=(0, 5))
+
+    def create_stage_table(self):
+        header = ctk.CTkFrame(self)
+        header.pack(fill="x", padx=5)
+        for name, width in self.columns:
+            cell = ctk.CTkFrame(header, width=width, height=28)
+            cell.pack_propagate(False)
+            cell.pack(side="left", padx=1)
+            ctk.CTkLabel(cell, text=name, font=("Arial", 12, "bold")).pack(fill="both", expand=True)
+
+        self.stage_list = ctk.CTkScrollableFrame(self, height=260)
+        self.stage_list.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+
+    def create_stage_row(self):
+        frame = ctk.CTkFrame(self.stage_list, height=26)
+        frame.pack(fill="x", pady=1)
+        labels = []
+        for name, width in self.columns:
+            cell = ctk.CTkFrame(frame, width=width, height=26)
+            cell.pack_propagate(False)
+            cell.pack(side="left", padx=1)
+            label = ctk.CTkLabel(cell, text="")
+            label.pack(fill="both", expand=True)
+            labels.append(label)
+        self.instruments.count_widgets(1 + 2 * len(labels))
+        return {"labels": labels, "texts": [""] * len(labels)}
+
+    def create_results(self):
+        ctk.CTkLabel(self, text="Captures", font=("Arial", 14, "bold")).pack(anchor="w", padx=10)
+        self.results_box = ctk.CTkTextbox(self, height=200, font=("Courier", 11))
+        self.results_box.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        self.results_box.insert("1.0", "Start cProfile or tracemalloc, then stop it to see the results here.")
+        self.results_box.configure(state="disabled")
+
+    def apply_snapshot(self, snapshot):
+        if not self.active:
+            return
+        # At high sampling rates the table still refreshes about once a second
+        now = time.monotonic()
+        if now - self.last_refresh >= self.refresh_every:
+            self.last_refresh = now
+            self.refresh()
+
+    def set_active(self, active):
+        self.active = active
+        if active:
+            self.refresh()
+
+    def refresh(self):
+        report = self.instruments.report()
+
+        for name, stats in report["stages"].items():
+            row = self.stage_rows.get(name)
+            if row is None:
+                row = self.stage_rows[name] = self.create_stage_row()
+            texts = (name, str(stats["count"])) + tuple(
+                f"{stats[key] * 1000:.3f}" if stats[key] is not None else "-"
+                for key in ("mean", "p50", "p95", "p99", "max"))
+            # Only touch the labels whose text actually changed
+            for i, text in enumerate(texts):
+                if row["texts"][i] != text:
+                    row["labels"][i].configure(text=text)
+                    row["texts"][i] = text
+
+        allocations = report["allocated_blocks_per_tick"]
+        widgets = report["widgets_per_tick"]
+        lines = [
+            f"Ticks: {report['ticks']}    "
+            f"Allocated blocks per tick: {allocations['last']} "
+            f"(mean {allocations['mean'] or 0:.0f}, max {allocations['max']})    "
+            f"Widgets created: {report['widgets_created']} "
+            f"(last tick {widgets['last']}, max {widgets['max']})"
+        ]
+        # Only a local engine has a scheduler; a collector's cost is its own
+        scheduler = getattr(self.engine, "scheduler", None)
+        if scheduler is not None:
+            lines.append(f"Sampling every {scheduler.interval * 1000:.0f} ms using "
+                         f"{scheduler.overhead * 100:.2f}% of one core"
+                         + (" (held back by the overhead budget)" if scheduler.throttled else ""))
+        self.summary_label.configure(text="\n".join(lines))
+
+        results = (report["profile"], report["tracemalloc"])
+        if results != self.shown_results:
+            self.shown_results = results
+            self.show_results(*results)
+
+    def show_results(self, profile, allocations):
+        parts = []
+        if allocations:
+            parts.append("Top allocation sites (tracemalloc):")
+            parts.extend(f"  {entry['size'] / 1024:10.1f} KiB {entry['count']:8d} blocks  {entry['site']}"
+                         for entry in allocations)
+        if profile:
+            parts.append("Sampling thread profile (cProfile):")
+            parts.append(profile)
+        self.results_box.configure(state="normal")
+        self.results_box.delete("1.0", "end")
+        self.results_box.insert("1.0", "\n".join(parts))
+        self.results_box.configure(state="disabled")
+
+    def toggle_profile(self):
+        enabled = not self.instruments.profiling
+        self.instruments.set_profiling(enabled)
+        self.profile_btn.configure(text="Stop cProfile" if enabled else "Start cProfile")
+
+    def toggle_tracemalloc(self):
+        enabled = not self.instruments.tracing
+        self.instruments.set_tracing(enabled)
+        self.trace_btn.configure(text="Stop tracemalloc" if enabled else "Start tracemalloc")
+        if not enabled:
+            self.refresh()
+
+    def export(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json", filetypes=[("JSON", "*.json")], initialfile="overhead.json")
+        if not path:
+            return
+        try:
+            self.instruments.export(path)
+        except OSError as e:
+            print(f"Error exporting overhead report: {e}")
@@ -1,185 +1,455 @@
 import tkinter as tk
 from tkinter import ttk
 import customtkinter as ctk
-import psutil
+import math
+import time
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import numpy as np
-from collections import deque
-import GPUtil
-import datetime
-import matplotlib.animation as animation
+from utils.metric_store import HOST_SERIES
+from utils.ring_buffer import RingBuffer
+from utils.sampling import SamplingEngine
+from utils.ui_pump import UiPump
+
+# Seconds of history summarized below the charts
+STATS_WINDOW = 600
+
+# Stored ranges offered next to the live view, in seconds
+RANGES = {"1 hour": 3600, "24 hours": 24 * 3600, "7 days": 7 * 24 * 3600}
+
+# (largest range, seconds per x unit, axis label) for stored ranges
+RANGE_UNITS = ((2 * 3600, 60, 'minutes ago'),
+               (2 * 24 * 3600, 3600, 'hours ago'),
+               (math.inf, 24 * 3600, 'days ago'))
+
+
+def set_bar_percent(bar, fraction):
+    """Show fraction as a bar height in percent, or hide the bar if None"""
+    bar.set_visible(fraction is not None)
+    if fraction is not None:
+        bar.set_height(fraction * 100)
+
+
+class PerformanceCharts:
+    """
+    The six performance plots, independent of Tk. With blit enabled the
+    static parts of each axes are cached and only changed artists are
+    redrawn; bars and pie wedges are updated in place.
+    """
+
+    def __init__(self, fig, canvas, max_points=50, blit=True):
+        self.fig = fig
+        self.canvas = canvas
+        self.max_points = max_points
+        self.blit = blit
 
-class PerformanceFrame(ctk.CTkFrame):
-    def __init__(self, master):
-        super().__init__(master)
-        
         # Initialize data storage with empty values
-        self.max_points = 50
-        self.cpu_data = deque([0] * self.max_points, maxlen=self.max_points)
-        self.memory_data = deque([0] * self.max_points, maxlen=self.max_points)
-        self.temp_data = deque([0] * self.max_points, maxlen=self.max_points)
-        self.network_sent_data = deque([0] * self.max_points, maxlen=self.max_points)
-        self.network_recv_data = deque([0] * self.max_points, maxlen=self.max_points)
-        self.last_net_io = psutil.net_io_counters()
-        self.last_update_time = datetime.datetime.now()
+        self.x = np.arange(max_points)
+        self.cpu_data = RingBuffer(max_points)
+        self.memory_data = RingBuffer(max_points)
+        self.temp_data = RingBuffer(max_points)
+        self.network_sent_data = RingBuffer(max_points)
+        self.network_recv_data = RingBuffer(max_points)
+
+        # Per-tick draw cost in seconds
+        self.frame_times = RingBuffer(100)
+        self.frame_count = 0
+
+        self.backgrounds = {}
+        self.net_limit = 1.0
+        self.gpu_count = None
+        self.disk_percent = None
+        # Seconds of stored history shown instead of the live window
+        self.range_span = None
 
-        # Create matplotlib figure with dark theme
-        plt.style.use('dark_background')
-        self.fig = Figure(figsize=(12, 8))
-        self.fig.patch.set_facecolor('#1e1e1e')
-        
-        # Setup subplots
         self.setup_plots()
-        
-        # Create canvas
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-        # Start animation
-        self.ani = animation.FuncAnimation(
-            self.fig, self.update_plots, interval=1000, blit=False)
+        self.canvas.mpl_connect("draw_event", self.on_draw)
 
     def setup_plots(self):
         # CPU Usage
         self.ax_cpu = self.fig.add_subplot(321)
-        self.cpu_line, = self.ax_cpu.plot([], [], 'b-', label='CPU Usage')
+        self.cpu_line, = self.ax_cpu.plot(self.x, self.cpu_data.view(), 'b-', label='CPU Usage')
         self.ax_cpu.set_ylim(0, 100)
         self.ax_cpu.set_xlim(0, self.max_points)
         self.ax_cpu.set_title('CPU Usage (%)')
         self.ax_cpu.grid(True, linestyle='--', alpha=0.7)
-        
+
         # Memory Usage
         self.ax_mem = self.fig.add_subplot(322)
-        self.mem_line, = self.ax_mem.plot([], [], 'g-', label='Memory Usage')
+        self.mem_line, = self.ax_mem.plot(self.x, self.memory_data.view(), 'g-', label='Memory Usage')
         self.ax_mem.set_ylim(0, 100)
         self.ax_mem.set_xlim(0, self.max_points)
         self.ax_mem.set_title('Memory Usage (%)')
         self.ax_mem.grid(True, linestyle='--', alpha=0.7)
-        
+
         # CPU Temperature
         self.ax_temp = self.fig.add_subplot(323)
-        self.temp_line, = self.ax_temp.plot([], [], 'r-', label='Temperature')
+        self.temp_line, = self.ax_temp.plot(self.x, self.temp_data.view(), 'r-', label='Temperature')
         self.ax_temp.set_ylim(0, 100)
         self.ax_temp.set_xlim(0, self.max_points)
         self.ax_temp.set_title('CPU Temperature (°C)')
         self.ax_temp.grid(True, linestyle='--', alpha=0.7)
-        
-        # GPU Usage
+
+        # GPU Usage; bars are created once per GPU count
         self.ax_gpu = self.fig.add_subplot(324)
         self.ax_gpu.set_title('GPU Usage')
         self.ax_gpu.grid(True, linestyle='--', alpha=0.7)
-        
+        self.ax_gpu.set_ylim(0, 100)
+        self.gpu_load_bars = []
+        self.gpu_memory_bars = []
+        self.gpu_message = self.ax_gpu.text(0.5, 0.5, 'No GPU Info Available',
+                                            horizontalalignment='center',
+                                            transform=self.ax_gpu.transAxes)
+
         # Network Usage
         self.ax_net = self.fig.add_subplot(325)
-        self.net_sent_line, = self.ax_net.plot([], [], 'c-', label='Upload')
-        self.net_recv_line, = self.ax_net.plot([], [], 'm-', label='Download')
-        self.ax_net.set_ylim(0, 1)  # Will auto-adjust based on actual usage
+        self.net_sent_line, = self.ax_net.plot(self.x, self.network_sent_data.view(), 'c-', label='Upload')
+        self.net_recv_line, = self.ax_net.plot(self.x, self.network_recv_data.view(), 'm-', label='Download')
+        self.ax_net.set_ylim(0, self.net_limit)  # Will auto-adjust based on actual usage
         self.ax_net.set_xlim(0, self.max_points)
         self.ax_net.set_title('Network Usage (MB/s)')
         self.ax_net.grid(True, linestyle='--', alpha=0.7)
         self.ax_net.legend()
-        
-        # Disk Usage
+
+        # Disk Usage; wedges are created once and re-angled in place
         self.ax_disk = self.fig.add_subplot(326)
         self.ax_disk.set_title('Disk Usage')
-        
+        wedges, labels, pcts = self.ax_disk.pie(
+            [1, 1], labels=['Used', 'Free'], colors=['#ff9999', '#66b3ff'], autopct='%1.1f%%')
+        self.disk_wedges, self.disk_labels, self.disk_pcts = list(wedges), list(labels), list(pcts)
+
         # Style adjustments
         for ax in [self.ax_cpu, self.ax_mem, self.ax_temp, self.ax_gpu, self.ax_net, self.ax_disk]:
             ax.set_facecolor('#2d2d2d')
-            
+
         self.fig.tight_layout()
 
-    def update_network_data(self):
-        current_time = datetime.datetime.now()
-        current_net_io = psutil.net_io_counters()
-        time_delta = (current_time - self.last_update_time).total_seconds()
-        
-        # Calculate MB/s
-        sent_speed = (current_net_io.bytes_sent - self.last_net_io.bytes_sent) / (1024 * 1024 * time_delta)
-        recv_speed = (current_net_io.bytes_recv - self.last_net_io.bytes_recv) / (1024 * 1024 * time_delta)
-        
+        # (live buffer, line, history series) per plotted series
+        self.series = [(self.cpu_data, self.cpu_line, "cpu"),
+                       (self.memory_data, self.mem_line, "memory"),
+                       (self.temp_data, self.temp_line, "temperature"),
+                       (self.network_sent_data, self.net_sent_line, "net_sent"),
+                       (self.network_recv_data, self.net_recv_line, "net_recv")]
+
+        # Artists redrawn on every tick, per axes
+        self.line_artists = {
+            self.ax_cpu: [self.cpu_line],
+            self.ax_mem: [self.mem_line],
+            self.ax_temp: [self.temp_line],
+            self.ax_net: [self.net_sent_line, self.net_recv_line],
+        }
+        self.set_animated(self.blit)
+
+    def blitted_axes(self):
+        return list(self.line_artists) + [self.ax_gpu, self.ax_disk]
+
+    def animated_artists(self, ax):
+        if ax is self.ax_gpu:
+            return self.gpu_load_bars + self.gpu_memory_bars + [self.gpu_message]
+        if ax is self.ax_disk:
+            return self.disk_wedges + self.disk_labels + self.disk_pcts
+        return self.line_artists[ax]
+
+    def set_animated(self, animated):
+        # Animated artists are skipped by a full draw and drawn by blitting
+        for ax in self.blitted_axes():
+            for artist in self.animated_artists(ax):
+                artist.set_animated(animated)
+
+    def on_draw(self, event):
+        # A full draw (first paint, resize, axis change) refreshes the
+        # cached backgrounds, then the animated artists are put back on top
+        if not self.blit:
+            return
+        self.backgrounds = {ax: self.canvas.copy_from_bbox(ax.bbox)
+                            for ax in self.blitted_axes()}
+        for ax in self.backgrounds:
+            for artist in self.animated_artists(ax):
+                ax.draw_artist(artist)
+
+    def update_network_data(self, snapshot):
+        sent_speed = snapshot.net_sent_speed
+        recv_speed = snapshot.net_recv_speed
+
         self.network_sent_data.append(sent_speed)
         self.network_recv_data.append(recv_speed)
-        
-        self.last_net_io = current_net_io
-        self.last_update_time = current_time
-        
+
         return sent_speed, recv_speed
 
-    def update_plots(self, frame):
-        # Update CPU data
-        cpu_percent = psutil.cpu_percent()
-        self.cpu_data.append(cpu_percent)
-        self.cpu_line.set_data(range(len(self.cpu_data)), self.cpu_data)
-        
-        # Update Memory data
-        memory = psutil.virtual_memory()
-        self.memory_data.append(memory.percent)
-        self.mem_line.set_data(range(len(self.memory_data)), self.memory_data)
-        
-        # Update Temperature data
-        if hasattr(psutil, "sensors_temperatures"):
-            temps = psutil.sensors_temperatures()
-            if temps:
-                for name, entries in temps.items():
-                    if entries:
-                        current_temp = entries[0].current
-                        self.temp_data.append(current_temp)
-                        self.temp_line.set_data(range(len(self.temp_data)), self.temp_data)
-                        break
-        
-        # Update GPU info
-        self.ax_gpu.clear()
-        self.ax_gpu.set_title('GPU Usage')
-        self.ax_gpu.grid(True, linestyle='--', alpha=0.7)
-        try:
-            gpus = GPUtil.getGPUs()
+    def update_gpu(self, gpus):
+        """Update bars in place; returns True if the axes needs a full redraw"""
+        structure_changed = len(gpus) != self.gpu_count
+        if structure_changed:
+            self.gpu_count = len(gpus)
+            for bar in self.gpu_load_bars + self.gpu_memory_bars:
+                bar.remove()
+            self.gpu_load_bars = []
+            self.gpu_memory_bars = []
             if gpus:
-                gpu_loads = [gpu.load * 100 for gpu in gpus]
-                gpu_memories = [gpu.memoryUtil * 100 for gpu in gpus]
                 x = np.arange(len(gpus))
                 width = 0.35
-                
-                self.ax_gpu.bar(x - width/2, gpu_loads, width, label='Load %')
-                self.ax_gpu.bar(x + width/2, gpu_memories, width, label='Memory %')
+                self.gpu_load_bars = list(self.ax_gpu.bar(x - width/2, [0] * len(gpus), width, label='Load %'))
+                self.gpu_memory_bars = list(self.ax_gpu.bar(x + width/2, [0] * len(gpus), width, label='Memory %'))
                 self.ax_gpu.set_xticks(x)
                 self.ax_gpu.set_xticklabels([f'GPU {i}' for i in range(len(gpus))])
                 self.ax_gpu.legend()
-        except:
-            self.ax_gpu.text(0.5, 0.5, 'No GPU Info Available', 
-                           horizontalalignment='center')
-        
-        # Update Network data
-        sent_speed, recv_speed = self.update_network_data()
-        self.net_sent_line.set_data(range(len(self.network_sent_data)), self.network_sent_data)
-        self.net_recv_line.set_data(range(len(self.network_recv_data)), self.network_recv_data)
-        
-        # Auto-adjust network graph scale
-        max_speed = max(max(self.network_sent_data), max(self.network_recv_data))
-        self.ax_net.set_ylim(0, max_speed * 1.2 if max_speed > 0 else 1)
-        
-        # Update Disk Usage
-        self.ax_disk.clear()
-        self.ax_disk.set_title('Disk Usage')
-        disk = psutil.disk_usage('/')
-        sizes = [disk.used, disk.free]
-        labels = [f'Used\n{disk.percent}%', f'Free\n{100-disk.percent}%']
-        colors = ['#ff9999', '#66b3ff']
-        self.ax_disk.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%')
-        
-        self.fig.canvas.draw()
-        return self.cpu_line, self.mem_line, self.temp_line, self.net_sent_line, self.net_recv_line
+            self.gpu_message.set_visible(not gpus)
+            self.set_animated(self.blit)
+
+        # A reading the GPU does not report leaves its bar out
+        for bar, gpu in zip(self.gpu_load_bars, gpus):
+            set_bar_percent(bar, gpu.load)
+        for bar, gpu in zip(self.gpu_memory_bars, gpus):
+            set_bar_percent(bar, gpu.memory_util)
+        return structure_changed
+
+    def update_disk(self, disk):
+        """Re-angle the pie wedges in place; returns True if anything changed"""
+        if disk is None or disk.percent == self.disk_percent:
+            return False
+        self.disk_percent = disk.percent
+
+        total = disk.used + disk.free
+        fractions = [disk.used / total, disk.free / total]
+        names = [f'Used\n{disk.percent}%', f'Free\n{100-disk.percent:.1f}%']
+        theta = 0.0
+        for wedge, label, pct, fraction, name in zip(self.disk_wedges, self.disk_labels,
+                                                      self.disk_pcts, fractions, names):
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + 360 * fraction)
+            mid = math.radians(theta + 180 * fraction)
+            x, y = math.cos(mid), math.sin(mid)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            label.set_text(name)
+            pct.set_position((0.6 * x, 0.6 * y))
+            pct.set_text(f'{fraction * 100:.1f}%')
+            theta += 360 * fraction
+        return True
+
+    def update_net_limit(self):
+        """Rescale the network axis with hysteresis; returns True if it changed"""
+        max_speed = max(self.network_sent_data.view().max(), self.network_recv_data.view().max())
+        if max_speed * 1.2 <= self.net_limit and max_speed > self.net_limit * 0.3:
+            return False
+        limit = max_speed * 1.2 if max_speed > 0 else 1
+        if limit == self.net_limit:
+            return False
+        self.net_limit = limit
+        self.ax_net.set_ylim(0, limit)
+        return True
+
+    def update(self, snapshot):
+        """Apply a snapshot and redraw; returns the draw time in seconds"""
+        start = time.perf_counter()
+        gpus = snapshot.gpus
+
+        self.cpu_data.append(snapshot.cpu_percent)
+        self.memory_data.append(snapshot.memory.percent)
+        if snapshot.temperature is not None:
+            self.temp_data.append(snapshot.temperature)
+        self.update_network_data(snapshot)
+
+        # The live buffers keep filling while a stored range is shown, so
+        # switching back needs no catch-up
+        live = self.range_span is None
+        full_redraw = False
+        dirty = []
+        if live:
+            for buffer, line, name in self.series:
+                line.set_ydata(buffer.view())
+            full_redraw = self.update_net_limit()
+            dirty = list(self.line_artists)
+
+        full_redraw |= self.update_gpu(gpus)
+        if gpus:
+            dirty.append(self.ax_gpu)
+        if self.update_disk(snapshot.disk):
+            dirty.append(self.ax_disk)
+
+        if not self.blit or full_redraw or not self.backgrounds:
+            self.canvas.draw()
+        else:
+            for ax in dirty:
+                self.canvas.restore_region(self.backgrounds[ax])
+                for artist in self.animated_artists(ax):
+                    ax.draw_artist(artist)
+                self.canvas.blit(ax.bbox)
+
+        elapsed = time.perf_counter() - start
+        self.frame_times.append(elapsed)
+        self.frame_count += 1
+        return elapsed
+
+    def load_history(self, history):
+        """Refill every series from the engine's history and redraw"""
+        for buffer, line, name in self.series:
+            values = history.last(name, self.max_points)
+            buffer.fill(0.0)
+            buffer.extend(values[~np.isnan(values)])
+            line.set_ydata(buffer.view())
+        self.update_net_limit()
+        self.canvas.draw()
+
+    def show_range(self, series, span, now):
+        """
+        Plot stored (timestamps, values) per series over the last span
+        seconds in place of the live window
+        """
+        self.range_span = span
+        for limit, unit, label in RANGE_UNITS:
+            if span <= limit:
+                break
+
+        for buffer, line, name in self.series:
+            times, values = series[name]
+            line.set_data((times - now) / unit, values)
+        for ax in self.line_artists:
+            ax.set_xlim(-span / unit, 0)
+            ax.set_xlabel(label)
+
+        net_max = max([float(np.nanmax(series[name][1])) for name in ("net_sent", "net_recv")
+                       if np.any(~np.isnan(series[name][1]))] or [0.0])
+        self.net_limit = net_max * 1.2 if net_max > 0 else 1
+        self.ax_net.set_ylim(0, self.net_limit)
+        self.canvas.draw()
+
+    def show_live(self, history):
+        """Return to the live window, refilled from the engine's history"""
+        self.range_span = None
+        for buffer, line, name in self.series:
+            line.set_data(self.x, buffer.view())
+        for ax in self.line_artists:
+            ax.set_xlim(0, self.max_points)
+            ax.set_xlabel('')
+        self.load_history(history)
+
+    def average_frame_time(self):
+        count = min(self.frame_count, self.frame_times.capacity)
+        if count == 0:
+            return 0.0
+        return float(self.frame_times.view()[-count:].mean())
+
+
+class PerformanceFrame(ctk.CTkFrame):
+    def __init__(self, master, engine, pump, blit=True):
+        super().__init__(master)
+
+        self.engine = engine
+        self.pump = pump
+        self.max_points = 50
+        self.active = True
+
+        # Create matplotlib figure with dark theme
+        plt.style.use('dark_background')
+        self.fig = Figure(figsize=(12, 8))
+        self.fig.patch.set_facecolor('#1e1e1e')
+
+        # Create canvas and plots
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
+        self.charts = PerformanceCharts(self.fig, self.canvas, self.max_points, blit=blit)
+        self.canvas.draw()
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        # Per-tick draw cost
+        self.frame_time_label = ctk.CTkLabel(self, text="Draw: -", anchor="e")
+        self.frame_time_label.pack(fill="x", padx=10)
+
+        # Window statistics from the engine's history
+        self.stats_label = ctk.CTkLabel(self, text="", anchor="w")
+        self.stats_label.pack(fill="x", padx=10)
+
+        # Live window or a range read back from the on-disk metric store
+        self.range_name = "Live"
+        self.range_loaded = None
+        self.range_selector = ctk.CTkSegmentedButton(
+            self, values=["Live"] + list(RANGES), command=self.change_range)
+        self.range_selector.set("Live")
+        if self.engine.store is None:
+            self.range_selector.configure(state="disabled")
+        self.range_selector.pack(anchor="w", padx=10, pady=(0, 5))
+
+        # Redraw whenever the sampling engine publishes a snapshot
+        self.engine.subscribe(self.pump.subscriber("performance", self.update_plots))
+
+    def set_active(self, active):
+        # While hidden nothing is drawn; on return the charts catch up from
+        # the history the engine kept recording instead of polling again
+        self.active = active
+        if active:
+            if self.range_name == "Live":
+                self.charts.load_history(self.engine.history)
+            else:
+                self.load_range()
+
+    def change_range(self, name):
+        self.range_name = name
+        if name == "Live":
+            self.charts.show_live(self.engine.history)
+        else:
+            self.load_range()
+
+    def load_range(self):
+        """Read the selected range from the metric store and plot it"""
+        store = self.engine.store
+        if store is None:
+            return
+        span = RANGES[self.range_name]
+        now = time.time()
+        # Stamped up front so a failed read is retried on the next refresh,
+        # not on every tick
+        self.range_loaded = time.monotonic()
+        try:
+            series = {name: store.query(name, now - span, now) for name in HOST_SERIES}
+        except Exception as e:
+            print(f"Error reading metric history: {e}")
+            return
+        self.charts.show_range(series, span, now)
+
+    def update_plots(self, snapshot):
+        if not self.active:
+            return
+        # Stored ranges change slowly; re-read them once a minute
+        if self.range_name != "Live" and time.monotonic() - self.range_loaded >= 60:
+            self.load_range()
+        with self.engine.instruments.measure("performance: draw"):
+            elapsed = self.charts.update(snapshot)
+        self.frame_time_label.configure(
+            text=f"Draw: {elapsed * 1000:.1f} ms (avg {self.charts.average_frame_time() * 1000:.1f} ms)"
+        )
+        self.update_stats()
+
+    def update_stats(self):
+        """Show 10 minute statistics of the plotted series"""
+        analytics = self.engine.analytics
+        cpu = analytics.stats("cpu", STATS_WINDOW)
+        memory = analytics.stats("memory", STATS_WINDOW)
+        download = analytics.stats("net_recv", STATS_WINDOW)
+        if cpu is None:
+            return
+        text = (f"Last 10 min  CPU avg {cpu.mean:.1f}% p95 {cpu.p95:.1f}% max {cpu.max:.1f}%  |  "
+                f"Memory p95 {memory.p95:.1f}%  |  "
+                f"Download p95 {download.p95:.2f} MB/s")
+        # A collector's sampling cost is not ours to show
+        scheduler = getattr(self.engine, "scheduler", None)
+        if scheduler is not None:
+            text += (f"  |  Sampling every {scheduler.interval * 1000:.0f} ms, "
+                     f"{scheduler.overhead * 100:.2f}% CPU")
+        self.stats_label.configure(text=text)
 
 # Example usage
 if __name__ == "__main__":
     root = ctk.CTk()
     root.title("System Performance Monitor")
     root.geometry("1200x800")
-    
-    app = PerformanceFrame(root)
+
+    engine = SamplingEngine()
+    pump = UiPump(root)
+    app = PerformanceFrame(root, engine, pump)
     app.pack(fill=tk.BOTH, expand=True)
-    
-    root.mainloop()
\ No newline at end of file
+    pump.start()
+    engine.start()
+
+    root.mainloop()
+    engine.stop()
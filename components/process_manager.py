@@ -1,36 +1,94 @@
 # components/process_manager.py
 
-import customtkinter as ctk
-import psutil
-from datetime import datetime
+import threading
 import time
+
+import customtkinter as ctk
 from utils.system_utils import get_size
+from utils.process_actions import ACTIONS, ProcessActions, parse_value
+from utils.process_details import ATTRIBUTES, ProcessDetails
+from utils.process_search import ProcessSearchIndex, parse_query
+from utils.process_tree import ProcessTree
+
+# Sort choice -> field of ProcessColumns and ProcessTree
+SORT_CHOICES = {
+    "CPU": "cpu",
+    "Memory": "memory",
+    "Name": "name",
+    "PID": "pid",
+    "Read/s": "read_rate",
+    "Write/s": "write_rate",
+    "Syscalls/s": "syscall_rate",
+}
+IO_SORTS = ("Read/s", "Write/s", "Syscalls/s")
 
 class ProcessManagerFrame(ctk.CTkFrame):
-    def __init__(self, master):
+    def __init__(self, master, engine, pump):
         super().__init__(master)
         
         # Initialize variables
+        self.engine = engine
+        self.pump = pump
+        self.snapshot = engine.latest
         self.processes = []
         self.sort_by = "cpu"
         self.sort_reverse = True
         self.process_limit = 25  # Default limit
-        self.selected_pid = None
+        # Selection is kept by (pid, create_time) so a reused PID is not selected
+        self.selected = set()
+        self.anchor_row = None
+        self.actions = ProcessActions()
+        
+        # Detail pane, built the first time it is shown; its attributes are
+        # fetched off the Tk thread and never by the refresh loop
+        self.details = None
+        self.details_frame = None
+        self.details_visible = False
+        self.detail_target = None
+        self.detail_boxes = {}
+        self.detail_shown = {}
+        self.detail_refresh = 2000  # ms
+        self.active = True
+        
+        # Search runs against the data model, debounced per keystroke
+        self.search_index = ProcessSearchIndex()
+        self.search_terms = []
+        self.search_delay = 150  # ms
+        self.search_job = None
         
-        # Column configurations
+        # Tree mode: rows are (pid, depth, child count), CPU and memory
+        # are subtree totals; collapsed nodes are kept by (pid, create_time)
+        self.tree = ProcessTree()
+        self.tree_mode = False
+        self.tree_rows = []
+        self.collapsed = set()
+        
+        # I/O columns: while hidden the engine reads no I/O counters and
+        # their cells are not even created
+        self.io_columns = False
+        
+        # Column configurations; I/O columns come last, so showing and
+        # hiding them keeps the others in place
         self.columns = {
             "pid": {"name": "PID", "width": 100},
             "name": {"name": "Name", "width": 250},
             "cpu": {"name": "CPU %", "width": 100},
             "memory": {"name": "Memory", "width": 120},
             "status": {"name": "Status", "width": 100},
-            "created": {"name": "Created", "width": 180}
+            "created": {"name": "Created", "width": 180},
+            "read": {"name": "Read/s", "width": 100, "io": True},
+            "write": {"name": "Write/s", "width": 100, "io": True},
+            "syscalls": {"name": "Syscalls/s", "width": 100, "io": True},
         }
+        self.base_columns = sum(1 for config in self.columns.values() if not config.get("io"))
         
         # Create main layout
         self.create_header_frame()
         self.create_process_list()
         self.create_control_panel()
+        
+        # Receive process data from the shared sampling engine
+        self.engine.subscribe(self.pump.subscriber("processes", self.apply_snapshot))
 
     def create_header_frame(self):
         # Header frame with controls
@@ -69,12 +127,20 @@ class ProcessManagerFrame(ctk.CTkFrame):
         
         self.sort_combobox = ctk.CTkComboBox(
             right_frame,
-            values=["CPU", "Memory", "Name", "PID"],
+            values=[choice for choice in SORT_CHOICES if choice not in IO_SORTS],
             command=self.change_sort,
             width=100
         )
         self.sort_combobox.pack(side="left", padx=5)
         self.sort_combobox.set("CPU")
+        
+        # Tree view toggle
+        self.tree_switch = ctk.CTkSwitch(right_frame, text="Tree", command=self.toggle_tree, width=80)
+        self.tree_switch.pack(side="left", padx=5)
+        
+        # I/O rate columns toggle
+        self.io_switch = ctk.CTkSwitch(right_frame, text="I/O", command=self.toggle_io_columns, width=80)
+        self.io_switch.pack(side="left", padx=5)
 
     def create_process_list(self):
         # Create table header
@@ -82,17 +148,35 @@ class ProcessManagerFrame(ctk.CTkFrame):
         self.table_frame.pack(fill="x", padx=5, pady=(0, 5))
         
         # Create headers with specific widths
+        self.header_cells = {}
         for col, config in self.columns.items():
             frame = ctk.CTkFrame(self.table_frame, width=config["width"], height=30)
             frame.pack_propagate(False)
-            frame.pack(side="left", padx=1)
+            if not config.get("io"):
+                frame.pack(side="left", padx=1)
             
             label = ctk.CTkLabel(frame, text=config["name"], font=("Arial", 12, "bold"))
             label.pack(fill="both", expand=True)
+            self.header_cells[col] = frame
         
-        # Create scrollable frame for processes
-        self.process_container = ctk.CTkScrollableFrame(self)
-        self.process_container.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        # Virtualized list: a fixed pool of row widgets, one per visible line,
+        # mapped onto self.processes starting at self.first_row
+        self.row_height = 28
+        self.row_spacing = 2
+        self.first_row = 0
+        self.visible_rows = 0
+        self.row_pool = []
+        
+        self.list_frame = ctk.CTkFrame(self)
+        self.list_frame.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        
+        self.scrollbar = ctk.CTkScrollbar(self.list_frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.process_container = ctk.CTkFrame(self.list_frame, fg_color="transparent")
+        self.process_container.pack(side="left", fill="both", expand=True)
+        self.process_container.bind("<Configure>", self.on_container_resize)
+        self.bind_scroll(self.process_container)
 
     def create_control_panel(self):
         self.control_frame = ctk.CTkFrame(self)
@@ -107,152 +191,513 @@ class ProcessManagerFrame(ctk.CTkFrame):
         )
         self.end_process_btn.pack(side="left", padx=5)
         
+        # Other actions on the selection, with a value where they take one
+        self.action_combobox = ctk.CTkComboBox(
+            self.control_frame,
+            values=list(ACTIONS.values()),
+            width=150
+        )
+        self.action_combobox.pack(side="left", padx=5)
+        self.action_combobox.set(ACTIONS["kill"])
+        
+        self.action_value = ctk.CTkEntry(self.control_frame, placeholder_text="10 / idle / 0-3", width=110)
+        self.action_value.pack(side="left", padx=5)
+        
+        self.apply_btn = ctk.CTkButton(
+            self.control_frame,
+            text="Apply",
+            command=self.apply_selected_action,
+            width=80
+        )
+        self.apply_btn.pack(side="left", padx=5)
+        
+        # Select every process matching the search, not only the rows shown
+        self.select_matches_btn = ctk.CTkButton(
+            self.control_frame,
+            text="Select Matches",
+            command=self.select_matches,
+            width=120
+        )
+        self.select_matches_btn.pack(side="left", padx=5)
+        
         # Refresh button
         self.refresh_btn = ctk.CTkButton(
             self.control_frame,
             text="Refresh",
-            command=self.update_processes,
+            command=self.engine.request_sample,
             width=120
         )
         self.refresh_btn.pack(side="left", padx=5)
         
+        # Detail pane toggle
+        self.details_btn = ctk.CTkButton(
+            self.control_frame,
+            text="Details",
+            command=self.toggle_details,
+            width=100
+        )
+        self.details_btn.pack(side="left", padx=5)
+        
         # Process count label
         self.process_count_label = ctk.CTkLabel(self.control_frame, text="")
         self.process_count_label.pack(side="right", padx=10)
+        
+        # Outcome of the last action
+        self.action_label = ctk.CTkLabel(self, text="", anchor="w")
+        self.action_label.pack(fill="x", padx=10, pady=(0, 5))
 
-    def create_process_row(self, process):
-        frame = ctk.CTkFrame(self.process_container)
-        frame.pack(fill="x", pady=1)
+    def create_process_row(self, index):
+        frame = ctk.CTkFrame(self.process_container, height=self.row_height)
+        
+        row = {
+            "frame": frame,
+            "index": index,
+            "cells": [],
+            "labels": [],
+            "texts": [""] * len(self.columns),
+            "selected": False,
+            "visible": False,
+        }
+        self.bind_row(frame, index)
+        self.engine.instruments.count_widgets(1)
         
         # Create cells with specific widths
-        pid_frame = ctk.CTkFrame(frame, width=self.columns["pid"]["width"])
-        pid_frame.pack_propagate(False)
-        pid_frame.pack(side="left", padx=1)
-        ctk.CTkLabel(pid_frame, text=str(process['pid'])).pack(fill="both", expand=True)
-        
-        name_frame = ctk.CTkFrame(frame, width=self.columns["name"]["width"])
-        name_frame.pack_propagate(False)
-        name_frame.pack(side="left", padx=1)
-        ctk.CTkLabel(name_frame, text=process['name']).pack(fill="both", expand=True)
-        
-        cpu_frame = ctk.CTkFrame(frame, width=self.columns["cpu"]["width"])
-        cpu_frame.pack_propagate(False)
-        cpu_frame.pack(side="left", padx=1)
-        ctk.CTkLabel(cpu_frame, text=f"{process['cpu']:.1f}%").pack(fill="both", expand=True)
-        
-        memory_frame = ctk.CTkFrame(frame, width=self.columns["memory"]["width"])
-        memory_frame.pack_propagate(False)
-        memory_frame.pack(side="left", padx=1)
-        ctk.CTkLabel(memory_frame, text=process['memory']).pack(fill="both", expand=True)
-        
-        status_frame = ctk.CTkFrame(frame, width=self.columns["status"]["width"])
-        status_frame.pack_propagate(False)
-        status_frame.pack(side="left", padx=1)
-        ctk.CTkLabel(status_frame, text=process['status']).pack(fill="both", expand=True)
-        
-        created_frame = ctk.CTkFrame(frame, width=self.columns["created"]["width"])
-        created_frame.pack_propagate(False)
-        created_frame.pack(side="left", padx=1)
-        ctk.CTkLabel(created_frame, text=process['created']).pack(fill="both", expand=True)
-        
-        # Bind click event
-        frame.bind("<Button-1>", lambda e, p=process: self.select_process(e, p))
-        for child in frame.winfo_children():
-            child.bind("<Button-1>", lambda e, p=process: self.select_process(e, p))
-        
-        return frame
+        for col, config in self.columns.items():
+            if config.get("io") and not self.io_columns:
+                break
+            self.add_cell(row, config)
+        
+        return row
+
+    def add_cell(self, row, config):
+        cell = ctk.CTkFrame(row["frame"], width=config["width"], height=self.row_height)
+        cell.pack_propagate(False)
+        cell.pack(side="left", padx=1)
+        label = ctk.CTkLabel(cell, text="")
+        label.pack(fill="both", expand=True)
+        self.bind_row(cell, row["index"])
+        self.bind_row(label, row["index"])
+        row["cells"].append(cell)
+        row["labels"].append(label)
+        # Repaint the selection colour over the new cell on the next fill
+        row["selected"] = None
+        self.engine.instruments.count_widgets(2)
+
+    def bind_row(self, widget, index):
+        # Bind click and scroll events once; the row index maps onto the data
+        widget.bind("<Button-1>", lambda e, i=index: self.select_process(e, i))
+        widget.bind("<Double-Button-1>", lambda e, i=index: self.toggle_expanded(i))
+        self.bind_scroll(widget)
+
+    def bind_scroll(self, widget):
+        widget.bind("<MouseWheel>", self.on_mousewheel)
+        widget.bind("<Button-4>", self.on_mousewheel)
+        widget.bind("<Button-5>", self.on_mousewheel)
+
+    def on_container_resize(self, event):
+        # Grow the row pool to cover the visible height; rows are never destroyed
+        visible_rows = max(1, event.height // (self.row_height + self.row_spacing))
+        while len(self.row_pool) < visible_rows:
+            self.row_pool.append(self.create_process_row(len(self.row_pool)))
+        self.visible_rows = visible_rows
+        self.render_rows()
+
+    def on_mousewheel(self, event):
+        if event.num == 4:
+            delta = -3
+        elif event.num == 5:
+            delta = 3
+        else:
+            delta = -3 if event.delta > 0 else 3
+        self.scroll_to(self.first_row + delta)
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(round(float(value) * len(self.processes))))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_to(self.first_row + int(value) * step)
+
+    def scroll_to(self, first_row):
+        max_first = max(0, len(self.processes) - self.visible_rows)
+        first_row = min(max(0, first_row), max_first)
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self.render_rows()
+
+    def process_texts(self, process):
+        # Memory is formatted only for rows on screen; created is cached per process
+        texts = (
+            str(process.pid),
+            process.name,
+            f"{process.cpu:.1f}%",
+            get_size(process.memory_raw),
+            str(process.status),
+            process.created,
+        )
+        return texts + self.io_texts(process) if self.io_columns else texts
+
+    def io_texts(self, process):
+        return (
+            f"{get_size(process.read_rate)}/s",
+            f"{get_size(process.write_rate)}/s",
+            f"{process.syscall_rate:.0f}",
+        )
+
+    def tree_texts(self, index):
+        process = self.processes[index]
+        pid, depth, children = self.tree_rows[index]
+        cpu, memory, count = self.tree.rollup(pid)
+        name = process.name
+        if not children:
+            marker = "  "
+        elif (pid, process.create_time) in self.collapsed:
+            marker = "▸ "
+            name += f" (+{count - 1})"
+        else:
+            marker = "▾ "
+        return (
+            str(pid),
+            "  " * min(depth, 12) + marker + name,
+            f"{cpu:.1f}%",
+            get_size(memory),
+            str(process.status),
+            process.created,
+        ) + (self.io_texts(process) if self.io_columns else ())
+
+    def fill_row(self, row, index):
+        # Only touch the labels whose text actually changed
+        process = self.processes[index]
+        texts = self.tree_texts(index) if self.tree_rows else self.process_texts(process)
+        for i, text in enumerate(texts):
+            if row["texts"][i] != text:
+                row["labels"][i].configure(text=text)
+                row["texts"][i] = text
+        
+        selected = (process.pid, process.create_time) in self.selected
+        if row["selected"] != selected:
+            color = ("gray76", "gray27") if selected else ("gray86", "gray17")
+            row["frame"].configure(fg_color=color)
+            for cell in row["frame"].winfo_children():
+                cell.configure(fg_color=color)
+            row["selected"] = selected
+
+    def render_rows(self):
+        total = len(self.processes)
+        max_first = max(0, total - self.visible_rows)
+        self.first_row = min(self.first_row, max_first)
+        
+        for i, row in enumerate(self.row_pool):
+            index = self.first_row + i
+            if i < self.visible_rows and index < total:
+                self.fill_row(row, index)
+                if not row["visible"]:
+                    row["frame"].place(x=0, y=i * (self.row_height + self.row_spacing),
+                                       relwidth=1, height=self.row_height)
+                    row["visible"] = True
+            elif row["visible"]:
+                row["frame"].place_forget()
+                row["visible"] = False
+        
+        # Map the visible window onto the scrollbar
+        if total > 0:
+            self.scrollbar.set(self.first_row / total,
+                               min(1.0, (self.first_row + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def apply_snapshot(self, snapshot):
+        # Snapshots taken while process collection was paused carry no processes
+        if snapshot.processes is None:
+            return
+        self.snapshot = snapshot
+        if self.active:
+            self.update_processes()
+
+    def set_active(self, active):
+        # Hidden views do no rendering; the scheduler resumes collection
+        # and a fresh snapshot follows when the tab is shown again
+        self.active = active
+        if active:
+            self.update_processes()
 
     def update_processes(self):
-        # Clear existing process widgets
-        for widget in self.process_container.winfo_children():
-            widget.destroy()
+        if self.snapshot is None:
+            return
         
         try:
-            # Get process information
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info',
-                                          'status', 'create_time']):
-                try:
-                    info = proc.info
-                    memory = get_size(info['memory_info'].rss)
-                    created = datetime.fromtimestamp(info['create_time']).strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    processes.append({
-                        'pid': info['pid'],
-                        'name': info['name'],
-                        'cpu': info['cpu_percent'],
-                        'memory': memory,
-                        'memory_raw': info['memory_info'].rss,
-                        'status': info['status'],
-                        'created': created
-                    })
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
+            limit = None if self.process_limit == "All" else int(self.process_limit)
             
-            # Sort processes
-            if self.sort_by == "cpu":
-                processes.sort(key=lambda x: x['cpu'], reverse=self.sort_reverse)
-            elif self.sort_by == "memory":
-                processes.sort(key=lambda x: x['memory_raw'], reverse=self.sort_reverse)
-            elif self.sort_by == "name":
-                processes.sort(key=lambda x: x['name'].lower(), reverse=self.sort_reverse)
-            elif self.sort_by == "pid":
-                processes.sort(key=lambda x: x['pid'], reverse=self.sort_reverse)
+            # Apply the current search over all processes before limiting
+            matches = None
+            if self.search_terms:
+                self.search_index.update(self.snapshot.processes)
+                matches = self.search_index.search(self.search_terms)
             
-            # Apply process limit
-            if self.process_limit != "All":
-                processes = processes[:int(self.process_limit)]
+            if self.tree_mode:
+                processes = self.tree_order(limit, matches)
+            else:
+                # Sort on the columns; only the rows shown are looked up
+                columns = self.snapshot.process_columns
+                rows = columns.rows_for_pids(matches) if matches is not None else None
+                order = columns.order(self.sort_by, self.sort_reverse, limit, rows)
+                processes = [self.snapshot.processes[pid] for pid in columns.pid[order].tolist()]
+                self.tree_rows = []
             
             # Display processes
-            for proc in processes:
-                self.create_process_row(proc)
+            self.processes = processes
+            with self.engine.instruments.measure("processes: render rows"):
+                self.render_rows()
             
             # Update process count label
-            total_processes = len(psutil.pids())
+            total_processes = len(self.snapshot.processes)
             shown_processes = len(processes)
             self.process_count_label.configure(
                 text=f"Showing {shown_processes} of {total_processes} processes"
             )
             
         except Exception as e:
-            error_label = ctk.CTkLabel(self.process_container, 
-                                     text=f"Error updating processes: {str(e)}")
-            error_label.pack(pady=10)
+            self.process_count_label.configure(text=f"Error updating processes: {str(e)}")
 
-    def select_process(self, event, process):
-        # Deselect all other frames
-        for widget in self.process_container.winfo_children():
-            widget.configure(fg_color=("gray86", "gray17"))
-            for child in widget.winfo_children():
-                child.configure(fg_color=("gray86", "gray17"))
+    def tree_order(self, limit, matches):
+        processes = self.snapshot.processes
+        with self.engine.instruments.measure("processes: tree update"):
+            self.tree.update(processes)
         
-        # Select clicked frame
-        event.widget.master.configure(fg_color=("gray76", "gray27"))
-        for child in event.widget.master.winfo_children():
-            child.configure(fg_color=("gray76", "gray27"))
+        # Forget collapsed processes that exited
+        self.collapsed = {key for key in self.collapsed
+                          if key[0] in processes and processes[key[0]].create_time == key[1]}
+        collapsed = {pid for pid, create_time in self.collapsed}
         
-        self.selected_pid = process['pid']
+        # Matches are shown with their ancestors, so they keep their place
+        include = self.tree.with_ancestors(matches) if matches is not None else None
+        self.tree_rows = self.tree.rows(self.sort_by, self.sort_reverse, collapsed, include, limit)
+        return [processes[pid] for pid, depth, children in self.tree_rows]
+
+    def select_process(self, event, index):
+        # Click selects one process, Ctrl-click toggles, Shift-click extends
+        index += self.first_row
+        if index >= len(self.processes):
+            return
+        process = self.processes[index]
+        key = (process.pid, process.create_time)
+        if event.state & 0x1 and self.anchor_row is not None:
+            first, last = sorted((self.anchor_row, index))
+            self.selected.update((p.pid, p.create_time) for p in self.processes[first:last + 1])
+        elif event.state & 0x4:
+            if key in self.selected:
+                self.selected.discard(key)
+            else:
+                self.selected.add(key)
+            self.anchor_row = index
+        else:
+            self.selected = {key}
+            self.anchor_row = index
+        self.render_rows()
+        self.show_details(key)
+
+    def select_matches(self):
+        if not self.search_terms or self.snapshot is None:
+            self.action_label.configure(text="Search first, then select the matches")
+            return
+        processes = self.snapshot.processes
+        self.search_index.update(processes)
+        self.selected = {(pid, processes[pid].create_time)
+                         for pid in self.search_index.search(self.search_terms) if pid in processes}
+        self.action_label.configure(text=f"Selected {len(self.selected)} matching processes")
+        self.render_rows()
+
+    def create_details_pane(self):
+        self.details = ProcessDetails()
+        self.details_frame = ctk.CTkFrame(self)
+        self.details_title = ctk.CTkLabel(self.details_frame, text="Select a process",
+                                          font=("Arial", 12, "bold"), anchor="w")
+        self.details_title.pack(fill="x", padx=5)
+        tabs = ctk.CTkTabview(self.details_frame, height=240)
+        tabs.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        for name, (label, formatter, ttl) in ATTRIBUTES.items():
+            box = ctk.CTkTextbox(tabs.add(label), font=("Courier", 11), wrap="none")
+            box.pack(fill="both", expand=True)
+            box.configure(state="disabled")
+            self.detail_boxes[name] = box
+        self.after(self.detail_refresh, self.refresh_details)
+
+    def toggle_details(self):
+        if self.details_frame is None:
+            self.create_details_pane()
+        self.details_visible = not self.details_visible
+        if self.details_visible:
+            self.details_frame.pack(fill="x", padx=5, pady=(0, 5), after=self.action_label)
+            target, self.detail_target = self.detail_target, None
+            if target is not None:
+                self.show_details(target)
+        else:
+            self.details_frame.pack_forget()
+            self.details.cancel()
+
+    def show_details(self, target):
+        if not self.details_visible:
+            self.detail_target = target
+            return
+        if target != self.detail_target:
+            self.detail_target = target
+            self.detail_shown = {}
+            process = self.snapshot.processes.get(target[0]) if self.snapshot else None
+            name = process.name if process is not None else ""
+            self.details_title.configure(text=f"{name} (PID {target[0]})")
+            for box in self.detail_boxes.values():
+                self.set_box_text(box, "Loading...")
+        self.details.request(target, self.post_detail)
+
+    def post_detail(self, target, detail):
+        # Called from a details worker
+        self.pump.call(self.apply_detail, target, detail)
+
+    def apply_detail(self, target, detail):
+        if target != self.detail_target or self.detail_shown.get(detail.name) is detail:
+            return
+        self.detail_shown[detail.name] = detail
+        if detail.error:
+            text = f"Unavailable: {detail.error}"
+        else:
+            fetched = time.strftime("%H:%M:%S", time.localtime(detail.fetched_at))
+            header = f"{detail.count} entries"
+            if detail.count > len(detail.lines):
+                header += f", first {len(detail.lines)} shown"
+            text = f"{header} (as of {fetched})\n\n" + "\n".join(detail.lines)
+        self.set_box_text(self.detail_boxes[detail.name], text)
+
+    def set_box_text(self, box, text):
+        box.configure(state="normal")
+        box.delete("1.0", "end")
+        box.insert("1.0", text)
+        box.configure(state="disabled")
+
+    def refresh_details(self):
+        # Expired attributes are fetched again while the pane is on screen
+        if self.details_visible and self.active and self.detail_target is not None:
+            self.details.request(self.detail_target, self.post_detail)
+        self.after(self.detail_refresh, self.refresh_details)
+
+    def destroy(self):
+        if self.details is not None:
+            self.details.shutdown()
+        super().destroy()
 
     def end_selected_process(self):
-        if hasattr(self, 'selected_pid'):
-            try:
-                psutil.Process(self.selected_pid).terminate()
-                self.update_processes()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
+        self.run_action("terminate")
+
+    def apply_selected_action(self):
+        label = self.action_combobox.get()
+        action = next((name for name, text in ACTIONS.items() if text == label), None)
+        if action is not None:
+            self.run_action(action)
+
+    def run_action(self, action):
+        targets = sorted(self.selected)
+        if not targets:
+            self.action_label.configure(text="Select processes first")
+            return
+        try:
+            value = parse_value(action, self.action_value.get())
+        except ValueError as e:
+            self.action_label.configure(text=f"Invalid value for {ACTIONS[action]}: {e}")
+            return
+        
+        self.action_label.configure(text=f"{ACTIONS[action]}: {len(targets)} processes...")
+        
+        def run():
+            results = self.actions.run(action, targets, value)
+            self.pump.call(self.show_action_results, action, targets, results)
+        
+        threading.Thread(target=run, daemon=True).start()
+
+    def show_action_results(self, action, targets, results):
+        # The label summarizes failures; one line per PID would flood the
+        # console on a bulk kill
+        failed = [result for result in results if not result.ok]
+        text = f"{ACTIONS[action]}: {len(results) - len(failed)} done, {len(failed)} failed"
+        if failed:
+            text += " (" + ", ".join(f"{r.pid}: {r.message}" for r in failed[:3])
+            text += ", ...)" if len(failed) > 3 else ")"
+        self.action_label.configure(text=text)
+        
+        # Patch the rows on screen; the next snapshot brings the full picture
+        done = {target for target, result in zip(targets, results) if result.ok}
+        if action in ("terminate", "kill"):
+            self.selected -= done
+            keep = [i for i, process in enumerate(self.processes)
+                    if (process.pid, process.create_time) not in done]
+            if len(keep) != len(self.processes):
+                if self.tree_rows:
+                    self.tree_rows = [self.tree_rows[i] for i in keep]
+                self.processes = [self.processes[i] for i in keep]
+        elif action in ("suspend", "resume"):
+            status = "stopped" if action == "suspend" else "running"
+            self.processes = [process._replace(status=status)
+                              if (process.pid, process.create_time) in done else process
+                              for process in self.processes]
+        self.render_rows()
 
     def filter_processes(self, event=None):
-        search_text = self.search_entry.get().lower()
-        for frame in self.process_container.winfo_children():
-            # Get process name from the second frame (name column)
-            process_name = frame.winfo_children()[1].winfo_children()[0].cget("text").lower()
-            if search_text in process_name:
-                frame.pack(fill="x", pady=1)
-            else:
-                frame.pack_forget()
+        # Debounce keystrokes so typing a word filters once
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(self.search_delay, self.apply_search)
+
+    def apply_search(self):
+        self.search_job = None
+        self.search_terms = parse_query(self.search_entry.get())
+        self.first_row = 0
+        self.update_processes()
+
+    def toggle_expanded(self, index):
+        index += self.first_row
+        if index >= len(self.tree_rows) or not self.tree_rows[index][2]:
+            return
+        process = self.processes[index]
+        key = (process.pid, process.create_time)
+        if key in self.collapsed:
+            self.collapsed.discard(key)
+        else:
+            self.collapsed.add(key)
+        self.update_processes()
+
+    def toggle_tree(self):
+        self.tree_mode = bool(self.tree_switch.get())
+        self.first_row = 0
+        self.update_processes()
+
+    def toggle_io_columns(self):
+        self.io_columns = bool(self.io_switch.get())
+        self.engine.set_process_io(self.io_columns)
+        
+        for col, config in self.columns.items():
+            if config.get("io"):
+                if self.io_columns:
+                    self.header_cells[col].pack(side="left", padx=1)
+                else:
+                    self.header_cells[col].pack_forget()
+        for row in self.row_pool:
+            for cell in row["cells"][self.base_columns:]:
+                if self.io_columns:
+                    cell.pack(side="left", padx=1)
+                else:
+                    cell.pack_forget()
+            if self.io_columns:
+                # Rows created while the columns were hidden get their cells now
+                for config in list(self.columns.values())[len(row["cells"]):]:
+                    self.add_cell(row, config)
+        
+        sorts = [choice for choice in SORT_CHOICES if self.io_columns or choice not in IO_SORTS]
+        self.sort_combobox.configure(values=sorts)
+        if self.sort_combobox.get() not in sorts:
+            self.sort_combobox.set("CPU")
+            self.sort_by = "cpu"
+        self.update_processes()
 
     def change_sort(self, choice):
-        self.sort_by = choice.lower()
+        self.sort_by = SORT_CHOICES[choice]
         self.update_processes()
 
     def change_process_limit(self, choice):
@@ -2,21 +2,38 @@ import customtkinter as ctk
 import platform
 import psutil
 import os
-import wmi
+import threading
 from datetime import datetime
 
 class SystemInfoFrame(ctk.CTkFrame):
-    def __init__(self, master):
+    def __init__(self, master, engine, pump):
         super().__init__(master)
-        
-        try:
-            self.wmi = wmi.WMI()
-        except Exception:
-            self.wmi = None
+
+        self.engine = engine
+        self.pump = pump
+        self.active = True
+        self.wmi = None
+        self.value_widgets = {}
 
         self.grid_columnconfigure(1, weight=1)
         self.create_system_info()
 
+    def connect_wmi(self):
+        # WMI is slow to import and connect, so this runs on the probe thread;
+        # COM has to be initialized on every thread that uses it
+        if os.name != 'nt':
+            return None
+        try:
+            import pythoncom
+            import wmi
+            pythoncom.CoInitialize()
+            return wmi.WMI()
+        except Exception:
+            return None
+
+    def set_active(self, active):
+        self.active = active
+
     def get_processor_info(self):
         try:
             if self.wmi:
@@ -95,7 +112,13 @@ class SystemInfoFrame(ctk.CTkFrame):
     def add_info_row(self, label, value, row):
         label_widget = ctk.CTkLabel(self, text=f"{label}:", anchor="e")
         label_widget.grid(row=row, column=0, padx=(10, 5), pady=5, sticky="e")
-        
+        self.set_info_value(row, value)
+
+    def set_info_value(self, row, value):
+        old_widget = self.value_widgets.pop(row, None)
+        if old_widget is not None:
+            old_widget.destroy()
+
         if "\n" in str(value):
             # For multiline values, create a text widget
             value_widget = ctk.CTkTextbox(self, height=60, width=300)
@@ -103,44 +126,39 @@ class SystemInfoFrame(ctk.CTkFrame):
             value_widget.configure(state="disabled")
         else:
             value_widget = ctk.CTkLabel(self, text=str(value), anchor="w", wraplength=300)
-        
+
         value_widget.grid(row=row, column=1, padx=(5, 10), pady=5, sticky="w")
+        self.value_widgets[row] = value_widget
+        self.engine.instruments.count_widgets()
 
     def create_system_info(self):
-        row = 0
-        
-        # Operating System Information
-        self.add_info_row("Operating System", self.get_os_info(), row)
-        row += 1
-        
-        # CPU Information
-        self.add_info_row("Processor", self.get_processor_info(), row)
-        row += 1
-        
-        # GPU Information
-        self.add_info_row("Graphics Card", self.get_gpu_info(), row)
-        row += 1
-        
-        # RAM Information
-        self.add_info_row("Memory (RAM)", self.get_ram_info(), row)
-        row += 1
-        
-        # Disk Information
-        self.add_info_row("Storage", self.get_disk_info(), row)
-        row += 1
-        
-        # Network Information
-        self.add_info_row("Network", self.get_network_info(), row)
-        row += 1
-        
-        # System Boot Time
-        self.add_info_row("System Boot Time", self.get_boot_time(), row)
-        row += 1
+        # Rows show placeholders right away; the probes (WMI in particular)
+        # can take seconds, so they run on a worker thread
+        self.probes = [
+            ("Operating System", self.get_os_info),
+            ("Processor", self.get_processor_info),
+            ("Graphics Card", self.get_gpu_info),
+            ("Memory (RAM)", self.get_ram_info),
+            ("Storage", self.get_disk_info),
+            ("Network", self.get_network_info),
+            ("System Boot Time", self.get_boot_time),
+        ]
+        for row, (label, probe) in enumerate(self.probes):
+            self.add_info_row(label, "Loading...", row)
+
+        threading.Thread(target=self.run_probes, daemon=True).start()
+
+    def run_probes(self):
+        self.wmi = self.connect_wmi()
+        for row, (label, probe) in enumerate(self.probes):
+            self.pump.call(self.set_info_value, row, probe())
 
         # Battery Information (if available)
         if hasattr(psutil, "sensors_battery"):
-            battery = psutil.sensors_battery()
+            try:
+                battery = psutil.sensors_battery()
+            except Exception:
+                battery = None
             if battery:
                 battery_status = f"{battery.percent}% {'(Plugged In)' if battery.power_plugged else '(On Battery)'}"
-                self.add_info_row("Battery", battery_status, row)
-                row += 1
\ No newline at end of file
+                self.pump.call(self.add_info_row, "Battery", battery_status, len(self.probes))
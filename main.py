@@ -1,68 +1,250 @@
-import customtkinter as ctk
-import psutil
-import platform
-from datetime import datetime
-import threading
 import time
-from pathlib import Path
-from components.system_info import SystemInfoFrame
-from components.process_manager import ProcessManagerFrame
-from components.performance import PerformanceFrame
-from components.optimization import OptimizationFrame
-from utils.system_utils import get_size
+STARTUP_TIME = time.perf_counter()
+
+import argparse
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+from functools import partial
+import customtkinter as ctk
+from utils.sample_scheduler import MAX_INTERVAL, MIN_INTERVAL
+from utils.startup_profiler import StartupProfiler
+from utils.ui_pump import UiPump
+from utils.view_scheduler import ViewScheduler
+
+# Tab name -> (module, frame class, needs process data). Modules are only
+# imported when their tab is first shown, so matplotlib and WMI stay out
+# of the startup path. The store, collector and exporter modules (which
+# pull in NumPy) are likewise imported where they are used, and the engine
+# builds its NumPy-backed parts on its own thread at the first sample.
+TABS = [
+    ("Processes", "components.process_manager", "ProcessManagerFrame", True),
+    ("Performance", "components.performance", "PerformanceFrame", False),
+    ("Optimization", "components.optimization", "OptimizationFrame", False),
+    ("System Info", "components.system_info", "SystemInfoFrame", False),
+    ("Overhead", "components.overhead", "OverheadFrame", False),
+]
 
-# Conditionally import WMI if on Windows
-if platform.system() == "Windows":
-    import wmi  # Ensure you have the wmi package installed
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".task_manager")
+
+def open_store(history_dir, profiler):
+    # History on disk is optional; without it only the live window shows
+    if history_dir is None:
+        return None
+    with profiler.measure("metric store"):
+        from utils.metric_store import MetricStore
+        try:
+            return MetricStore(history_dir)
+        except OSError as e:
+            print(f"Error opening metric history: {e}")
+            return None
 
 class TaskManager(ctk.CTk):
-    def __init__(self):
+    def __init__(self, engine, profiler=None, fleet=None):
         super().__init__()
-        
+
+        self.profiler = profiler or StartupProfiler()
         self.title("Advanced Task Manager")
         self.geometry("1200x800")
-        
+
         # Set theme
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
-        
+
         # Create tabs
         self.tabview = ctk.CTkTabview(self)
         self.tabview.pack(expand=True, fill="both", padx=10, pady=10)
-        
-        # Add tabs
-        self.tab_processes = self.tabview.add("Processes")
-        self.tab_performance = self.tabview.add("Performance")
-        self.tab_optimization = self.tabview.add("Optimization")
-        self.tab_system = self.tabview.add("System Info")
-        
-        # Initialize components
-        self.process_frame = ProcessManagerFrame(self.tab_processes)
-        self.process_frame.pack(expand=True, fill="both", padx=10, pady=10)
-        
-        self.performance_frame = PerformanceFrame(self.tab_performance)
-        self.performance_frame.pack(expand=True, fill="both", padx=10, pady=10)
-        
-        self.optimization_frame = OptimizationFrame(self.tab_optimization)
-        self.optimization_frame.pack(expand=True, fill="both", padx=10, pady=10)
-        
-        self.system_frame = SystemInfoFrame(self.tab_system)
-        self.system_frame.pack(expand=True, fill="both", padx=10, pady=10)
-        
-        # Start update thread
-        self.update_thread = threading.Thread(target=self.update_loop, daemon=True)
-        self.update_thread.start()
-    
-    def update_loop(self):
-        while True:
-            try:
-                # Use manual_refresh instead of update_processes
-                self.process_frame.manual_refresh(0)
-                self.performance_frame.update_metrics()
-                time.sleep(1)
-            except Exception as e:
-                print(f"Error in update loop: {e}")
+
+        # Shared sampling engine (or a client of a collector daemon) feeding
+        # every tab; results reach the widgets only through the UI pump
+        # running on the Tk thread
+        self.engine = engine
+        self.pump = UiPump(self)
+
+        # Only the visible tab renders; process collection follows the
+        # Processes tab and a minimized window samples at a low rate. Each
+        # tab's frame is built the first time the tab is shown.
+        self.frames = {}
+        self.scheduler = ViewScheduler(self, self.tabview, self.engine,
+                                       active_interval=engine.interval,
+                                       idle_interval=max(5.0, engine.interval))
+        for tab, module_name, class_name, needs_processes in TABS:
+            self.tabview.add(tab)
+            self.scheduler.register(
+                tab,
+                factory=partial(self.build_tab, tab, module_name, class_name),
+                needs_processes=needs_processes,
+            )
+
+        # Remote collectors get one extra tab fed by the fleet client
+        self.fleet = fleet
+        if fleet is not None:
+            self.tabview.add("Fleet")
+            self.scheduler.register(
+                "Fleet",
+                factory=partial(self.build_tab, "Fleet", "components.fleet", "FleetFrame", fleet),
+            )
+        with self.profiler.measure("Processes: first activation"):
+            self.scheduler.update()
+
+        # Start sampling
+        self.pump.start()
+        self.engine.start()
+        if self.fleet is not None:
+            self.fleet.start()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after_idle(self.on_first_paint)
+
+    def build_tab(self, tab, module_name, class_name, source=None):
+        with self.profiler.measure(f"{tab}: import"):
+            frame_class = getattr(importlib.import_module(module_name), class_name)
+        with self.profiler.measure(f"{tab}: construct"):
+            frame = frame_class(self.tabview.tab(tab), source or self.engine, self.pump)
+            frame.pack(expand=True, fill="both", padx=10, pady=10)
+        self.frames[tab] = frame
+        return frame
+
+    def on_first_paint(self):
+        self.profiler.mark("first paint")
+        self.profiler.report()
+
+    def on_close(self):
+        self.engine.stop()
+        if self.fleet is not None:
+            self.fleet.stop()
+        self.pump.stop()
+        self.destroy()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Advanced Task Manager")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import and construction time per component")
+    parser.add_argument("--history-dir", default=os.path.join(DATA_DIR, "history"),
+                        help="directory of the on-disk metric history")
+    parser.add_argument("--no-history", action="store_true",
+                        help="do not record metric history to disk")
+    parser.add_argument("--headless", action="store_true",
+                        help="run only the collector and serve it on --socket")
+    parser.add_argument("--socket", default=os.path.join(DATA_DIR, "collector.sock"),
+                        help="Unix socket of the headless collector")
+    parser.add_argument("--attach", nargs="?", const="", default=None, metavar="SOCKET",
+                        help="show a running collector instead of sampling locally")
+    parser.add_argument("--listen", metavar="HOST:PORT",
+                        help="with --headless, also serve collectors over TCP")
+    parser.add_argument("--fleet", nargs="+", metavar="HOST:PORT",
+                        help="add a Fleet tab following these collectors over TCP")
+    parser.add_argument("--interval", type=float, default=1.0, metavar="SECONDS",
+                        help=f"time between samples, {MIN_INTERVAL:g} to {MAX_INTERVAL:g} s")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="sample faster under load and slower while idle")
+    parser.add_argument("--overhead-budget", type=float, default=2.0, metavar="PERCENT",
+                        help="most CPU sampling may use, as a percentage of one core")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve Prometheus metrics on http://HOST:PORT/metrics")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="address the metrics endpoint binds to")
+    parser.add_argument("--metrics-processes", type=int, default=10, metavar="N",
+                        help="export the top N processes by CPU and by memory (0 for none)")
+    args = parser.parse_args()
+    if not MIN_INTERVAL <= args.interval <= MAX_INTERVAL:
+        parser.error(f"--interval must be between {MIN_INTERVAL:g} and {MAX_INTERVAL:g} seconds")
+    return args
+
+def run_headless(args, profiler):
+    """Sample and serve snapshots until interrupted, without any window"""
+    from utils.collector_server import CollectorServer, parse_address
+
+    engine = create_engine(args, profiler)
+    exporter = start_exporter(args, engine)
+    listen = parse_address(args.listen) if args.listen else None
+    # Platforms without Unix sockets can still serve over TCP
+    path = args.socket if hasattr(socket, "AF_UNIX") or listen is None else None
+    server = CollectorServer(engine, path, listen=listen)
+    server.start()
+    engine.start()
+    for address in server.addresses:
+        if not isinstance(address, str):
+            address = f"{address[0]}:{address[1]}"
+        print(f"Collector listening on {address}")
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    try:
+        # Waiting in short steps keeps Ctrl+C responsive
+        while not stopped.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        server.stop()
+        engine.stop()
+        scheduler = engine.scheduler
+        print(f"Sampling used {scheduler.overhead * 100:.2f}% of one core "
+              f"at {scheduler.interval:.2f} s intervals")
+
+def start_exporter(args, engine):
+    """Start the /metrics endpoint if asked for; returns it or None"""
+    if args.metrics_port is None:
+        return None
+    from utils.metrics_exporter import MetricsExporter
+
+    exporter = MetricsExporter(engine, (args.metrics_host, args.metrics_port),
+                               process_limit=args.metrics_processes)
+    exporter.start()
+    # Per-process series need a process table on every tick, not only
+    # while the Processes tab is showing; an attached viewer asks its
+    # collector for that
+    if args.metrics_processes > 0:
+        engine.pin_processes(True)
+    print(f"Metrics on http://{exporter.address[0]}:{exporter.address[1]}/metrics")
+    return exporter
+
+def create_engine(args, profiler):
+    with profiler.measure("sampling engine: import"):
+        from utils.sampling import SamplingEngine
+    # The store is opened by the engine's first tick, off the Tk thread
+    return SamplingEngine(interval=args.interval,
+                          store_factory=partial(open_store, history_dir(args), profiler),
+                          adaptive=args.adaptive, overhead_budget=args.overhead_budget / 100)
+
+def history_dir(args):
+    return None if args.no_history else args.history_dir
 
 if __name__ == "__main__":
-    app = TaskManager()
-    app.mainloop()
\ No newline at end of file
+    args = parse_args()
+    profiler = StartupProfiler(enabled=args.profile_startup, start=STARTUP_TIME)
+    profiler.mark("core imports")
+
+    if args.headless:
+        try:
+            run_headless(args, profiler)
+        except OSError as e:
+            sys.exit(f"Error starting collector: {e}")
+        sys.exit(0)
+
+    if args.attach is not None:
+        from utils.remote_engine import RemoteEngine
+        engine = RemoteEngine(args.attach or args.socket)
+        try:
+            engine.start()
+        except OSError as e:
+            sys.exit(f"Error attaching to collector: {e}")
+    else:
+        engine = create_engine(args, profiler)
+
+    try:
+        start_exporter(args, engine)
+    except OSError as e:
+        sys.exit(f"Error starting metrics endpoint: {e}")
+
+    fleet = None
+    if args.fleet:
+        from utils.fleet import FleetClient
+        fleet = FleetClient(args.fleet)
+    app = TaskManager(engine, profiler, fleet)
+    app.mainloop()
@@ -0,0 +1,97 @@
+# tests/test_collector_server.py
+import time
+
+import pytest
+
+from utils.collector_server import CollectorServer
+from utils.remote_engine import RemoteEngine
+from utils.sampling import SamplingEngine
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def collector(tmp_path):
+    engine = SamplingEngine()
+    server = CollectorServer(engine, str(tmp_path / "collector.sock"))
+    server.start()
+    viewers = []
+
+    def attach(processes=False):
+        viewer = RemoteEngine(server.path)
+        # As with the Processes tab hidden
+        viewer.set_collect_processes(processes)
+        viewer.start()
+        viewers.append(viewer)
+        return viewer
+
+    yield engine, server, attach
+    for viewer in viewers:
+        viewer.stop()
+    server.stop()
+
+
+def test_collection_follows_viewers(collector):
+    engine, server, attach = collector
+    assert not engine.collect_process_data
+    viewer = attach(processes=True)
+    assert engine.collect_process_data
+    viewer.set_collect_processes(False)
+    wait_for(lambda: not engine.collect_process_data)
+
+
+def test_exporter_pin_survives_a_viewer(collector):
+    engine, server, attach = collector
+    # The headless collector's own exporter
+    engine.pin_processes(True)
+    assert engine.collect_process_data
+
+    viewer = attach()
+    assert engine.collect_process_data
+    assert engine.sample().process_columns is not None
+
+    viewer.pin_processes(True)
+    viewer.pin_processes(False)
+    viewer.stop()
+    wait_for(lambda: not server.connections)
+    assert engine.collect_process_data
+
+    engine.pin_processes(False)
+    assert not engine.collect_process_data
+    assert engine.sample().processes is None
+
+
+def test_viewer_pins_are_released_on_detach(collector):
+    engine, server, attach = collector
+    first = attach()
+    second = attach()
+    first.pin_processes(True)
+    second.pin_processes(True)
+    wait_for(lambda: engine.collect_process_data)
+
+    first.stop()
+    wait_for(lambda: len(server.connections) == 1)
+    assert engine.collect_process_data
+    second.stop()
+    wait_for(lambda: not engine.collect_process_data)
+
+
+def test_pins_are_counted():
+    engine = SamplingEngine()
+    engine.set_collect_processes(False)
+    engine.pin_processes(True)
+    engine.pin_processes(True)
+    engine.pin_processes(False)
+    assert engine.collect_process_data
+    engine.pin_processes(False)
+    assert not engine.collect_process_data
+    # An extra release does not eat a later pin
+    engine.pin_processes(False)
+    engine.pin_processes(True)
+    assert engine.collect_process_data
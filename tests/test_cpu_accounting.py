@@ -0,0 +1,75 @@
+# tests/test_cpu_accounting.py
+import pytest
+
+from utils.cpu_accounting import NO_IO, CpuAccountant
+from utils.proc_reader import ProcessRecord
+
+
+def record(pid, cpu_time, create_time=1000.0, read_bytes=0, write_bytes=0, syscalls=0):
+    return ProcessRecord(pid=pid, name="proc", create_time=create_time, cpu_time=cpu_time,
+                         memory_raw=0, status="sleeping", ppid=1, read_bytes=read_bytes,
+                         write_bytes=write_bytes, syscalls=syscalls)
+
+
+def test_percent_is_cpu_time_over_elapsed():
+    accountant = CpuAccountant()
+    percents, rates = accountant.update({1: record(1, 10.0)}, elapsed=2.0)
+    assert percents == {1: 0.0}
+    assert rates == {}
+    percents, rates = accountant.update({1: record(1, 11.5)}, elapsed=2.0)
+    assert percents[1] == pytest.approx(75.0)
+
+
+def test_reused_pid_starts_a_new_window():
+    accountant = CpuAccountant()
+    accountant.update({7: record(7, 500.0)}, elapsed=1.0)
+    # Same PID, another process: its cpu time is not a delta of the old one
+    percents, rates = accountant.update({7: record(7, 0.2, create_time=2000.0)}, elapsed=1.0)
+    assert percents[7] == 0.0
+    percents, rates = accountant.update({7: record(7, 0.7, create_time=2000.0)}, elapsed=1.0)
+    assert percents[7] == pytest.approx(50.0)
+
+
+def test_exited_pid_is_forgotten():
+    accountant = CpuAccountant()
+    accountant.update({3: record(3, 5.0)}, elapsed=1.0)
+    accountant.update({}, elapsed=1.0)
+    # Back with the same identity after a gap: no delta against stale state
+    percents, rates = accountant.update({3: record(3, 9.0)}, elapsed=1.0)
+    assert percents[3] == 0.0
+
+
+def test_counter_going_backwards_and_zero_elapsed_report_zero():
+    accountant = CpuAccountant()
+    accountant.update({1: record(1, 5.0)}, elapsed=1.0)
+    percents, rates = accountant.update({1: record(1, 4.0)}, elapsed=1.0)
+    assert percents[1] == 0.0
+    percents, rates = accountant.update({1: record(1, 8.0)}, elapsed=0.0)
+    assert percents[1] == 0.0
+
+
+def test_io_rates_share_the_per_process_state():
+    accountant = CpuAccountant()
+    first = {1: record(1, 1.0, read_bytes=1000, write_bytes=0, syscalls=10)}
+    percents, rates = accountant.update(first, elapsed=2.0, io=True)
+    assert rates == {1: NO_IO}
+    second = {1: record(1, 2.0, read_bytes=5000, write_bytes=2048, syscalls=30)}
+    percents, rates = accountant.update(second, elapsed=2.0, io=True)
+    assert percents[1] == pytest.approx(50.0)
+    assert rates[1] == pytest.approx((2000.0, 1024.0, 10.0))
+
+    # Reuse resets I/O counters too
+    reused = {1: record(1, 0.0, create_time=2000.0, read_bytes=10, syscalls=1)}
+    percents, rates = accountant.update(reused, elapsed=2.0, io=True)
+    assert rates[1] == NO_IO
+
+
+def test_io_turned_on_later_starts_from_zero():
+    accountant = CpuAccountant()
+    accountant.update({1: record(1, 1.0, read_bytes=100)}, elapsed=1.0)
+    # The previous update kept no counters, so there is nothing to diff
+    percents, rates = accountant.update({1: record(1, 2.0, read_bytes=900)}, elapsed=1.0, io=True)
+    assert percents[1] == pytest.approx(100.0)
+    assert rates[1] == NO_IO
+    percents, rates = accountant.update({1: record(1, 2.0, read_bytes=1900)}, elapsed=1.0, io=True)
+    assert rates[1] == pytest.approx((1000.0, 0.0, 0.0))
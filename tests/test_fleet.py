@@ -0,0 +1,83 @@
+# tests/test_fleet.py
+import threading
+import time
+
+import pytest
+
+from benchmarks.fleet_standin import StandInEngine
+from utils.collector_server import CollectorServer
+from utils.fleet import FleetClient, HostStatus, is_stale
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class Ticker:
+    """Ticks a stand-in engine until paused, like a collector's sampling loop"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.running = threading.Event()
+        self.stopped = threading.Event()
+        self.running.set()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped.wait(self.engine.interval):
+            if self.running.is_set():
+                self.engine.tick()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+@pytest.fixture
+def standin():
+    engine = StandInEngine(process_count=20, interval=0.05)
+    server = CollectorServer(engine, listen=("127.0.0.1", 0))
+    server.start()
+    ticker = Ticker(engine)
+    host, port = server.addresses[0][:2]
+    yield f"{host}:{port}", ticker
+    ticker.stop()
+    server.stop()
+
+
+def status(updated, stale_after=1.0):
+    return HostStatus("host", True, None, None, updated, stale_after)
+
+
+def test_is_stale():
+    assert not is_stale(status(None), now=100.0)
+    assert not is_stale(status(99.5), now=100.0)
+    assert is_stale(status(98.5), now=100.0)
+
+
+def test_silent_host_goes_stale_and_reconnects(standin):
+    endpoint, ticker = standin
+    fleet = FleetClient([endpoint], interval=0.05, stale_intervals=4)
+    fleet.start()
+    try:
+        host = fleet.hosts[0]
+        wait_for(lambda: host.connected and host.snapshot is not None)
+        # The limit follows the collector's own interval
+        assert host.stale_after == pytest.approx(0.2)
+        assert not is_stale(host.status())
+
+        # The peer stops sending but keeps the socket open, as a frozen VM
+        # or a NAT that dropped the mapping would
+        ticker.running.clear()
+        wait_for(lambda: is_stale(host.status()))
+        wait_for(lambda: host.error is not None and "no data" in host.error)
+
+        ticker.running.set()
+        wait_for(lambda: host.connected and not is_stale(host.status()))
+    finally:
+        fleet.stop()
@@ -0,0 +1,109 @@
+# tests/test_gpu_telemetry.py
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+import benchmarks
+from utils.gpu_telemetry import GpuTelemetry, parse_line
+
+FAKE_NVIDIA_SMI = os.path.join(os.path.dirname(benchmarks.__file__), "fake_nvidia_smi.py")
+
+
+def fake_command(*args):
+    return [sys.executable, FAKE_NVIDIA_SMI, *args]
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def telemetry():
+    started = []
+
+    def start(**kwargs):
+        gpu = GpuTelemetry(**kwargs)
+        started.append(gpu)
+        gpu.start()
+        return gpu
+
+    yield start
+    for gpu in started:
+        gpu.stop()
+
+
+def test_parse_line():
+    sample = parse_line("1, NVIDIA A100-SXM4-40GB, 37, 10240, 40960, 61\n")
+    assert (sample.index, sample.name, sample.temperature) == (1, "NVIDIA A100-SXM4-40GB", 61.0)
+    assert sample.load == pytest.approx(0.37)
+    assert sample.memory_util == pytest.approx(0.25)
+    assert (sample.memory_used, sample.memory_total) == (10240.0, 40960.0)
+
+    unknown = parse_line("0, Tesla K80, [N/A], [N/A], [N/A], [Not Supported]")
+    assert unknown.load is unknown.memory_util is unknown.memory_used is None
+    assert unknown.memory_total is unknown.temperature is None
+    assert parse_line("0, Tesla K80, 5, 100, 0, 30").memory_util is None
+
+    assert parse_line("index, name, utilization.gpu [%], memory.used [MiB]") is None
+    assert parse_line("x, GPU, 1, 2, 3, 4") is None
+    assert parse_line("") is None
+
+
+def test_readings_and_series(telemetry):
+    gpu = telemetry(interval=0.05, command=fake_command("--gpus", "2", "--blocks", "3",
+                                                       "--unknown", "1", "--loop-ms=50"),
+                    backoff_initial=60.0)
+    wait_for(lambda: gpu.retry_at is not None)
+    assert gpu.available is True and gpu.failures == 0
+
+    first, second = gpu.latest()
+    assert (first.index, first.name) == (0, "Fake GPU 0")
+    assert first.load == pytest.approx(0.20)
+    assert first.memory_used == 1200.0 and first.temperature == 42.0
+    assert second.load is None and second.memory_util is None and second.temperature is None
+
+    np.testing.assert_allclose(gpu.series(0, "load", 10), [0.0, 10.0, 20.0])
+    np.testing.assert_allclose(gpu.series(0, "memory", 2), [1100 / 81.92, 1200 / 81.92])
+    # Unreported readings stay out of the series instead of reading 0%
+    assert np.isnan(gpu.series(1, "load", 10)).all()
+    assert len(gpu.series(1, "load", 10)) == 3
+    assert len(gpu.series(7, "load", 10)) == 0
+
+
+def test_readings_go_stale(telemetry):
+    gpu = telemetry(interval=0.05, command=fake_command("--blocks", "1"),
+                    backoff_initial=60.0, stale_after=0.2)
+    wait_for(lambda: gpu.retry_at is not None)
+    assert len(gpu.latest()) == 2
+    wait_for(lambda: gpu.latest() == ())
+
+
+def test_exited_tool_is_restarted(telemetry):
+    gpu = telemetry(interval=0.05, command=fake_command("--gpus", "1", "--blocks", "1"),
+                    backoff_initial=0.05)
+    wait_for(lambda: len(gpu.series(0, "load", 10)) >= 3)
+    assert gpu.failures == 0
+
+
+def test_missing_binary_backs_off(telemetry):
+    gpu = telemetry(command=["/nonexistent/nvidia-smi"], backoff_initial=60.0)
+    wait_for(lambda: gpu.failures == 1)
+    assert gpu.available is False
+    assert gpu.retry_at - time.monotonic() > 50
+    assert gpu.latest() == ()
+    assert len(gpu.series(0, "load", 10)) == 0
+
+
+def test_backoff_doubles_up_to_the_cap(telemetry):
+    gpu = telemetry(command=["/nonexistent/nvidia-smi"], backoff_initial=0.01, backoff_max=0.04)
+    # 0.01, 0.02, 0.04, 0.04, ...
+    wait_for(lambda: gpu.failures >= 5)
+    assert gpu.available is False
+    assert gpu.retry_at - time.monotonic() <= 0.04
@@ -0,0 +1,62 @@
+# tests/test_metric_analytics.py
+import numpy as np
+import pytest
+
+from utils.metric_analytics import ewma, rate, rolling_mean, summarize
+
+
+def naive_ewma(values, alpha):
+    result = []
+    for value in values:
+        result.append(value if not result else alpha * value + (1 - alpha) * result[-1])
+    return np.array(result)
+
+
+@pytest.mark.parametrize("alpha", [0.9, 0.3, 0.05, 0.001])
+def test_ewma_matches_the_recurrence(alpha):
+    values = np.random.default_rng(1).uniform(0, 100, 5000)
+    # Long enough for several closed-form blocks at every alpha
+    np.testing.assert_allclose(ewma(values, alpha), naive_ewma(values, alpha), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("magnitude", [1e-300, 1e9, 1e15, 1e300])
+def test_ewma_of_large_and_tiny_values(magnitude):
+    # Byte counters and memory in bytes: far beyond what the raw decay
+    # powers can be multiplied with
+    values = np.random.default_rng(3).uniform(-1, 1, 3000) * magnitude
+    with np.errstate(all="raise"):
+        result = ewma(values, 0.3)
+    np.testing.assert_allclose(result, naive_ewma(values, 0.3), rtol=1e-9, atol=1e-9 * magnitude)
+    np.testing.assert_allclose(ewma(np.full(3000, 1e9), 0.3), 1e9, rtol=1e-12)
+
+
+def test_ewma_edge_cases():
+    assert len(ewma([], 0.3)) == 0
+    np.testing.assert_array_equal(ewma([4.0], 0.3), [4.0])
+    np.testing.assert_array_equal(ewma([1.0, 2.0, 3.0], 1.0), [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(ewma([1.0, 2.0, 3.0], 1e-20), [1.0, 1.0, 1.0])
+    for alpha in (0, -0.5, float("nan")):
+        with pytest.raises(ValueError):
+            ewma([1.0, 2.0], alpha)
+
+
+def test_rolling_mean_matches_a_loop():
+    values = np.random.default_rng(2).uniform(0, 10, 200)
+    expected = [values[i:i + 7].mean() for i in range(len(values) - 6)]
+    np.testing.assert_allclose(rolling_mean(values, 7), expected)
+    assert len(rolling_mean(values[:3], 7)) == 0
+    assert len(rolling_mean(values, 0)) == 0
+
+
+def test_rate_skips_zero_intervals():
+    np.testing.assert_allclose(rate([0, 2, 2, 5], [0, 10, 12, 18]), [5.0, 0.0, 2.0])
+    assert len(rate([0], [1])) == 0
+
+
+def test_summarize():
+    assert summarize([], []) is None
+    stats = summarize([0.0, 1.0, 2.0, 3.0, 4.0], [1.0, 2.0, 3.0, 4.0, 5.0], alpha=0.5)
+    assert stats.count == 5
+    assert stats.mean == pytest.approx(3.0)
+    assert (stats.min, stats.max, stats.p50) == (1.0, 5.0, 3.0)
+    assert stats.ewma == pytest.approx(naive_ewma([1.0, 2.0, 3.0, 4.0, 5.0], 0.5)[-1])
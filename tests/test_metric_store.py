@@ -0,0 +1,112 @@
+# tests/test_metric_store.py
+import math
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import VirtualMemory
+from utils.metric_store import HOUR, MINUTE, RAW, MetricStore
+from utils.process_columns import ProcessColumns
+from utils.process_table import ProcessInfo
+from utils.sampling import Snapshot
+
+# An hour boundary recent enough that nothing written is past retention
+HOUR_START = (int(time.time()) // 3600 - 3) * 3600
+
+
+def snapshot(timestamp, cpu, temperature=None, process_columns=None):
+    memory = VirtualMemory(100, 50, cpu / 2, 50, 50)
+    return Snapshot(timestamp=timestamp, interval=1.0, cpu_percent=cpu, memory=memory, net_io=None,
+                    net_sent_speed=0.0, net_recv_speed=0.0, disk=None, temperature=temperature,
+                    battery=None, processes=None, process_changes=None, gpus=(),
+                    process_columns=process_columns)
+
+
+def columns(*rows):
+    processes = {pid: ProcessInfo(pid=pid, name=name, exe="", cmdline="", username="",
+                                  create_time=1000.0, created="", cpu=cpu, memory_raw=memory,
+                                  status="running", ppid=1, read_rate=0.0, write_rate=0.0,
+                                  syscall_rate=0.0)
+                 for pid, name, cpu, memory in rows}
+    return ProcessColumns.from_processes(processes)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetricStore(str(tmp_path), process_count=2, process_resolution=60)
+    yield store
+    store.close()
+
+
+def test_raw_samples_read_back(store):
+    for i in range(10):
+        store.append(snapshot(HOUR_START + i, float(i)))
+    times, values = store.query("cpu", HOUR_START, HOUR_START + 9, tier=RAW)
+    np.testing.assert_array_equal(times, HOUR_START + np.arange(10))
+    np.testing.assert_array_equal(values, np.arange(10.0))
+
+
+def test_closed_minutes_roll_up_to_averages(store):
+    # Two full minutes and the start of a third, every other second missing
+    # in the second minute
+    for i in range(125):
+        if 60 <= i < 120 and i % 2:
+            continue
+        store.append(snapshot(HOUR_START + i, float(i)))
+    times, values = store.query("cpu", HOUR_START, HOUR_START + 120, tier=MINUTE)
+    np.testing.assert_array_equal(times, [HOUR_START, HOUR_START + 60])
+    np.testing.assert_allclose(values, [np.mean(np.arange(60)), np.mean(np.arange(60, 120, 2))])
+
+
+def test_hour_rollup_keeps_min_avg_max(store):
+    samples = [float((i * 37) % 101) for i in range(600)]
+    for i, value in enumerate(samples):
+        store.append(snapshot(HOUR_START + i, value))
+    store.close()
+    for stat, expected in (("min", min(samples)), ("avg", np.mean(samples)), ("max", max(samples))):
+        times, values = store.query("cpu", HOUR_START, HOUR_START + 3599, stat=stat, tier=HOUR)
+        np.testing.assert_array_equal(times, [HOUR_START])
+        assert values[0] == pytest.approx(expected)
+
+
+def test_hour_row_is_updated_as_minutes_close(store):
+    for i in range(125):
+        store.append(snapshot(HOUR_START + i, float(i)))
+    # Still open: the hour so far covers the two closed minutes
+    for stat, expected in (("min", 0.0), ("avg", 59.5), ("max", 119.0)):
+        times, values = store.query("cpu", HOUR_START, HOUR_START + 3599, stat=stat, tier=HOUR)
+        np.testing.assert_array_equal(values, [expected])
+
+
+def test_missing_temperature_stays_missing(store):
+    for i in range(61):
+        store.append(snapshot(HOUR_START + i, 1.0))
+    times, values = store.query("temperature", HOUR_START, HOUR_START + 59, tier=MINUTE)
+    assert len(values) == 1 and math.isnan(values[0])
+
+
+def test_compaction_rolls_up_before_deleting_raw(store, tmp_path):
+    for i in range(120):
+        store.append(snapshot(HOUR_START + i, 10.0))
+    store.close()
+    store.compact(now=HOUR_START + RAW.retention + 2 * RAW.span)
+    assert store.segment_starts(RAW) == []
+    times, values = store.query("cpu", HOUR_START, HOUR_START + 119, tier=MINUTE)
+    np.testing.assert_array_equal(values, [10.0, 10.0])
+    times, values = store.query("cpu", HOUR_START, HOUR_START + 3599, stat="max", tier=HOUR)
+    np.testing.assert_array_equal(values, [10.0])
+
+
+def test_top_processes_once_per_resolution(store):
+    first = columns((10, "idle", 0.5, 100), (11, "busy", 70.0, 200), (12, "db", 20.0, 300))
+    second = columns((10, "idle", 90.0, 100), (12, "db", 5.0, 300))
+    store.append(snapshot(HOUR_START, 1.0, process_columns=first))
+    # Same minute: not written again
+    store.append(snapshot(HOUR_START + 30, 1.0, process_columns=second))
+    store.append(snapshot(HOUR_START + 60, 1.0, process_columns=second))
+    result = store.query_processes(HOUR_START, HOUR_START + 60)
+    assert [timestamp for timestamp, entries in result] == [HOUR_START, HOUR_START + 60]
+    assert [(pid, name) for pid, name, cpu, memory in result[0][1]] == [(11, "busy"), (12, "db")]
+    assert [(pid, name) for pid, name, cpu, memory in result[1][1]] == [(10, "idle"), (12, "db")]
+    assert result[0][1][0][2:] == (pytest.approx(70.0), 200.0)
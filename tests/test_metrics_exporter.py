@@ -0,0 +1,145 @@
+# tests/test_metrics_exporter.py
+import gzip
+import http.client
+
+import pytest
+
+from benchmarks.fixtures import FakeNetCounters, fake_gpus, fake_host
+from utils.metrics_exporter import OPENMETRICS_TYPE, PROMETHEUS_TYPE, MetricsExporter, escape_label
+from utils.process_columns import ProcessColumns
+from utils.process_table import ProcessInfo
+from utils.sampling import Snapshot
+
+
+class FakeEngine:
+    def __init__(self, snapshot=None):
+        self.latest = snapshot
+
+
+def process(pid, name, cpu, memory):
+    return ProcessInfo(pid=pid, name=name, exe="", cmdline="", username="", create_time=1000.0,
+                       created="", cpu=cpu, memory_raw=memory, status="running", ppid=1,
+                       read_rate=0.0, write_rate=0.0, syscall_rate=0.0)
+
+
+def snapshot(timestamp=1700000000.0, processes=None):
+    memory, disk, temperature, battery = fake_host(seed=1)
+    columns = ProcessColumns.from_processes(processes) if processes is not None else None
+    return Snapshot(timestamp=timestamp, interval=1.0, cpu_percent=12.5, memory=memory,
+                    net_io=FakeNetCounters()(), net_sent_speed=1.0, net_recv_speed=2.0, disk=disk,
+                    temperature=temperature, battery=battery, processes=None,
+                    process_changes=None, gpus=fake_gpus(1), process_columns=columns)
+
+
+def lines(body):
+    return body.decode("utf-8").splitlines()
+
+
+def test_prometheus_text():
+    exporter = MetricsExporter(FakeEngine(snapshot()))
+    text = lines(exporter.render())
+    assert "# TYPE taskmanager_network_bytes_total counter" in text
+    assert "# HELP taskmanager_network_bytes_total Bytes moved by all interfaces" in text
+    assert any(line.startswith('taskmanager_network_bytes_total{direction="sent"} ') for line in text)
+    assert "taskmanager_cpu_percent 12.5" in text
+    assert "# TYPE taskmanager_cpu_percent gauge" in text
+    assert "# EOF" not in text
+
+
+def test_openmetrics_names_counter_families_without_total():
+    exporter = MetricsExporter(FakeEngine(snapshot()))
+    text = lines(exporter.render(openmetrics=True))
+    assert "# TYPE taskmanager_network_bytes counter" in text
+    assert "# HELP taskmanager_network_bytes Bytes moved by all interfaces" in text
+    # Samples keep the suffix
+    assert any(line.startswith('taskmanager_network_bytes_total{direction="received"} ') for line in text)
+    assert "# TYPE taskmanager_cpu_percent gauge" in text
+    assert text[-1] == "# EOF"
+
+
+def test_rendered_once_per_snapshot_and_format():
+    engine = FakeEngine(snapshot())
+    exporter = MetricsExporter(engine)
+    plain = exporter.render()
+    assert exporter.render() is plain
+    compressed = exporter.render(compressed=True)
+    # Compression reuses the rendered text
+    assert exporter.renders == 1
+    assert gzip.decompress(compressed) == plain
+    assert exporter.render(compressed=True) is compressed
+
+    openmetrics = exporter.render(openmetrics=True, compressed=True)
+    assert exporter.renders == 2
+    assert gzip.decompress(openmetrics).endswith(b"# EOF\n")
+
+    engine.latest = snapshot(timestamp=1700000001.0)
+    assert exporter.render() != plain
+    assert exporter.renders == 3
+
+
+def test_no_snapshot_yet():
+    exporter = MetricsExporter(FakeEngine())
+    assert exporter.render() == b"\n"
+    assert exporter.render(openmetrics=True) == b"# EOF\n"
+
+
+def test_top_processes_only():
+    processes = {pid: process(pid, f"worker-{pid}", cpu=float(pid), memory=1000 - pid)
+                 for pid in range(1, 21)}
+    processes[50] = process(50, "a-very-long-process-name", cpu=50.0, memory=1)
+    exporter = MetricsExporter(FakeEngine(snapshot(processes=processes)), process_limit=2,
+                               max_label_length=6)
+    text = lines(exporter.render())
+    assert "taskmanager_processes 21" in text
+    cpu = [line for line in text if line.startswith("taskmanager_process_cpu_percent{")]
+    # Top 2 by CPU (50, 20) and by memory (1, 2), in PID order
+    assert [line.split('"')[1] for line in cpu] == ["1", "2", "20", "50"]
+    assert 'taskmanager_process_memory_bytes{pid="20",name="worker"} 980' in text
+    assert 'taskmanager_process_cpu_percent{pid="50",name="a-very"} 50.0' in text
+
+
+def test_paused_processes_are_not_exported():
+    text = lines(MetricsExporter(FakeEngine(snapshot())).render())
+    assert not any(line.startswith("taskmanager_process") for line in text)
+
+
+def test_escape_label():
+    assert escape_label('a "b"\\c\nd') == 'a \\"b\\"\\\\c\\nd'
+    assert escape_label("abcdef", max_length=3) == "abc"
+
+
+@pytest.fixture
+def served():
+    exporter = MetricsExporter(FakeEngine(snapshot()), address=("127.0.0.1", 0))
+    exporter.start()
+    yield exporter
+    exporter.stop()
+
+
+def get(exporter, path, headers=None):
+    connection = http.client.HTTPConnection(*exporter.address, timeout=5)
+    try:
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_http_negotiation(served):
+    status, headers, body = get(served, "/metrics")
+    assert status == 200
+    assert headers["Content-Type"] == PROMETHEUS_TYPE
+    assert body == served.render()
+
+    status, headers, body = get(served, "/metrics?x=1", {
+        "Accept": "application/openmetrics-text; version=1.0.0,text/plain;q=0.5",
+        "Accept-Encoding": "gzip",
+    })
+    assert status == 200
+    assert headers["Content-Type"] == OPENMETRICS_TYPE
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == served.render(openmetrics=True)
+
+    status, headers, body = get(served, "/other")
+    assert status == 404
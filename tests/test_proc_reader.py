@@ -0,0 +1,106 @@
+# tests/test_proc_reader.py
+import os
+
+import pytest
+
+from benchmarks.fake_procfs import BOOT_TIME, build_fake_procfs, io_text, stat_line
+from utils.proc_reader import CLOCK_TICKS, PAGE_SIZE, ProcfsCollector
+
+
+def add_process(root, pid, name, ppid=1, state="S", utime=0, stime=0, starttime=0,
+                rss_pages=10, io=None, cmdline=None):
+    directory = os.path.join(root, str(pid))
+    os.mkdir(directory)
+    with open(os.path.join(directory, "stat"), "w") as f:
+        f.write(stat_line(pid, ppid, name, state, utime, stime, starttime, rss_pages))
+    with open(os.path.join(directory, "statm"), "w") as f:
+        f.write(f"{rss_pages * 4} {rss_pages} 100 10 0 {rss_pages} 0\n")
+    if io is not None:
+        with open(os.path.join(directory, "io"), "w") as f:
+            f.write(io_text(*io))
+    if cmdline is not None:
+        with open(os.path.join(directory, "cmdline"), "wb") as f:
+            f.write(b"\0".join(part.encode() for part in cmdline) + b"\0")
+
+
+@pytest.fixture
+def procfs(tmp_path):
+    root = str(tmp_path)
+    build_fake_procfs(0, root=root)
+    return root
+
+
+def test_stat_fields(procfs):
+    add_process(procfs, 1, "init", ppid=0, state="S", utime=250, stime=50,
+                starttime=3 * CLOCK_TICKS, rss_pages=300)
+    add_process(procfs, 42, "my (odd) proc", ppid=1, state="R", utime=CLOCK_TICKS)
+    add_process(procfs, 43, "zombie", ppid=42, state="Z")
+
+    collector = ProcfsCollector(procfs)
+    assert collector.boot_time == BOOT_TIME
+    records = collector.collect()
+    assert sorted(records) == [1, 42, 43]
+
+    init = records[1]
+    assert (init.name, init.status, init.ppid) == ("init", "sleeping", 0)
+    assert init.cpu_time == pytest.approx(300 / CLOCK_TICKS)
+    assert init.create_time == pytest.approx(BOOT_TIME + 3)
+    assert init.memory_raw == 300 * PAGE_SIZE
+
+    # The name runs to the last closing parenthesis
+    odd = records[42]
+    assert (odd.name, odd.status, odd.ppid) == ("my (odd) proc", "running", 1)
+    assert odd.cpu_time == pytest.approx(1.0)
+    assert records[43].status == "zombie"
+
+
+def test_only_requested_files_are_read(procfs):
+    add_process(procfs, 1, "init", rss_pages=300, io=(4096, 512, 9))
+    collector = ProcfsCollector(procfs)
+
+    record = collector.collect(fields={"name", "cpu"})[1]
+    assert record.memory_raw == 0
+    assert (record.read_bytes, record.write_bytes, record.syscalls) == (0, 0, 0)
+
+    record = collector.collect(fields={"name", "memory", "io"})[1]
+    assert record.memory_raw == 300 * PAGE_SIZE
+    assert (record.read_bytes, record.write_bytes, record.syscalls) == (4096, 512, 9)
+
+
+def test_unreadable_processes(procfs):
+    add_process(procfs, 1, "init", io=(10, 20, 30))
+    # Not our process: no io file, still listed with zero I/O
+    add_process(procfs, 2, "other")
+    # Exited between listdir and read
+    os.mkdir(os.path.join(procfs, "3"))
+    # Truncated stat
+    os.mkdir(os.path.join(procfs, "4"))
+    with open(os.path.join(procfs, "4", "stat"), "w") as f:
+        f.write("4 (short) S 1\n")
+
+    records = ProcfsCollector(procfs).collect(fields={"name", "io"})
+    assert sorted(records) == [1, 2]
+    assert records[2].read_bytes == 0
+
+
+def test_static_attributes(procfs):
+    # The kernel truncates comm to 15 characters
+    add_process(procfs, 7, "systemd-journal", cmdline=["/usr/lib/systemd/systemd-journald", "--user"])
+    add_process(procfs, 8, "bash", cmdline=["-bash"])
+    collector = ProcfsCollector(procfs)
+
+    assert collector.read_cmdline(7) == "/usr/lib/systemd/systemd-journald --user"
+    assert collector.read_name(7, "systemd-journal") == "systemd-journald"
+    assert collector.read_name(8, "bash") == "bash"
+    assert collector.read_cmdline(99) == ""
+    assert collector.read_exe(7) == ""
+    assert collector.read_username(7) == collector.read_username(8) != ""
+
+
+def test_generated_tree(tmp_path):
+    root = build_fake_procfs(500, root=str(tmp_path), seed=4)
+    records = ProcfsCollector(root).collect(fields={"name", "cpu", "memory", "io"})
+    assert sorted(records) == list(range(1, 501))
+    assert all(record.ppid == max(1, pid // 2) for pid, record in records.items())
+    assert all(record.memory_raw > 0 and record.create_time >= BOOT_TIME for record in records.values())
+    assert all(record.status in ("running", "sleeping", "disk-sleep", "idle") for record in records.values())
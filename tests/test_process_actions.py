@@ -0,0 +1,131 @@
+# tests/test_process_actions.py
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from utils.process_actions import ProcessActions, parse_cpu_list, parse_ionice, parse_value
+
+# Ignores SIGTERM, so only the escalation to SIGKILL ends it
+STUBBORN = ("import signal, time\n"
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+            "print('ready', flush=True)\n"
+            "time.sleep(60)\n")
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def spawn():
+    children = []
+
+    def start(stubborn=False):
+        if stubborn:
+            child = subprocess.Popen([sys.executable, "-c", STUBBORN], stdout=subprocess.PIPE)
+            # The handler must be in place before anything is signalled
+            child.stdout.readline()
+        else:
+            child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        children.append(child)
+        return child
+
+    yield start
+    for child in children:
+        child.kill()
+        child.wait()
+
+
+def target(child):
+    return child.pid, psutil.Process(child.pid).create_time()
+
+
+def test_terminate_escalates_to_kill_after_grace(spawn):
+    polite, stubborn = spawn(), spawn(stubborn=True)
+    actions = ProcessActions(grace=0.3, kill_timeout=2.0)
+    started = time.monotonic()
+    results = actions.run("terminate", [target(polite), target(stubborn)])
+    elapsed = time.monotonic() - started
+
+    assert [(r.pid, r.ok, r.message) for r in results] == [
+        (polite.pid, True, "terminated"),
+        (stubborn.pid, True, "killed after 0.3 s"),
+    ]
+    # One grace period for the whole batch
+    assert 0.3 <= elapsed < 2.0
+    assert polite.wait(timeout=1) is not None
+    assert stubborn.wait(timeout=1) is not None
+
+
+def test_kill_skips_the_grace_period(spawn):
+    child = spawn(stubborn=True)
+    started = time.monotonic()
+    result, = ProcessActions(grace=30.0).run("kill", [target(child)])
+    assert (result.ok, result.message) == (True, "killed")
+    assert time.monotonic() - started < 5.0
+
+
+def test_reused_pid_is_not_touched(spawn):
+    child = spawn()
+    pid, create_time = target(child)
+    result, = ProcessActions().run("terminate", [(pid, create_time - 100.0)])
+    # Ending a process that is gone counts as done; the PID's new owner lives
+    assert (result.ok, result.message) == (True, "already exited")
+    assert child.poll() is None
+
+    result, = ProcessActions().run("suspend", [(pid, create_time - 100.0)])
+    assert (result.ok, result.message) == (False, "already exited")
+
+
+def test_own_process_is_refused():
+    result, = ProcessActions().run("kill", [(os.getpid(), psutil.Process().create_time())])
+    assert not result.ok
+    assert result.message == "is the task manager itself"
+
+
+def test_suspend_resume_and_renice(spawn):
+    child = spawn()
+    handle = psutil.Process(child.pid)
+    actions = ProcessActions()
+
+    result, = actions.run("suspend", [target(child)])
+    assert (result.ok, result.message) == (True, "suspended")
+    # Signals are delivered asynchronously
+    wait_for(lambda: handle.status() == psutil.STATUS_STOPPED)
+    result, = actions.run("resume", [target(child)])
+    assert result.ok
+    wait_for(lambda: handle.status() != psutil.STATUS_STOPPED)
+
+    nice = handle.nice() + 1
+    result, = actions.run("renice", [target(child)], parse_value("renice", str(nice)))
+    assert (result.ok, result.message) == (True, f"priority {nice}")
+    assert handle.nice() == nice
+
+
+def test_results_follow_target_order(spawn):
+    children = [spawn() for _ in range(3)]
+    targets = [target(child) for child in reversed(children)]
+    results = ProcessActions(workers=2, grace=2.0).run("terminate", targets)
+    assert [r.pid for r in results] == [pid for pid, create_time in targets]
+    assert all(r.ok for r in results)
+
+
+def test_parsers():
+    assert parse_cpu_list("0-3, 6,2") == [0, 1, 2, 3, 6]
+    with pytest.raises(ValueError):
+        parse_cpu_list(" , ")
+    if psutil.LINUX:
+        assert parse_ionice("idle") == (psutil.IOPRIO_CLASS_IDLE, None)
+        assert parse_ionice("Best-Effort") == (psutil.IOPRIO_CLASS_BE, 4)
+        assert parse_ionice("realtime:0") == (psutil.IOPRIO_CLASS_RT, 0)
+    with pytest.raises(ValueError):
+        parse_ionice("urgent")
+    assert parse_value("terminate", "anything") is None
@@ -0,0 +1,121 @@
+# tests/test_process_columns.py
+import random
+
+import numpy as np
+import pytest
+
+from utils.process_columns import SORT_FIELDS, ColumnTable, NameTable, ProcessColumns
+from utils.process_table import ProcessInfo
+
+
+def info(pid, cpu=0.0, memory=0, name="proc", status="sleeping", ppid=1, read_rate=0.0):
+    return ProcessInfo(pid=pid, name=name, exe="", cmdline="", username="", create_time=1000.0 + pid,
+                       created="", cpu=cpu, memory_raw=memory, status=status, ppid=ppid,
+                       read_rate=read_rate, write_rate=0.0, syscall_rate=0.0)
+
+
+def columns(*infos):
+    return ProcessColumns.from_processes({i.pid: i for i in infos})
+
+
+def brute_force(infos, sort_by, reverse):
+    """The order SORT_FIELDS gives: stable sorts, ties by ascending PID"""
+    key = SORT_FIELDS[sort_by]
+    by_pid = sorted(infos, key=lambda p: p.pid)
+    return [p.pid for p in sorted(by_pid, key=key, reverse=reverse)]
+
+
+def test_rows_decode_back():
+    process = info(7, cpu=2.5, memory=4096, name="python", status="zombie", ppid=3)
+    row = columns(process).row(0)
+    assert row.pid == 7 and row.ppid == 3 and row.name == "python"
+    assert row.cpu == 2.5 and row.memory_raw == 4096
+    assert row.status == "zombie" and row.create_time == 1007.0
+    # Statuses the table does not know decode as "?"
+    assert columns(info(1, status="new-state")).row(0).status == "?"
+
+
+def test_ties_break_by_ascending_pid_both_ways():
+    cols = columns(info(5, cpu=1.0), info(2, cpu=1.0), info(9, cpu=3.0), info(4, cpu=1.0))
+    assert cols.pid[cols.order("cpu", reverse=True)].tolist() == [9, 2, 4, 5]
+    assert cols.pid[cols.order("cpu", reverse=False)].tolist() == [2, 4, 5, 9]
+
+
+@pytest.mark.parametrize("sort_by", ["cpu", "memory", "name", "pid"])
+@pytest.mark.parametrize("reverse", [True, False])
+def test_order_matches_row_sort(sort_by, reverse):
+    rng = random.Random(3)
+    infos = [info(pid, cpu=rng.choice([0.0, 0.5, 1.0, 12.5]), memory=rng.choice([0, 4096, 8192]),
+                  name=rng.choice(["Bash", "bash", "python", "Xorg"]))
+             for pid in rng.sample(range(1, 5000), 300)]
+    cols = columns(*infos)
+    expected = brute_force(infos, sort_by, reverse)
+    assert cols.pid[cols.order(sort_by, reverse)].tolist() == expected
+    # Limiting keeps the same prefix, even when the cut falls inside a tie
+    for limit in (0, 1, 7, 25, 299, 300, 1000):
+        assert cols.pid[cols.order(sort_by, reverse, limit)].tolist() == expected[:limit]
+
+
+def test_name_sort_ignores_case():
+    cols = columns(info(1, name="beta"), info(2, name="Alpha"), info(3, name="alpha"))
+    assert [row.pid for row in cols.top("name", reverse=False)] == [2, 3, 1]
+
+
+def test_rows_restrict_the_order():
+    cols = columns(*(info(pid, cpu=float(pid % 4)) for pid in range(1, 21)))
+    rows = cols.rows_for_pids({3, 7, 8, 11, 12, 99})
+    assert sorted(cols.pid[rows].tolist()) == [3, 7, 8, 11, 12]
+    assert [row.pid for row in cols.top("cpu", True, rows=rows)] == [3, 7, 11, 8, 12]
+    assert [row.pid for row in cols.top("cpu", True, limit=2, rows=rows)] == [3, 7]
+    assert cols.order("cpu", rows=rows[:0]).tolist() == []
+
+
+def test_rows_for_names():
+    cols = columns(info(1, name="python3"), info(2, name="bash"), info(3, name="python3"))
+    rows = cols.rows_for_names(lambda name: name.startswith("py"))
+    assert cols.pid[rows].tolist() == [1, 3]
+
+
+def test_names_are_shared_between_snapshots():
+    names = NameTable()
+    first = ProcessColumns.from_processes({1: info(1, name="bash")}, names)
+    second = ProcessColumns.from_processes({2: info(2, name="bash"), 3: info(3, name="sh")}, names)
+    assert names.names == ["bash", "sh"]
+    assert first.row(0).name == second.row(0).name == "bash"
+
+
+def test_table_reuses_freed_slots():
+    table = ColumnTable(capacity=2)
+    table.update([info(1, cpu=1.0), info(2), info(3)])
+    table.update([], removed=[2])
+    table.update([info(4, cpu=4.0)])
+    snapshot = table.snapshot()
+    assert sorted(snapshot.pid.tolist()) == [1, 3, 4]
+    assert len(table._live) == 4
+    # A changed row only rewrites its volatile columns
+    table.update([info(1, cpu=9.0, ppid=4)])
+    row = table.snapshot().top("cpu", limit=1)[0]
+    assert (row.pid, row.cpu, row.ppid) == (1, 9.0, 4)
+    # Earlier snapshots are copies
+    assert snapshot.cpu[snapshot.pid == 1][0] == 1.0
+
+
+def test_io_columns_only_while_some_rate_is_set():
+    table = ColumnTable()
+    table.update([info(1), info(2)])
+    idle = table.snapshot()
+    assert not idle.read_rate.any()
+    # One shared zero view instead of three arrays
+    assert idle.nbytes == columns(info(1), info(2)).nbytes
+    assert idle.read_rate.strides[0] == 0
+
+    table.update([info(2, read_rate=512.0)])
+    busy = table.snapshot()
+    assert busy.read_rate[busy.pid == 2][0] == 512.0
+    assert busy.nbytes > idle.nbytes
+    assert busy.top("read_rate", limit=1)[0].pid == 2
+
+    table.update([info(2)])
+    table.snapshot()
+    assert table.snapshot().read_rate.strides[0] == 0
+    assert np.array_equal(idle.read_rate, np.zeros(2))
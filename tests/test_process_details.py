@@ -0,0 +1,202 @@
+# tests/test_process_details.py
+import os
+import threading
+import time
+
+import psutil
+import pytest
+
+from utils import process_details
+from utils.process_details import ATTRIBUTES, ProcessDetails, TtlCache
+
+OWN = (os.getpid(), psutil.Process().create_time())
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(process_details.time, "monotonic", clock)
+    return clock
+
+
+class Received:
+    """Callback that records (target, Detail) pairs from any thread"""
+
+    def __init__(self):
+        self.items = []
+        self.lock = threading.Lock()
+
+    def __call__(self, target, detail):
+        with self.lock:
+            self.items.append((target, detail))
+
+    def names(self, target=None):
+        with self.lock:
+            return sorted(d.name for t, d in self.items if target is None or t == target)
+
+
+class Gate:
+    """Formatter that blocks until released, counting its calls"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def __call__(self, handle):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return ["done"]
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    gate = Gate()
+    monkeypatch.setitem(ATTRIBUTES, "slow", ("Slow", gate, 5.0))
+    yield gate
+    gate.release.set()
+
+
+@pytest.fixture
+def details():
+    details = ProcessDetails(workers=1)
+    yield details
+    details.shutdown()
+
+
+def test_ttl_cache_expires(clock):
+    cache = TtlCache(ttl=5.0)
+    cache.put("a", 1)
+    clock.now += 5.0
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_drops_expired_then_oldest(clock):
+    cache = TtlCache(ttl=5.0, maxsize=3)
+    cache.put("old", 1)
+    clock.now += 10
+    cache.put("b", 2)
+    cache.put("c", 3)
+    cache.put("d", 4)
+    # The expired entry made room
+    assert [cache.get(key) for key in ("b", "c", "d")] == [2, 3, 4]
+    cache.put("e", 5)
+    assert cache.get("b") is None
+    assert cache.get("e") == 5
+
+
+def test_fetches_every_attribute_once_then_serves_the_cache(details):
+    received = Received()
+    details.request(OWN, received)
+    wait_for(lambda: len(received.items) == len(ATTRIBUTES))
+    assert received.names() == sorted(ATTRIBUTES)
+    cmdline = dict((d.name, d) for t, d in received.items)["cmdline"]
+    assert cmdline.error is None and cmdline.count == 1
+
+    # Cached values are delivered before request returns
+    again = Received()
+    details.request(OWN, again, ["cmdline", "threads"])
+    assert again.names() == ["cmdline", "threads"]
+    assert dict((d.name, d) for t, d in again.items)["cmdline"] is cmdline
+
+
+def test_expired_values_are_fetched_again(details):
+    received = Received()
+    details.request(OWN, received, ["threads"])
+    wait_for(lambda: received.items)
+    first = received.items[0][1]
+    details.caches["threads"].ttl = 0.0
+    time.sleep(0.01)
+    details.request(OWN, received, ["threads"])
+    wait_for(lambda: len(received.items) == 2)
+    assert received.items[1][1] is not first
+
+
+def test_lines_are_limited_but_counted(details):
+    details.limit = 2
+    received = Received()
+    details.request(OWN, received, ["environ"])
+    wait_for(lambda: received.items)
+    detail = received.items[0][1]
+    assert detail.count == len(psutil.Process().environ()) > 2
+    assert len(detail.lines) == 2
+
+
+def test_reused_pid_reports_exited(details):
+    received = Received()
+    details.request((OWN[0], OWN[1] - 100.0), received, ["cmdline"])
+    wait_for(lambda: received.items)
+    assert received.items[0][1].error == "process has exited"
+    assert received.items[0][1].lines == []
+
+
+def test_failing_formatter_still_answers(details, monkeypatch):
+    def broken(handle):
+        raise KeyError("boom")
+    monkeypatch.setitem(ATTRIBUTES, "cmdline", ("Command line", broken, 60.0))
+    received = Received()
+    details.request(OWN, received, ["cmdline"])
+    wait_for(lambda: received.items)
+    assert received.items[0][1].error == "KeyError: 'boom'"
+
+
+def test_in_flight_fetch_is_not_repeated(gate):
+    details = ProcessDetails(workers=2)
+    try:
+        received = Received()
+        details.request(OWN, received, ["slow"])
+        assert gate.started.wait(5)
+        details.request(OWN, received, ["slow"])
+        gate.release.set()
+        wait_for(lambda: received.items)
+        time.sleep(0.05)
+        assert gate.calls == 1
+        assert len(received.items) == 1
+    finally:
+        details.shutdown()
+
+
+def test_new_selection_cancels_the_old_one(gate, details):
+    old, new = OWN, (OWN[0], OWN[1] - 100.0)
+    received = Received()
+    # With one worker, "cmdline" queues behind "slow"
+    details.request(old, received, ["slow", "cmdline"])
+    assert gate.started.wait(5)
+
+    details.request(new, received, ["threads"])
+    gate.release.set()
+    wait_for(lambda: received.names(new) == ["threads"])
+    time.sleep(0.05)
+    # The running fetch was cached but not delivered; the queued one never ran
+    assert received.names(old) == []
+    assert details.caches["slow"].get(old).lines == ["done"]
+    assert details.caches["cmdline"].get(old) is None
+
+
+def test_cancel_drops_delivery(gate, details):
+    received = Received()
+    details.request(OWN, received, ["slow"])
+    assert gate.started.wait(5)
+    details.cancel()
+    gate.release.set()
+    wait_for(lambda: details.caches["slow"].get(OWN) is not None)
+    assert received.items == []
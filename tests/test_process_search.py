@@ -0,0 +1,61 @@
+# tests/test_process_search.py
+import re
+
+from utils.process_search import ProcessSearchIndex, parse_query
+from utils.process_table import ProcessInfo
+
+
+def info(pid, name, cmdline="", username="root", create_time=1000.0):
+    return ProcessInfo(pid=pid, name=name, exe="", cmdline=cmdline, username=username,
+                       create_time=create_time, created="", cpu=0.0, memory_raw=0,
+                       status="sleeping", ppid=1, read_rate=0.0, write_rate=0.0,
+                       syscall_rate=0.0)
+
+
+def test_parse_query_forms():
+    terms = parse_query("Chrome ^Py PID:42 User:Root pid:x user:")
+    assert terms == [("text", "chrome"), ("prefix", "py"), ("pid", 42), ("user", "root")]
+
+
+def test_regex_tokens_keep_their_case_sensitive_escapes():
+    (kind, pattern), = parse_query(r"re:\D+")
+    assert kind == "regex"
+    assert pattern.pattern == r"\D+"
+    assert pattern.flags & re.IGNORECASE
+    assert pattern.fullmatch("python")
+    assert not pattern.search("1234")
+
+    (kind, pattern), = parse_query(r"/PY\S/")
+    assert pattern.pattern == r"PY\S"
+    assert pattern.search("python3")
+
+
+def test_invalid_regex_falls_back_to_text():
+    assert parse_query("re:[Ab") == [("text", "[ab")]
+
+
+def test_search_matches_every_term():
+    index = ProcessSearchIndex()
+    processes = {
+        1: info(1, "systemd"),
+        2: info(2, "python3", "/usr/bin/python3 -m http.server", "alice"),
+        3: info(3, "Python", "python worker.py", "bob"),
+        4: info(4, "bash", "bash -c python3", "alice"),
+    }
+    index.update(processes)
+    search = lambda text: index.search(parse_query(text))
+    assert search("python") == {2, 3, 4}
+    assert search("^py") == {2, 3}
+    assert search("python user:al") == {2, 4}
+    assert search("pid:3") == {3}
+    assert search("pid:99") == set()
+    assert search(r"re:^py\w+\d") == {2}
+
+
+def test_index_follows_exits_and_pid_reuse():
+    index = ProcessSearchIndex()
+    index.update({1: info(1, "nginx"), 2: info(2, "redis")})
+    index.update({1: info(1, "postgres", create_time=2000.0)})
+    assert index.search(parse_query("nginx")) == set()
+    assert index.search(parse_query("postgres")) == {1}
+    assert index.search(parse_query("redis")) == set()
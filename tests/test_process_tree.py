@@ -0,0 +1,167 @@
+# tests/test_process_tree.py
+import random
+
+from utils.process_table import ProcessInfo
+from utils.process_tree import CPU_SCALE, ProcessTree, pack
+
+
+def info(pid, ppid, cpu=0.0, memory=0, create_time=1000.0, name="proc"):
+    return ProcessInfo(pid=pid, name=name, exe="", cmdline="", username="", create_time=create_time,
+                       created="", cpu=cpu, memory_raw=memory, status="sleeping", ppid=ppid,
+                       read_rate=0.0, write_rate=0.0, syscall_rate=0.0)
+
+
+def table(*infos):
+    return {i.pid: i for i in infos}
+
+
+def brute_force_total(tree, processes, pid):
+    own = processes[pid]
+    return pack(round(own.cpu * CPU_SCALE), own.memory_raw, 1) + \
+        sum(brute_force_total(tree, processes, child) for child in tree.children[pid])
+
+
+def check_consistent(tree, processes):
+    """Links follow ppid wherever that makes no cycle; totals are subtree sums"""
+    assert set(tree.infos) == set(processes)
+    for pid, process in processes.items():
+        parent = tree.parent[pid]
+        if parent is not None:
+            assert parent == process.ppid
+            assert pid in tree.children[parent]
+            continue
+        assert pid in tree.roots
+        ppid = process.ppid
+        if ppid != pid and ppid in processes:
+            # Only a root because linking would close a cycle
+            node = ppid
+            while node is not None and node != pid:
+                node = tree.parent[node]
+            assert node == pid, f"{pid} should be linked under {ppid}"
+    for pid in processes:
+        assert tree.totals[pid] == brute_force_total(tree, processes, pid)
+
+
+def test_rollups_sum_whole_subtrees():
+    tree = ProcessTree()
+    tree.update(table(info(1, 0, 1.0, 100), info(2, 1, 2.5, 200), info(3, 1, 0.5, 300),
+                      info(4, 2, 4.0, 400)))
+    assert tree.rollup(1) == (8.0, 1000, 4)
+    assert tree.rollup(2) == (6.5, 600, 2)
+    assert tree.rollup(4) == (4.0, 400, 1)
+    assert tree.roots == {1}
+
+
+def test_value_changes_reach_every_ancestor():
+    tree = ProcessTree()
+    processes = table(info(1, 0, 1.0, 100), info(2, 1, 1.0, 100), info(3, 2, 1.0, 100))
+    tree.update(processes)
+    processes[3] = processes[3]._replace(cpu=5.0, memory_raw=1000)
+    assert tree.update(dict(processes))
+    assert tree.rollup(1) == (7.0, 1200, 3)
+    assert tree.rollup(2) == (6.0, 1100, 2)
+    assert not tree.update(dict(processes))
+
+
+def test_reparenting_moves_the_subtree_totals():
+    tree = ProcessTree()
+    processes = table(info(1, 0, 1.0, 10), info(2, 1, 2.0, 20), info(3, 1, 3.0, 30),
+                      info(4, 2, 4.0, 40))
+    tree.update(processes)
+    processes[2] = processes[2]._replace(ppid=3)
+    tree.update(dict(processes))
+    assert tree.parent[2] == 3
+    assert tree.children[1] == {3}
+    assert tree.rollup(3) == (9.0, 90, 3)
+    assert tree.rollup(1) == (10.0, 100, 4)
+    check_consistent(tree, processes)
+
+
+def test_orphans_are_adopted_when_their_parent_appears():
+    tree = ProcessTree()
+    processes = table(info(1, 0), info(5, 9, 1.0, 50))
+    tree.update(processes)
+    assert tree.roots == {1, 5}
+    processes[9] = info(9, 1, 2.0, 90)
+    tree.update(dict(processes))
+    assert tree.parent[5] == 9
+    assert tree.rollup(1) == (3.0, 140, 3)
+    check_consistent(tree, processes)
+
+
+def test_exited_parent_leaves_children_as_roots():
+    tree = ProcessTree()
+    processes = table(info(1, 0), info(2, 1, 1.0, 10), info(3, 2, 2.0, 20))
+    tree.update(processes)
+    del processes[2]
+    tree.update(dict(processes))
+    assert tree.roots == {1, 3}
+    assert tree.rollup(1) == (0.0, 0, 1)
+    check_consistent(tree, processes)
+
+
+def test_pid_reuse_is_a_new_process():
+    tree = ProcessTree()
+    processes = table(info(1, 0), info(2, 0), info(3, 1, 1.0, 10), info(4, 3, 2.0, 20))
+    tree.update(processes)
+    # PID 3 exits, its child moves to PID 1 and a new process under 2 gets
+    # number 3, all in the same tick
+    processes[3] = info(3, 2, 5.0, 50, create_time=2000.0)
+    processes[4] = processes[4]._replace(ppid=1)
+    tree.update(dict(processes))
+    assert tree.parent[3] == 2
+    assert tree.parent[4] == 1
+    assert tree.rollup(2) == (5.0, 50, 2)
+    assert tree.rollup(1) == (2.0, 20, 2)
+    check_consistent(tree, processes)
+
+
+def test_cycle_is_relinked_once_broken():
+    tree = ProcessTree()
+    processes = table(info(1, 0, 1.0, 10), info(2, 1, 2.0, 20), info(3, 2, 3.0, 30))
+    tree.update(processes)
+    # A stale ppid pointing into its own subtree: 1 stays a root
+    processes[1] = processes[1]._replace(ppid=3)
+    tree.update(dict(processes))
+    assert tree.roots == {1}
+    check_consistent(tree, processes)
+    # Once 3 leaves the subtree, 1 can go under it
+    processes[3] = processes[3]._replace(ppid=0)
+    tree.update(dict(processes))
+    assert tree.roots == {3}
+    assert tree.parent[1] == 3
+    assert tree.rollup(3) == (6.0, 60, 3)
+    check_consistent(tree, processes)
+
+
+def test_random_updates_stay_consistent():
+    rng = random.Random(7)
+    for trial in range(200):
+        tree = ProcessTree()
+        processes = {}
+        for step in range(25):
+            for _ in range(rng.randint(0, 3)):
+                pid = rng.randint(1, 20)
+                processes[pid] = info(pid, rng.randint(0, 20), rng.randint(0, 50) / 10,
+                                      rng.randint(1, 9), create_time=float(step))
+            for pid in list(processes):
+                roll = rng.random()
+                if roll < 0.1:
+                    del processes[pid]
+                elif roll < 0.3:
+                    processes[pid] = processes[pid]._replace(ppid=rng.randint(0, 20))
+                elif roll < 0.4:
+                    processes[pid] = processes[pid]._replace(cpu=rng.randint(0, 50) / 10)
+            tree.update(dict(processes))
+            check_consistent(tree, processes)
+
+
+def test_rows_are_depth_first_sorted_and_collapsible():
+    tree = ProcessTree()
+    tree.update(table(info(1, 0, 0.0), info(2, 1, 1.0), info(3, 1, 5.0), info(4, 2, 9.0),
+                      info(5, 3, 0.0)))
+    # 2's subtree has 10% in total, 3's 5%
+    assert tree.rows("cpu", True) == [(1, 0, 2), (2, 1, 1), (4, 2, 0), (3, 1, 1), (5, 2, 0)]
+    assert tree.rows("cpu", True, collapsed={2}) == [(1, 0, 2), (2, 1, 1), (3, 1, 1), (5, 2, 0)]
+    assert tree.rows("pid", False, limit=3) == [(1, 0, 2), (2, 1, 1), (4, 2, 0)]
+    assert tree.rows("cpu", True, include=tree.with_ancestors([5])) == [(1, 0, 2), (3, 1, 1), (5, 2, 0)]
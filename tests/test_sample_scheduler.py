@@ -0,0 +1,103 @@
+# tests/test_sample_scheduler.py
+import pytest
+
+from utils.sample_scheduler import MAX_INTERVAL, MIN_INTERVAL, SampleScheduler
+
+
+def test_deadlines_stay_on_the_grid():
+    scheduler = SampleScheduler(1.0, budget=0)
+    assert scheduler.timeout(now=100.0) == 1.0
+    # A sample that starts late does not push later ones back
+    scheduler.advance(now=101.2)
+    assert scheduler.timeout(now=101.5) == pytest.approx(0.5)
+    scheduler.advance(now=102.0)
+    assert scheduler.timeout(now=102.0) == pytest.approx(1.0)
+    assert scheduler.skipped == 0
+
+
+def test_overrun_skips_missed_slots():
+    scheduler = SampleScheduler(1.0, budget=0)
+    scheduler.timeout(now=0.0)
+    scheduler.advance(now=3.5)
+    # Slots at 2 and 3 were missed; the next one is 4, not a burst
+    assert scheduler.skipped == 2
+    assert scheduler.timeout(now=3.5) == pytest.approx(0.5)
+
+
+def test_early_wake_restarts_the_grid():
+    scheduler = SampleScheduler(1.0, budget=0)
+    scheduler.timeout(now=0.0)
+    scheduler.advance(now=0.3)
+    assert scheduler.timeout(now=0.3) == pytest.approx(1.0)
+
+
+def test_set_interval_clamps_and_reports_changes():
+    scheduler = SampleScheduler(1.0)
+    assert not scheduler.set_interval(1.0)
+    assert scheduler.set_interval(0.01)
+    assert scheduler.requested == scheduler.interval == MIN_INTERVAL
+    assert scheduler.set_interval(1000)
+    assert scheduler.interval == MAX_INTERVAL
+    assert SampleScheduler(0).requested == MIN_INTERVAL
+
+
+def test_budget_holds_the_interval_up():
+    scheduler = SampleScheduler(1.0, budget=0.02)
+    scheduler.timeout(now=0.0)
+    # 50 ms of CPU per sample at a 2% budget needs 2.5 s between samples
+    scheduler.record(0.05)
+    assert scheduler.throttled
+    assert scheduler.interval == pytest.approx(2.5)
+    assert scheduler.overhead == pytest.approx(0.02)
+    # The grid phase is kept: the pending deadline moves by the change
+    assert scheduler.timeout(now=0.0) == pytest.approx(2.5)
+
+    for _ in range(30):
+        scheduler.record(0.001)
+    assert not scheduler.throttled
+    assert scheduler.interval == 1.0
+    assert scheduler.overhead < 0.02
+
+
+def test_budget_never_exceeds_max_interval():
+    scheduler = SampleScheduler(1.0, budget=0.001)
+    scheduler.record(1.0)
+    assert scheduler.interval == MAX_INTERVAL
+    assert scheduler.throttled
+
+
+def test_adaptive_speeds_up_under_load_and_backs_off_when_idle():
+    scheduler = SampleScheduler(1.0, adaptive=True, budget=0)
+    intervals = []
+    for _ in range(6):
+        scheduler.record(0.0, cpu_percent=90.0)
+        intervals.append(scheduler.interval)
+    # Halved on every busy tick down to a tenth of the request
+    assert intervals == [0.5, 0.25, 0.125, 0.1, 0.1, 0.1]
+
+    # Moderate load drifts back to the requested rate
+    for _ in range(20):
+        scheduler.record(0.0, cpu_percent=15.0)
+    assert scheduler.interval == 1.0
+
+    # Idle (and settling slowly, so not a spike): nothing changes for
+    # idle_ticks, then it backs off to 4x
+    for _ in range(scheduler.idle_ticks - 1):
+        scheduler.record(0.0, cpu_percent=5.0)
+    assert scheduler.interval == 1.0
+    scheduler.record(0.0, cpu_percent=5.0)
+    assert scheduler.interval == 1.25
+    for _ in range(20):
+        scheduler.record(0.0, cpu_percent=5.0)
+    assert scheduler.interval == 4.0
+
+    # A sudden jump reacts at once
+    scheduler.record(0.0, cpu_percent=40.0)
+    assert scheduler.interval == 2.0
+
+
+def test_adaptive_respects_max_interval():
+    scheduler = SampleScheduler(5.0, adaptive=True, budget=0, max_interval=8.0)
+    for _ in range(30):
+        scheduler.record(0.0, cpu_percent=1.0)
+    assert scheduler.interval == 8.0
@@ -0,0 +1,110 @@
+# tests/test_ui_pump.py
+import threading
+
+from utils.ui_pump import UiPump
+
+
+class FakeWidget:
+    """Stands in for a Tk widget; timers run only when fire() is called"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 0
+
+    def after(self, interval, callback):
+        self.next_id += 1
+        self.jobs[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.jobs.pop(job)
+
+    def fire(self):
+        jobs, self.jobs = self.jobs, {}
+        for callback in jobs.values():
+            callback()
+
+
+def started_pump(maxsize=256):
+    widget = FakeWidget()
+    pump = UiPump(widget, maxsize=maxsize)
+    pump.start()
+    return widget, pump
+
+
+def test_latest_post_per_key_runs_once():
+    widget, pump = started_pump()
+    calls = []
+    pump.post("cpu", calls.append, ("cpu", 1))
+    pump.post("memory", calls.append, ("memory", 1))
+    pump.post("cpu", calls.append, ("cpu", 2))
+    assert calls == []
+    widget.fire()
+    # A replaced key moves behind the posts made before its latest one
+    assert calls == [("memory", 1), ("cpu", 2)]
+    widget.fire()
+    assert calls == [("memory", 1), ("cpu", 2)]
+
+
+def test_calls_and_subscribers():
+    widget, pump = started_pump()
+    calls = []
+    pump.call(calls.append, 1)
+    pump.call(calls.append, 2)
+    forward = pump.subscriber("view", calls.append)
+    forward("first snapshot")
+    forward("second snapshot")
+    widget.fire()
+    assert calls == [1, 2, "second snapshot"]
+
+
+def test_full_queue_drops_the_oldest():
+    widget, pump = started_pump(maxsize=3)
+    calls = []
+    for i in range(5):
+        pump.call(calls.append, i)
+    assert pump.dropped == 2
+    widget.fire()
+    assert calls == [2, 3, 4]
+
+
+def test_failing_callback_does_not_stop_the_pump(capsys):
+    widget, pump = started_pump()
+    calls = []
+    pump.post("bad", lambda: 1 / 0)
+    pump.post("good", calls.append, "ran")
+    widget.fire()
+    assert calls == ["ran"]
+    assert "Error in UI update" in capsys.readouterr().out
+    # Rescheduled for the next drain
+    assert len(widget.jobs) == 1
+
+
+def test_stop_cancels_the_timer():
+    widget, pump = started_pump()
+    pump.stop()
+    assert widget.jobs == {}
+    calls = []
+    pump.call(calls.append, 1)
+    widget.fire()
+    assert calls == []
+
+
+def test_posts_from_many_threads():
+    widget, pump = started_pump(maxsize=10000)
+    seen = []
+
+    def worker(n):
+        for i in range(500):
+            pump.post(("thread", n), seen.append, (n, i))
+            pump.call(seen.append, None)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    widget.fire()
+    assert sorted(item for item in seen if item is not None) == [(n, 499) for n in range(4)]
+    assert seen.count(None) == 2000
+    assert pump.dropped == 0
@@ -0,0 +1,95 @@
+# tests/test_wire.py
+from types import MappingProxyType
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import FakeCollector, fake_host
+from utils.process_table import ProcessTable
+from utils.sampling import Snapshot
+from utils.wire import HEADER, SnapshotDecoder, available_codecs, decode, encode, snapshot_message
+
+
+def snapshots(count, size=300, seed=1):
+    """Successive engine-style snapshots of a churning FakeCollector table"""
+    table = ProcessTable(FakeCollector(size, seed=seed, churn=0.2))
+    memory, disk, temperature, battery = fake_host(seed)
+    result = []
+    for i in range(count):
+        delta = table.update(elapsed=1.0)
+        result.append(Snapshot(
+            timestamp=1700000000.0 + i, interval=1.0, cpu_percent=12.5, memory=memory,
+            net_io=None, net_sent_speed=0.5, net_recv_speed=1.5, disk=disk,
+            temperature=temperature, battery=battery,
+            processes=MappingProxyType(dict(table.processes)), process_changes=delta, gpus=(),
+            process_columns=table.columns.snapshot(),
+        ))
+    return result
+
+
+def round_trip(snapshot, seq, delta, codec):
+    framed = encode(snapshot_message(snapshot, seq, delta), codec)
+    length, codec_id = HEADER.unpack(framed[:HEADER.size])
+    assert length == len(framed) - HEADER.size
+    return decode(framed[HEADER.size:], codec_id)
+
+
+def assert_same_columns(decoded, original):
+    a = decoded.order("pid", False)
+    b = original.order("pid", False)
+    np.testing.assert_array_equal(decoded.pid[a], original.pid[b])
+    np.testing.assert_array_equal(decoded.cpu[a], original.cpu[b])
+    np.testing.assert_array_equal(decoded.memory_raw[a], original.memory_raw[b])
+    np.testing.assert_array_equal(decoded.create_time[a], original.create_time[b])
+    assert [decoded.row(i).name for i in a] == [original.row(i).name for i in b]
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_delta_stream_rebuilds_every_snapshot(codec):
+    decoder = SnapshotDecoder()
+    previous = None
+    for seq, snapshot in enumerate(snapshots(12)):
+        decoded = decoder.decode(round_trip(snapshot, seq, seq > 0, codec))
+        assert dict(decoded.processes) == dict(snapshot.processes)
+        assert decoded.process_changes.added == snapshot.process_changes.added
+        assert decoded.process_changes.removed == snapshot.process_changes.removed
+        assert decoded.memory == snapshot.memory
+        assert decoded.timestamp == snapshot.timestamp
+        assert_same_columns(decoded.process_columns, snapshot.process_columns)
+
+        # Rows that did not change keep their objects, as in the engine
+        if previous is not None:
+            touched = snapshot.process_changes.added | snapshot.process_changes.changed
+            for pid, info in decoded.processes.items():
+                if pid not in touched:
+                    assert info is previous.processes[pid]
+        previous = decoded
+
+
+def test_full_message_diffs_against_what_the_decoder_had():
+    stream = snapshots(3)
+    decoder = SnapshotDecoder()
+    first = decoder.decode(round_trip(stream[0], 0, False, "json"))
+    # A full table after a missed delta: the changes are recomputed
+    second = decoder.decode(round_trip(stream[2], 2, False, "json"))
+    assert dict(second.processes) == dict(stream[2].processes)
+    started = {pid for pid, info in second.processes.items()
+               if pid not in first.processes or first.processes[pid].create_time != info.create_time}
+    assert started and second.process_changes.added == started
+    unchanged = [pid for pid, info in second.processes.items() if first.processes.get(pid) == info]
+    assert unchanged and all(second.processes[pid] is first.processes[pid] for pid in unchanged)
+
+
+def test_columns_only_decoder_matches():
+    decoder = SnapshotDecoder(keep_processes=False)
+    for seq, snapshot in enumerate(snapshots(8, seed=3)):
+        decoded = decoder.decode(round_trip(snapshot, seq, seq > 0, "json"))
+        assert decoded.processes is None
+        assert_same_columns(decoded.process_columns, snapshot.process_columns)
+
+
+def test_snapshot_without_processes_clears_them():
+    snapshot = snapshots(1)[0]._replace(processes=None, process_changes=None, process_columns=None)
+    decoded = SnapshotDecoder().decode(round_trip(snapshot, 0, False, "json"))
+    assert decoded.processes is None
+    assert decoded.process_changes is None
@@ -0,0 +1,314 @@
+# utils/collector_server.py
+import os
+import socket
+import threading
+
+import numpy as np
+
+from utils.metric_history import MetricHistory
+from utils.wire import available_codecs, encode, read_message, snapshot_message
+
+# Version 2 added ppid to process rows, version 3 I/O rates and the
+# process_io request, version 4 the pin_processes request
+PROTOCOL_VERSION = 4
+DEFAULT_PORT = 7878
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """Parse "host", "host:port" or "[v6 host]:port" into (host, port)"""
+    if text.startswith("["):
+        host, _, rest = text[1:].partition("]")
+        port = rest[1:] if rest.startswith(":") else ""
+    elif text.count(":") == 1:
+        host, port = text.split(":")
+    else:
+        host, port = text, ""
+    return host or "127.0.0.1", int(port) if port else default_port
+
+
+class ClientConnection:
+    """
+    One attached viewer. Requests are answered on the reader thread;
+    snapshots go out on a sender thread that always sends the newest one,
+    so a slow viewer skips snapshots instead of holding up sampling.
+    """
+
+    def __init__(self, server, sock):
+        self.server = server
+        self.sock = sock
+        self.codec = "json"
+        # Codec agreed in the hello exchange, used after its reply is sent
+        self.next_codec = None
+        self.subscribed = False
+        self.wants_processes = False
+        self.wants_io = False
+        # Keeps processes collected even while no view asks for them
+        self.pins_processes = False
+        self.closed = False
+
+        self._send_lock = threading.Lock()
+        self._pending = None
+        self._condition = threading.Condition()
+        # Sequence number of the last snapshot sent and whether it carried
+        # processes; a delta is only valid right after such a snapshot
+        self._last_seq = None
+        self._last_had_processes = False
+
+    def start(self):
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        threading.Thread(target=self._send_loop, daemon=True).start()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        with self._condition:
+            self._condition.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.server.remove(self)
+
+    def send(self, message):
+        self.send_bytes(encode(message, self.codec))
+
+    def send_bytes(self, data):
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def offer(self, seq, snapshot):
+        """Queue a snapshot for sending, replacing one not yet sent"""
+        if not self.subscribed:
+            return
+        with self._condition:
+            self._pending = (seq, snapshot)
+            self._condition.notify()
+
+    def _send_loop(self):
+        while not self.closed:
+            with self._condition:
+                while self._pending is None and not self.closed:
+                    self._condition.wait()
+                if self.closed:
+                    return
+                seq, snapshot = self._pending
+                self._pending = None
+
+            delta = (snapshot.processes is not None and self._last_had_processes
+                     and self._last_seq == seq - 1)
+            try:
+                self.send_bytes(self.server.encoded(seq, snapshot, delta, self.codec))
+            except OSError:
+                self.close()
+                return
+            self._last_seq = seq
+            self._last_had_processes = snapshot.processes is not None
+
+    def _read_loop(self):
+        try:
+            while not self.closed:
+                request = read_message(self.sock)
+                try:
+                    result = self.server.handle(self, request)
+                    reply = {"id": request.get("id"), "result": result}
+                except Exception as e:
+                    reply = {"id": request.get("id"), "error": str(e)}
+                self.send(reply)
+                if self.next_codec is not None:
+                    self.codec, self.next_codec = self.next_codec, None
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            self.close()
+
+
+class CollectorServer:
+    """
+    Serve an engine's snapshots, history and stored ranges over a Unix
+    domain socket and/or a TCP address, so several viewers share one
+    collector. Process data is collected only while some attached viewer
+    asks for it. TCP connections are not authenticated; listen on a
+    trusted network only.
+    """
+
+    def __init__(self, engine, path=None, listen=None):
+        self.engine = engine
+        self.path = path
+        self.listen = listen
+        # Bound (family, address) per listening socket; TCP port 0 resolves
+        # to the port actually assigned
+        self.addresses = []
+        self.connections = set()
+        self._lock = threading.Lock()
+        self._sockets = []
+        self._seq = 0
+        self._encoded = {}
+        self._encoded_seq = None
+        # Whether we hold a pin on the engine for our viewers; the
+        # engine's owner may hold its own, for an exporter
+        self._pinned = False
+
+    def start(self):
+        if self.path is not None:
+            self._sockets.append(self.bind_unix(self.path))
+        if self.listen is not None:
+            sock = socket.create_server(self.listen, backlog=64)
+            self._sockets.append(sock)
+        for sock in self._sockets:
+            self.addresses.append(sock.getsockname())
+
+        self.engine.set_collect_processes(False)
+        self.engine.subscribe(self.on_snapshot)
+        for sock in self._sockets:
+            threading.Thread(target=self._accept_loop, args=(sock,), daemon=True).start()
+
+    def bind_unix(self, path):
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix domain sockets are not available on this platform")
+        self.remove_stale_socket()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+        # Process lists and command lines are private to this user
+        os.chmod(path, 0o600)
+        sock.listen(16)
+        return sock
+
+    def stop(self):
+        self.engine.unsubscribe(self.on_snapshot)
+        sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            sock.close()
+        for connection in list(self.connections):
+            connection.close()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def remove_stale_socket(self):
+        """Remove a socket file left by a collector that is no longer running"""
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path)
+        else:
+            raise OSError(f"A collector is already listening on {self.path}")
+        finally:
+            probe.close()
+
+    def _accept_loop(self, listener):
+        while True:
+            try:
+                sock, address = listener.accept()
+            except OSError:
+                return
+            if sock.family != getattr(socket, "AF_UNIX", None):
+                # Snapshots are small and latency matters more than batching
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection = ClientConnection(self, sock)
+            with self._lock:
+                self.connections.add(connection)
+            connection.start()
+
+    def remove(self, connection):
+        with self._lock:
+            self.connections.discard(connection)
+        self.update_process_demand()
+
+    def update_process_demand(self):
+        with self._lock:
+            wanted = any(connection.wants_processes for connection in self.connections)
+            io = any(connection.wants_io for connection in self.connections)
+            pinned = any(connection.pins_processes for connection in self.connections)
+            pin_changed = pinned != self._pinned
+            self._pinned = pinned
+        self.engine.set_collect_processes(wanted)
+        self.engine.set_process_io(io)
+        if pin_changed:
+            self.engine.pin_processes(pinned)
+
+    def on_snapshot(self, snapshot):
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            connections = list(self.connections)
+        for connection in connections:
+            connection.offer(seq, snapshot)
+
+    def encoded(self, seq, snapshot, delta, codec):
+        """Frame a snapshot once per form and codec, shared by all viewers"""
+        key = (delta, codec)
+        with self._lock:
+            if self._encoded_seq != seq:
+                self._encoded_seq = seq
+                self._encoded = {}
+            message = self._encoded.get(key)
+        if message is None:
+            message = encode(snapshot_message(snapshot, seq, delta), codec)
+            with self._lock:
+                if self._encoded_seq == seq:
+                    self._encoded[key] = message
+        return message
+
+    def handle(self, connection, request):
+        """Answer one request and return its result"""
+        op = request.get("op")
+        if op == "hello":
+            codecs = [codec for codec in available_codecs() if codec in request.get("codecs", [])]
+            result = {
+                "version": PROTOCOL_VERSION,
+                "codec": codecs[0] if codecs else "json",
+                "interval": self.engine.interval,
+                "store": self.engine.store is not None,
+            }
+            # The reply still goes out in JSON; later messages use the codec
+            connection.next_codec = result["codec"]
+            return result
+        if op == "subscribe":
+            connection.subscribed = True
+            return True
+        if op == "processes":
+            connection.wants_processes = bool(request.get("enabled"))
+            self.update_process_demand()
+            return True
+        if op == "pin_processes":
+            connection.pins_processes = bool(request.get("pinned"))
+            self.update_process_demand()
+            return True
+        if op == "process_io":
+            connection.wants_io = bool(request.get("enabled"))
+            self.update_process_demand()
+            return True
+        if op == "request_sample":
+            self.engine.request_sample()
+            return True
+        if op == "history":
+            return self.history(request.get("seconds"))
+        if op == "query":
+            if self.engine.store is None:
+                raise ValueError("The collector keeps no stored history")
+            times, values = self.engine.store.query(
+                request["name"], request["start"], request["end"],
+                stat=request.get("stat", "avg"), max_points=request.get("max_points", 4000))
+            return {"times": times.tolist(), "values": values.tolist()}
+        raise ValueError(f"Unknown request {op!r}")
+
+    def history(self, seconds=None):
+        """Return the engine's recent history as plain lists"""
+        history = self.engine.history
+        seconds = seconds if seconds is not None else np.inf
+        result = {}
+        for name in MetricHistory.series:
+            times, values = history.since(name, seconds)
+            result["timestamps"] = times.tolist()
+            result[name] = values.tolist()
+        return result
+
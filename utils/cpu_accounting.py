@@ -0,0 +1,63 @@
+# utils/cpu_accounting.py
+import time
+
+NO_IO = (0.0, 0.0, 0.0)
+
+
+class CpuAccountant:
+    """
+    Compute per-process CPU% from cpu time deltas over the wall-clock
+    interval between updates, and I/O rates from the I/O counters the same
+    way. State is keyed by (pid, create_time), so a reused PID starts a new
+    window instead of inheriting old counters.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._state = {}
+        self._last_time = None
+
+    def update(self, records, elapsed=None, io=False):
+        """
+        Take pid -> record with create_time and cpu_time (seconds) and return
+        (pid -> CPU%, pid -> (read B/s, write B/s, syscalls/s)). Rates are
+        only computed with io, from the records' I/O counters; otherwise the
+        second mapping is empty. New processes report 0.0 until the next
+        update, as do processes whose counters were not kept last time.
+        """
+        now = self.clock()
+        if elapsed is None:
+            elapsed = now - self._last_time if self._last_time is not None else 0.0
+        self._last_time = now
+
+        state = self._state
+        new_state = {}
+        percents = {}
+        rates = {}
+        for pid, record in records.items():
+            create_time = record.create_time
+            cpu_time = record.cpu_time
+            previous = state.get(pid)
+            if previous is None or previous[0] != create_time or elapsed <= 0:
+                previous = None
+                percents[pid] = 0.0
+            else:
+                percents[pid] = max(0.0, (cpu_time - previous[1]) * 100.0 / elapsed)
+
+            if not io:
+                new_state[pid] = (create_time, cpu_time)
+                continue
+            read_bytes = record.read_bytes
+            write_bytes = record.write_bytes
+            syscalls = record.syscalls
+            if previous is None or len(previous) == 2:
+                rates[pid] = NO_IO
+            else:
+                rates[pid] = (max(0.0, (read_bytes - previous[2]) / elapsed),
+                              max(0.0, (write_bytes - previous[3]) / elapsed),
+                              max(0.0, (syscalls - previous[4]) / elapsed))
+            new_state[pid] = (create_time, cpu_time, read_bytes, write_bytes, syscalls)
+
+        # Vanished PIDs drop out because only the current set is kept
+        self._state = new_state
+        return percents, rates
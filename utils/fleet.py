@@ -0,0 +1,244 @@
+# utils/fleet.py
+import asyncio
+import heapq
+import random
+import threading
+import time
+from collections import namedtuple
+
+from utils.collector_server import PROTOCOL_VERSION, parse_address
+from utils.process_columns import SORT_FIELDS, NameTable
+from utils.wire import SnapshotDecoder, available_codecs, encode, read_message_async
+
+# State of one collector as last seen; snapshot is None until it reports.
+# updated is the time.monotonic() of the last snapshot, and a host silent
+# for stale_after seconds is stale.
+HostStatus = namedtuple("HostStatus", ["name", "connected", "snapshot", "error", "updated",
+                                       "stale_after"])
+
+# Every host's status at one moment
+FleetSnapshot = namedtuple("FleetSnapshot", ["timestamp", "hosts"])
+
+
+def is_stale(status, now=None):
+    """True once a host that has reported sends nothing for stale_after seconds"""
+    if status.updated is None:
+        return False
+    now = time.monotonic() if now is None else now
+    return now - status.updated > status.stale_after
+
+
+class FleetHost:
+    """Connection and latest data of one collector endpoint"""
+
+    def __init__(self, name, stale_after):
+        self.name = name
+        self.address = parse_address(name)
+        self.connected = False
+        self.snapshot = None
+        self.error = None
+        self.updated = None
+        self.stale_after = stale_after
+        self.codec = "json"
+        self.decoder = None
+        self.writer = None
+
+    def status(self):
+        return HostStatus(self.name, self.connected, self.snapshot, self.error, self.updated,
+                          self.stale_after)
+
+
+class FleetClient:
+    """
+    Follow many collector daemons over TCP from a single asyncio event
+    loop on one thread. Each host keeps one persistent connection that is
+    re-established with jittered exponential backoff. Subscribers receive
+    a FleetSnapshot of every host once per interval.
+
+    A host that sends no snapshot for stale_intervals of its collector's
+    sampling interval (a NAT timeout, a frozen VM) is marked stale and its
+    connection is dropped and re-established.
+    """
+
+    def __init__(self, endpoints, interval=1.0, connect_timeout=5.0, reconnect_max=30.0,
+                 stale_intervals=10):
+        self.interval = interval
+        self.stale_intervals = stale_intervals
+        self.hosts = [FleetHost(name, stale_intervals * interval) for name in endpoints]
+        # Hosts keep only process columns, with one name table for all
+        self.names = NameTable()
+        self.connect_timeout = connect_timeout
+        self.reconnect_max = reconnect_max
+        self.collect_process_data = True
+
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+
+    def subscribe(self, callback):
+        """Register a callable that receives every FleetSnapshot"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def set_collect_processes(self, enabled):
+        """Ask every collector to start or stop sending process tables"""
+        if enabled == self.collect_process_data:
+            return
+        self.collect_process_data = enabled
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._broadcast, {"op": "processes", "enabled": enabled})
+
+    def snapshot(self):
+        """Return the current FleetSnapshot"""
+        return FleetSnapshot(time.time(), tuple(host.status() for host in self.hosts))
+
+    def _run_loop(self, ready):
+        asyncio.run(self._main(ready))
+
+    async def _main(self, ready):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        ready.set()
+
+        tasks = [asyncio.create_task(self._follow(host)) for host in self.hosts]
+        tasks.append(asyncio.create_task(self._publish_loop()))
+        await self._stopping.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+
+    def _broadcast(self, message):
+        for host in self.hosts:
+            if host.connected and host.writer is not None:
+                host.writer.write(encode(dict(message, id=None), host.codec))
+
+    async def _follow(self, host):
+        # Spread the first connection attempts so 100 hosts do not connect
+        # in the same instant
+        await asyncio.sleep(random.uniform(0, min(self.interval, 1.0)))
+        delay = 0.5
+        while True:
+            writer = None
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(*host.address), self.connect_timeout)
+                await asyncio.wait_for(self._handshake(host, reader, writer), self.connect_timeout)
+                delay = 0.5
+                await self._receive(host, reader)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ConnectionError, asyncio.IncompleteReadError,
+                    asyncio.TimeoutError, ValueError, KeyError) as e:
+                host.error = str(e) or type(e).__name__
+            finally:
+                host.connected = False
+                host.writer = None
+                if writer is not None:
+                    writer.close()
+
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, self.reconnect_max)
+
+    async def _handshake(self, host, reader, writer):
+        host.codec = "json"
+        host.decoder = SnapshotDecoder(keep_processes=False, names=self.names)
+        requests = [
+            {"op": "hello", "codecs": available_codecs()},
+            {"op": "processes", "enabled": self.collect_process_data},
+            {"op": "subscribe"},
+        ]
+        for request_id, request in enumerate(requests, 1):
+            writer.write(encode(dict(request, id=request_id), host.codec))
+            await writer.drain()
+            reply = await read_message_async(reader)
+            if reply.get("error"):
+                raise ConnectionError(reply["error"])
+            if request["op"] == "hello":
+                if reply["result"]["version"] != PROTOCOL_VERSION:
+                    raise ConnectionError(f"protocol {reply['result']['version']}, "
+                                          f"expected {PROTOCOL_VERSION}")
+                host.codec = reply["result"]["codec"]
+                # Adaptive collectors may stretch this up to fourfold
+                host.stale_after = self.stale_intervals * reply["result"]["interval"]
+        host.writer = writer
+        host.connected = True
+        host.error = None
+
+    async def _receive(self, host, reader):
+        while True:
+            try:
+                message = await asyncio.wait_for(read_message_async(reader), host.stale_after)
+            except asyncio.TimeoutError:
+                # A silently dropped peer never closes the socket
+                raise ConnectionError(f"no data for {host.stale_after:g} s") from None
+            if message.get("event") == "snapshot":
+                host.snapshot = host.decoder.decode(message)
+                host.updated = time.monotonic()
+
+    async def _publish_loop(self):
+        # Publish on a fixed grid rather than per host message, so the
+        # consumers see at most one update per interval however many hosts
+        next_time = time.monotonic()
+        while True:
+            next_time += self.interval
+            await asyncio.sleep(max(0.0, next_time - time.monotonic()))
+            snapshot = self.snapshot()
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for callback in subscribers:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    print(f"Error in fleet subscriber: {e}")
+
+
+class FleetTop:
+    """
+    Top-N processes across hosts. Each host's own top N is cached until
+    its snapshot changes; the overall top N is then picked from those.
+    """
+
+    def __init__(self):
+        self._cache = {}
+
+    def select(self, hosts, sort_by="cpu", reverse=True, limit=50):
+        """Return [(host name, ProcessRow)] in display order"""
+        field = SORT_FIELDS[sort_by]
+        candidates = []
+        for status in hosts:
+            snapshot = status.snapshot
+            if snapshot is None or snapshot.process_columns is None:
+                continue
+            order = (sort_by, reverse, limit)
+            cached = self._cache.get(status.name)
+            if cached is None or cached[0] is not snapshot or cached[1] != order:
+                cached = self._cache[status.name] = (
+                    snapshot, order, snapshot.process_columns.top(sort_by, reverse, limit))
+            candidates.extend((status.name, info) for info in cached[2])
+
+        if reverse:
+            return heapq.nlargest(limit, candidates, key=lambda item: (field(item[1]), -item[1].pid))
+        return heapq.nsmallest(limit, candidates, key=lambda item: (field(item[1]), item[1].pid))
@@ -0,0 +1,235 @@
+# utils/gpu_telemetry.py
+import subprocess
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from utils.ring_buffer import RingBuffer
+
+# One GPU reading. load and memory_util are fractions in [0, 1]; memory
+# is in MiB and temperature in degrees Celsius. Any value nvidia-smi does
+# not report is None, never a made-up 0.
+GpuSample = namedtuple("GpuSample", [
+    "index",
+    "name",
+    "load",
+    "memory_util",
+    "memory_used",
+    "memory_total",
+    "temperature",
+])
+
+QUERY_FIELDS = "index,name,utilization.gpu,memory.used,memory.total,temperature.gpu"
+
+
+def default_command(interval):
+    """nvidia-smi in loop mode, printing one CSV line per GPU every interval"""
+    return [
+        "nvidia-smi",
+        f"--query-gpu={QUERY_FIELDS}",
+        "--format=csv,noheader,nounits",
+        f"--loop-ms={max(int(interval * 1000), 100)}",
+    ]
+
+
+def parse_number(text):
+    try:
+        return float(text)
+    except ValueError:
+        # nvidia-smi prints "[N/A]" or "[Not Supported]" for missing values
+        return None
+
+
+def percent(fraction):
+    return fraction * 100 if fraction is not None else np.nan
+
+
+def parse_line(line):
+    """Parse one CSV line of QUERY_FIELDS into a GpuSample, or None"""
+    parts = [part.strip() for part in line.split(",")]
+    if len(parts) != 6:
+        return None
+    try:
+        index = int(parts[0])
+    except ValueError:
+        return None
+    load = parse_number(parts[2])
+    used = parse_number(parts[3])
+    total = parse_number(parts[4])
+    memory_util = used / total if used is not None and total else None
+    return GpuSample(
+        index=index,
+        name=parts[1],
+        load=load / 100 if load is not None else None,
+        memory_util=memory_util,
+        memory_used=used,
+        memory_total=total,
+        temperature=parse_number(parts[5]),
+    )
+
+
+class GpuTelemetry:
+    """
+    Read GPU load and memory from one long-lived nvidia-smi process on a
+    worker thread. latest() only returns cached readings, so callers never
+    wait on the query. When no GPU tool is present the failure is cached
+    and retried with exponential backoff.
+    """
+
+    def __init__(self, interval=1.0, command=None, history=300,
+                 backoff_initial=5.0, backoff_max=300.0, stale_after=None):
+        self.interval = interval
+        self.command = command or default_command(interval)
+        self.capacity = history
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stale_after = stale_after if stale_after is not None else max(interval * 5, 5.0)
+
+        # None until the first attempt finishes, then True or False
+        self.available = None
+        self.failures = 0
+        self.retry_at = None
+
+        self._samples = ()
+        self._updated = None
+        self._history = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._process = None
+
+    def start(self):
+        """Start the worker thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the query process and the worker thread"""
+        self._stop_event.set()
+        self._terminate()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def latest(self):
+        """Return the newest GpuSample per GPU, or () if none are current"""
+        with self._lock:
+            if self._updated is None or time.monotonic() - self._updated > self.stale_after:
+                return ()
+            return self._samples
+
+    def series(self, index, name, n):
+        """
+        Return a copy of the newest n "load" or "memory" values of a GPU,
+        in percent; readings that were not reported are NaN.
+        """
+        with self._lock:
+            entry = self._history.get(index)
+            if entry is None:
+                return np.empty(0)
+            n = min(n, entry["count"], self.capacity)
+            if n == 0:
+                return np.empty(0)
+            return np.array(entry[name].view()[-n:])
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            produced = self._read_process()
+            if self._stop_event.is_set():
+                break
+
+            if produced:
+                # The tool worked but exited; restart it after a short pause
+                self.failures = 0
+                delay = self.backoff_initial
+            else:
+                self.available = False
+                self.failures += 1
+                delay = min(self.backoff_initial * 2 ** (self.failures - 1), self.backoff_max)
+            self.retry_at = time.monotonic() + delay
+            self._stop_event.wait(delay)
+
+    def _read_process(self):
+        """Run the query command until it exits; returns True if it produced data"""
+        try:
+            self._process = subprocess.Popen(
+                self.command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+            )
+        except OSError:
+            return False
+        if self._stop_event.is_set():
+            self._terminate()
+            return False
+
+        produced = False
+        pending = {}
+        expected = None
+        try:
+            for line in self._process.stdout:
+                sample = parse_line(line)
+                if sample is None:
+                    continue
+                # A repeated index starts the next block of readings; once
+                # the GPU count is known a block is complete when it is full
+                if sample.index in pending:
+                    expected = len(pending)
+                    self._publish(pending)
+                    pending = {}
+                pending[sample.index] = sample
+                if expected is not None and len(pending) == expected:
+                    self._publish(pending)
+                    pending = {}
+                produced = True
+            if pending:
+                self._publish(pending)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._terminate()
+        return produced
+
+    def _publish(self, pending):
+        samples = tuple(pending[index] for index in sorted(pending))
+        with self._lock:
+            self._samples = samples
+            self._updated = time.monotonic()
+            for sample in samples:
+                entry = self._history.get(sample.index)
+                if entry is None:
+                    entry = self._history[sample.index] = {
+                        "load": RingBuffer(self.capacity, fill=np.nan),
+                        "memory": RingBuffer(self.capacity, fill=np.nan),
+                        "count": 0,
+                    }
+                entry["load"].append(percent(sample.load))
+                entry["memory"].append(percent(sample.memory_util))
+                entry["count"] += 1
+        self.available = True
+        self.failures = 0
+
+    def _terminate(self):
+        process = self._process
+        if process is None:
+            return
+        try:
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            if process.stdout is not None:
+                process.stdout.close()
+        except (OSError, ValueError):
+            pass
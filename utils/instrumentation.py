@@ -0,0 +1,214 @@
+# utils/instrumentation.py
+import cProfile
+import io
+import json
+import math
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_right
+
+# Histogram bucket upper bounds in seconds: 1 µs to 10 s, four per decade
+BUCKETS = tuple(10 ** (exponent / 4) for exponent in range(-24, 5))
+
+
+class LatencyHistogram:
+    """Counts of durations in log-spaced buckets, plus count, sum and max"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_right(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile"""
+        if self.count == 0:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKETS[index], self.max) if index < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": {f"{bound:.3g}": count
+                        for bound, count in zip(BUCKETS + (math.inf,), self.counts) if count},
+        }
+
+
+class TickCounter:
+    """A per-tick count: the last value, its mean and its maximum"""
+
+    def __init__(self):
+        self.last = 0
+        self.ticks = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        self.last = value
+        self.ticks += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self):
+        return {
+            "last": self.last,
+            "mean": self.total / self.ticks if self.ticks else None,
+            "max": self.max,
+        }
+
+
+class Stage:
+    """Context manager timing one named stage into its histogram"""
+
+    def __init__(self, instruments, name):
+        self.instruments = instruments
+        self.histogram = LatencyHistogram()
+        self.name = name
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._local.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self._local.start
+        with self.instruments._lock:
+            self.histogram.record(elapsed)
+        return False
+
+
+class Instrumentation:
+    """
+    The task manager's own cost: latency histograms per named stage, memory
+    blocks allocated and widgets created per sampling tick, and optional
+    cProfile and tracemalloc captures that can be turned on at runtime.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.ticks = 0
+        self.widgets = 0
+        self.allocations = TickCounter()
+        self.widgets_per_tick = TickCounter()
+        self.profile_result = None
+        self.tracemalloc_result = None
+
+        self._lock = threading.Lock()
+        self._blocks = sys.getallocatedblocks()
+        self._tick_widgets = 0
+        self._profile = None
+        self._profile_wanted = False
+
+    def measure(self, name):
+        """Return the timer for a stage: with instruments.measure("name"): ..."""
+        stage = self.stages.get(name)
+        if stage is None:
+            with self._lock:
+                stage = self.stages.setdefault(name, Stage(self, name))
+        return stage
+
+    def count_widgets(self, count=1):
+        """Note widgets created outside of startup"""
+        with self._lock:
+            self.widgets += count
+            self._tick_widgets += count
+
+    def begin_tick(self):
+        """Called by the sampling thread before each tick"""
+        if self._profile_wanted and self._profile is None:
+            self._profile = cProfile.Profile()
+        if self._profile is not None:
+            self._profile.enable()
+
+    def end_tick(self):
+        """Called by the sampling thread after each tick"""
+        if self._profile is not None:
+            self._profile.disable()
+            if not self._profile_wanted:
+                self.profile_result = self._summarize_profile(self._profile)
+                self._profile = None
+
+        # Net memory blocks allocated since the previous tick; the same
+        # count also covers what the Tk thread did in between
+        blocks = sys.getallocatedblocks()
+        with self._lock:
+            self.allocations.record(blocks - self._blocks)
+            self._blocks = blocks
+            self.widgets_per_tick.record(self._tick_widgets)
+            self._tick_widgets = 0
+            self.ticks += 1
+
+    @property
+    def profiling(self):
+        return self._profile_wanted
+
+    def set_profiling(self, enabled):
+        """
+        Profile the sampling thread's ticks with cProfile. The summary is
+        kept in profile_result once profiling is turned off.
+        """
+        self._profile_wanted = enabled
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def set_tracing(self, enabled, limit=15):
+        """Start tracemalloc, or stop it and keep its top allocation sites"""
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            statistics = tracemalloc.take_snapshot().statistics("lineno")[:limit]
+            tracemalloc.stop()
+            self.tracemalloc_result = [
+                {"site": str(stat.traceback[0]), "size": stat.size, "count": stat.count}
+                for stat in statistics
+            ]
+
+    def _summarize_profile(self, profile, limit=15):
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def report(self):
+        """Everything measured so far as plain data"""
+        with self._lock:
+            stages = {name: stage.histogram.summary() for name, stage in sorted(self.stages.items())}
+            return {
+                "timestamp": time.time(),
+                "ticks": self.ticks,
+                "stages": stages,
+                "allocated_blocks_per_tick": self.allocations.summary(),
+                "widgets_created": self.widgets,
+                "widgets_per_tick": self.widgets_per_tick.summary(),
+                "profile": self.profile_result,
+                "tracemalloc": self.tracemalloc_result,
+            }
+
+    def export(self, path):
+        """Write report() to path as JSON"""
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2, default=str)
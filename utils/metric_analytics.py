@@ -0,0 +1,146 @@
+# utils/metric_analytics.py
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Summary of one series over a time window; None for an empty window
+SeriesStats = namedtuple("SeriesStats", [
+    "count",
+    "mean",
+    "min",
+    "max",
+    "p50",
+    "p95",
+    "p99",
+    "ewma",
+    "rate",
+])
+
+
+def rolling_mean(values, window):
+    """Mean of every window consecutive values; len(values) - window + 1 results"""
+    values = np.asarray(values, dtype=float)
+    if window <= 0 or len(values) < window:
+        return np.empty(0)
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums[window - 1:] / window
+
+
+def ewma(values, alpha):
+    """
+    Exponentially weighted moving average of every prefix, seeded with
+    the first value. Computed block-wise in closed form, on values scaled
+    to at most 2 in magnitude and with blocks short enough that the decay
+    powers and their weighted sums stay within float range. alpha must be
+    greater than 0.
+    """
+    if not alpha > 0:
+        raise ValueError(f"alpha must be greater than 0, got {alpha}")
+    values = np.asarray(values, dtype=float)
+    result = np.empty_like(values)
+    if len(values) == 0:
+        return result
+    if alpha >= 1:
+        result[:] = values
+        return result
+
+    decay = 1 - alpha
+    if decay == 1:
+        # alpha below float resolution: the first value never moves
+        result[:] = values[0]
+        return result
+    # Dividing by a power of two is exact; byte counters in the 1e9 range
+    # would otherwise overflow once weighted by decay powers near 1e280
+    peak = float(np.max(np.abs(values)))
+    norm = math.ldexp(1.0, math.frexp(peak)[1] - 1) if 0 < peak < math.inf else 1.0
+    values = values / norm
+
+    block = max(1, min(len(values), int(280 / -math.log10(decay))))
+    # decay ** -k for k = 1..block
+    powers = decay ** -np.arange(1, block + 1, dtype=float)
+
+    last = result[0] = values[0]
+    start = 1
+    while start < len(values):
+        chunk = values[start:start + block]
+        scale = powers[:len(chunk)]
+        # y_k = decay**k * (y_0 + alpha * sum_j x_j * decay**-j)
+        result[start:start + len(chunk)] = (last + alpha * np.cumsum(chunk * scale)) / scale
+        last = result[start + len(chunk) - 1]
+        start += len(chunk)
+    result *= norm
+    return result
+
+
+def rate(times, values):
+    """Rate of change per second between consecutive samples"""
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return np.empty(0)
+    elapsed = np.diff(times)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(elapsed > 0, np.diff(values) / elapsed, 0.0)
+
+
+def summarize(times, values, alpha=0.3):
+    """Return SeriesStats for a window of samples, or None if it is empty"""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return None
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    elapsed = times[-1] - times[0] if len(times) > 1 else 0.0
+    return SeriesStats(
+        count=len(values),
+        mean=float(values.mean()),
+        min=float(values.min()),
+        max=float(values.max()),
+        p50=float(p50),
+        p95=float(p95),
+        p99=float(p99),
+        ewma=float(ewma(values, alpha)[-1]),
+        rate=float((values[-1] - values[0]) / elapsed) if elapsed > 0 else 0.0,
+    )
+
+
+class MetricAnalytics:
+    """
+    Batch statistics over time windows of a MetricHistory, so views ask
+    for "p95 CPU over the last 10 minutes" instead of keeping their own
+    running numbers.
+    """
+
+    def __init__(self, history):
+        self.history = history
+
+    def window(self, name, seconds, now=None):
+        """Return (timestamps, values) of the last seconds of a series, gaps dropped"""
+        times, values = self.history.since(name, seconds, now)
+        present = ~np.isnan(values)
+        return times[present], values[present]
+
+    def stats(self, name, seconds, now=None, alpha=0.3):
+        """Return SeriesStats of a series over the last seconds, or None"""
+        times, values = self.window(name, seconds, now)
+        return summarize(times, values, alpha)
+
+    def percentile(self, name, seconds, q, now=None):
+        """Return the q-th percentile of a series over the last seconds, or None"""
+        times, values = self.window(name, seconds, now)
+        if len(values) == 0:
+            return None
+        return float(np.percentile(values, q))
+
+    def rolling_mean(self, name, seconds, window, now=None):
+        times, values = self.window(name, seconds, now)
+        return times[window - 1:] if window > 0 else times[:0], rolling_mean(values, window)
+
+    def ewma(self, name, seconds, alpha, now=None):
+        times, values = self.window(name, seconds, now)
+        return times, ewma(values, alpha)
+
+    def rate(self, name, seconds, now=None):
+        times, values = self.window(name, seconds, now)
+        return times[1:], rate(times, values)
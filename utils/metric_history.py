@@ -0,0 +1,54 @@
+# utils/metric_history.py
+import math
+import threading
+
+import numpy as np
+
+from utils.ring_buffer import RingBuffer
+
+
+class MetricHistory:
+    """
+    Host metrics of recent snapshots kept in fixed-size ring buffers, so a
+    view that was hidden can catch up without polling the system again.
+    """
+
+    series = ("cpu", "memory", "temperature", "net_sent", "net_recv")
+
+    def __init__(self, capacity=3600):
+        self.capacity = capacity
+        self.count = 0
+        self.timestamps = RingBuffer(capacity, fill=math.nan)
+        self.buffers = {name: RingBuffer(capacity, fill=math.nan) for name in self.series}
+        self._lock = threading.Lock()
+
+    def record(self, snapshot):
+        temperature = snapshot.temperature if snapshot.temperature is not None else math.nan
+        with self._lock:
+            self.timestamps.append(snapshot.timestamp)
+            self.buffers["cpu"].append(snapshot.cpu_percent)
+            self.buffers["memory"].append(snapshot.memory.percent)
+            self.buffers["temperature"].append(temperature)
+            self.buffers["net_sent"].append(snapshot.net_sent_speed)
+            self.buffers["net_recv"].append(snapshot.net_recv_speed)
+            self.count += 1
+
+    def last(self, name, n):
+        """Return a copy of the newest n values of a series, oldest first"""
+        with self._lock:
+            n = min(n, self.count, self.capacity)
+            if n == 0:
+                return np.empty(0)
+            return np.array(self.buffers[name].view()[-n:])
+
+    def since(self, name, seconds, now=None):
+        """Return copies of (timestamps, values) of a series from the last seconds"""
+        with self._lock:
+            n = min(self.count, self.capacity)
+            if n == 0:
+                return np.empty(0), np.empty(0)
+            times = self.timestamps.view()[-n:]
+            # Windows end at the newest sample unless told otherwise
+            now = now if now is not None else times[-1]
+            recent = times >= now - seconds
+            return times[recent], self.buffers[name].view()[-n:][recent]
@@ -0,0 +1,357 @@
+# utils/metric_store.py
+import math
+import mmap
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+HOST_SERIES = ("cpu", "memory", "temperature", "net_sent", "net_recv")
+
+# A tier stores rows at a fixed resolution in segment files of span
+# seconds, aligned to multiples of span. Each column is (name, dtype,
+# width) and is laid out contiguously within the file.
+Tier = namedtuple("Tier", ["name", "resolution", "span", "retention", "columns"])
+
+RAW = Tier("raw", 1, 3600, 24 * 3600,
+           [(name, "f8", 1) for name in HOST_SERIES])
+MINUTE = Tier("1m", 60, 24 * 3600, 30 * 24 * 3600,
+              [(name, "f8", 1) for name in HOST_SERIES])
+HOUR = Tier("1h", 3600, 30 * 24 * 3600, 365 * 24 * 3600,
+            [(f"{name}_{stat}", "f8", 1) for name in HOST_SERIES for stat in ("min", "avg", "max")])
+
+
+def process_tier(count, resolution):
+    return Tier("processes", resolution, 24 * 3600, 7 * 24 * 3600, [
+        ("pid", "i4", count),
+        ("cpu", "f4", count),
+        ("memory", "f8", count),
+        ("name", "S32", count),
+    ])
+
+
+def host_values(snapshot):
+    temperature = snapshot.temperature if snapshot.temperature is not None else math.nan
+    return (snapshot.cpu_percent, snapshot.memory.percent, temperature,
+            snapshot.net_sent_speed, snapshot.net_recv_speed)
+
+
+class Segment:
+    """
+    One fixed-size columnar file covering [start, start + span) of a tier.
+    Row i holds the sample for start + i * resolution; empty float rows are
+    NaN and empty process slots have pid 0.
+    """
+
+    def __init__(self, path, tier, start, writable=False):
+        self.path = path
+        self.tier = tier
+        self.start = start
+        self.writable = writable
+        self.capacity = tier.span // tier.resolution
+
+        layout = []
+        size = 0
+        for name, dtype, width in tier.columns:
+            dtype = np.dtype(dtype)
+            shape = (self.capacity,) if width == 1 else (self.capacity, width)
+            layout.append((name, dtype, shape, size))
+            size += self.capacity * width * dtype.itemsize
+
+        if writable and (not os.path.exists(path) or os.path.getsize(path) != size):
+            self.create(path, layout, size)
+        elif os.path.getsize(path) != size:
+            raise ValueError(f"Segment {path} does not match the tier layout")
+
+        self.file = open(path, "r+b" if writable else "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0,
+                             access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        self.columns = {name: np.ndarray(shape, dtype, buffer=self.map, offset=offset)
+                        for name, dtype, shape, offset in layout}
+
+    @staticmethod
+    def create(path, layout, size):
+        # Build the empty file in memory and rename it into place, so a
+        # reader never maps a half-initialized segment
+        data = np.zeros(size, dtype=np.uint8)
+        for name, dtype, shape, offset in layout:
+            if dtype.kind == "f":
+                np.ndarray(shape, dtype, buffer=data, offset=offset)[...] = np.nan
+        tmp_path = path + ".tmp"
+        data.tofile(tmp_path)
+        os.replace(tmp_path, path)
+
+    @property
+    def end(self):
+        return self.start + self.tier.span
+
+    def slot(self, timestamp):
+        return int((timestamp - self.start) // self.tier.resolution)
+
+    def close(self):
+        if self.map is None:
+            return
+        self.columns = None
+        if self.writable:
+            self.map.flush()
+        self.map.close()
+        self.file.close()
+        self.map = None
+
+
+class MetricStore:
+    """
+    Embedded on-disk history of host metrics and the top processes.
+
+    Samples go into memory-mapped raw segments at 1 s resolution. When a
+    minute closes, its 1 min averages and the hour's running 1 h
+    min/avg/max are rolled up from the raw rows still mapped. Raw segments
+    past retention are compacted: their rollups are recomputed from the
+    raw rows, then the file is deleted. Queries pick the finest tier that
+    covers the range.
+    """
+
+    def __init__(self, root, process_count=10, process_resolution=60):
+        self.root = root
+        self.process_count = process_count
+        self.tiers = [RAW, MINUTE, HOUR, process_tier(process_count, process_resolution)]
+        self.process = self.tiers[3]
+        for tier in self.tiers:
+            os.makedirs(os.path.join(root, tier.name), exist_ok=True)
+
+        self._writers = {}
+        self._lock = threading.Lock()
+        self._minute = None
+        self._last_process_slot = None
+
+        self.compact()
+
+    def append(self, snapshot):
+        """Record one snapshot; cheap enough to call on every tick"""
+        timestamp = snapshot.timestamp
+        values = host_values(snapshot)
+        with self._lock:
+            minute = int(timestamp // MINUTE.resolution) * MINUTE.resolution
+            if minute != self._minute:
+                self._flush_minute()
+                self._minute = minute
+
+            segment = self._writers.get(RAW.name)
+            if segment is None or not segment.start <= timestamp < segment.end:
+                segment = self._writer(RAW, timestamp)
+            slot = int(timestamp - segment.start) // RAW.resolution
+            columns = segment.columns
+            for name, value in zip(HOST_SERIES, values):
+                columns[name][slot] = value
+            if snapshot.process_columns is not None:
+                slot = int(timestamp // self.process.resolution)
+                if slot != self._last_process_slot:
+                    self._last_process_slot = slot
+                    self._write_processes(timestamp, snapshot.process_columns)
+
+    def close(self):
+        """Write pending rollups and unmap all open segments"""
+        with self._lock:
+            self._flush_minute()
+            raw = self._writers.get(RAW.name)
+            if raw is not None:
+                self._rollup(raw, 0, raw.capacity)
+            for segment in self._writers.values():
+                segment.close()
+            self._writers = {}
+
+    def _path(self, tier, start):
+        return os.path.join(self.root, tier.name, f"{start}.seg")
+
+    def _writer(self, tier, timestamp):
+        segment = self._writers.get(tier.name)
+        if segment is not None and segment.start <= timestamp < segment.end:
+            return segment
+
+        start = int(timestamp // tier.span) * tier.span
+        if segment is not None:
+            if tier is RAW:
+                self._rollup(segment, 0, segment.capacity)
+            segment.close()
+        segment = self._writers[tier.name] = Segment(self._path(tier, start), tier, start, writable=True)
+        if tier is RAW:
+            # A new raw segment starts once per span; a good time to expire
+            self._compact(timestamp)
+        return segment
+
+    def _write_processes(self, timestamp, processes):
+        top = processes.order("cpu", True, self.process_count)
+        count = len(top)
+        segment = self._writer(self.process, timestamp)
+        slot = segment.slot(timestamp)
+        columns = segment.columns
+        columns["pid"][slot] = 0
+        columns["pid"][slot, :count] = processes.pid[top]
+        columns["cpu"][slot, :count] = processes.cpu[top]
+        columns["memory"][slot, :count] = processes.memory_raw[top]
+        names = processes.names.names
+        for i, name_id in enumerate(processes.name[top].tolist()):
+            columns["name"][slot, i] = names[name_id].encode("utf-8", "replace")[:32]
+
+    def compact(self, now=None):
+        """Roll up and delete raw segments past retention, expire old rollups"""
+        with self._lock:
+            self._compact(now if now is not None else time.time())
+
+    def _compact(self, now):
+        for tier in self.tiers:
+            for start in self.segment_starts(tier):
+                if start + tier.span > now - tier.retention:
+                    continue
+                writer = self._writers.get(tier.name)
+                if writer is not None and writer.start == start:
+                    continue
+                path = self._path(tier, start)
+                try:
+                    if tier is RAW:
+                        self._rollup_segment(path, start)
+                    os.remove(path)
+                except (OSError, ValueError) as e:
+                    # Windows refuses to delete a file a reader still maps;
+                    # the next pass tries again
+                    print(f"Error compacting {path}: {e}")
+
+    def _flush_minute(self):
+        # Roll up the minute that just closed while it is still in the
+        # open raw segment
+        minute = self._minute
+        self._minute = None
+        writer = self._writers.get(RAW.name)
+        if minute is None or writer is None or not writer.start <= minute < writer.end:
+            return
+        low = writer.slot(minute)
+        self._rollup(writer, low, low + MINUTE.resolution // RAW.resolution)
+
+    def _rollup_segment(self, path, start):
+        """Recompute the 1 min and 1 h rows of one raw segment from its data"""
+        segment = Segment(path, RAW, start)
+        try:
+            self._rollup(segment, 0, segment.capacity)
+        finally:
+            segment.close()
+
+    def _rollup(self, segment, low, high):
+        """
+        Write 1 min averages for raw rows [low, high) and the 1 h
+        min/avg/max row of the whole segment, so far. Raw segments are one
+        hour long, so they cover whole minutes and exactly one hour row.
+        """
+        per_minute = MINUTE.resolution // RAW.resolution
+        start = segment.start + low * RAW.resolution
+        minute_segment = self._open_for_write(MINUTE, start)
+        hour_segment = self._open_for_write(HOUR, segment.start)
+        try:
+            offset = minute_segment.slot(start)
+            for name in HOST_SERIES:
+                values = segment.columns[name][low:high].reshape(-1, per_minute)
+                counts = (~np.isnan(values)).sum(axis=1)
+                sums = np.nansum(values, axis=1)
+                present = counts > 0
+                rows = minute_segment.columns[name][offset:offset + len(counts)]
+                rows[present] = sums[present] / counts[present]
+
+                flat = segment.columns[name]
+                count = int((~np.isnan(flat)).sum())
+                if count:
+                    hour_slot = hour_segment.slot(segment.start)
+                    hour_segment.columns[f"{name}_min"][hour_slot] = np.nanmin(flat)
+                    hour_segment.columns[f"{name}_avg"][hour_slot] = np.nansum(flat) / count
+                    hour_segment.columns[f"{name}_max"][hour_slot] = np.nanmax(flat)
+        finally:
+            for rollup_segment in (minute_segment, hour_segment):
+                if rollup_segment is not self._writers.get(rollup_segment.tier.name):
+                    rollup_segment.close()
+
+    def _open_for_write(self, tier, timestamp):
+        writer = self._writers.get(tier.name)
+        if writer is None or writer.start <= timestamp:
+            # Rolling forward; keep the segment open for the next rollup
+            return self._writer(tier, timestamp)
+        start = int(timestamp // tier.span) * tier.span
+        return Segment(self._path(tier, start), tier, start, writable=True)
+
+    def segment_starts(self, tier):
+        """Return the start times of the tier's segment files, oldest first"""
+        starts = []
+        for filename in os.listdir(os.path.join(self.root, tier.name)):
+            if filename.endswith(".seg"):
+                try:
+                    starts.append(int(filename[:-4]))
+                except ValueError:
+                    continue
+        return sorted(starts)
+
+    def pick_tier(self, start, end, max_points=4000, now=None):
+        """Return the finest host tier that still holds start and fits max_points"""
+        now = now if now is not None else time.time()
+        for tier in (RAW, MINUTE):
+            if (end - start) / tier.resolution <= max_points and start >= now - tier.retention:
+                return tier
+        return HOUR
+
+    def _read(self, tier, start, end, names, presence):
+        """Yield (segment start, first slot, row mask, {name: copied rows}) per segment"""
+        first = int(start // tier.span) * tier.span
+        for segment_start in range(first, int(end) + 1, tier.span):
+            path = self._path(tier, segment_start)
+            try:
+                segment = Segment(path, tier, segment_start)
+            except (OSError, ValueError):
+                continue
+            try:
+                low = max(0, math.ceil((start - segment_start) / tier.resolution))
+                high = min(segment.capacity, int((end - segment_start) // tier.resolution) + 1)
+                if low >= high:
+                    continue
+                mask = presence(segment.columns, low, high)
+                rows = {name: segment.columns[name][low:high][mask] for name in names}
+                yield segment_start, low, mask, rows
+            finally:
+                segment.close()
+
+    def query(self, name, start, end, stat="avg", max_points=4000, tier=None):
+        """
+        Return (timestamps, values) of a host series between two wall-clock
+        times. stat picks min, avg or max where the tier keeps them; finer
+        tiers only store one value per row.
+        """
+        tier = tier or self.pick_tier(start, end, max_points)
+        column = f"{name}_{stat}" if tier is HOUR else name
+        marker = "cpu_avg" if tier is HOUR else "cpu"
+        presence = lambda columns, low, high: ~np.isnan(columns[marker][low:high])
+
+        times = []
+        values = []
+        for segment_start, low, mask, rows in self._read(tier, start, end, [column], presence):
+            slots = np.arange(low, low + len(mask))[mask]
+            times.append(segment_start + slots * tier.resolution)
+            values.append(rows[column])
+        if not times:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(times).astype(float), np.concatenate(values)
+
+    def query_processes(self, start, end):
+        """Return [(timestamp, [(pid, name, cpu, memory_raw), ...])] of the top processes"""
+        tier = self.process
+        presence = lambda columns, low, high: columns["pid"][low:high, 0] > 0
+        names = ["pid", "cpu", "memory", "name"]
+
+        result = []
+        for segment_start, low, mask, rows in self._read(tier, start, end, names, presence):
+            slots = np.arange(low, low + len(mask))[mask]
+            for i, slot in enumerate(slots):
+                entries = [
+                    (int(pid), name.decode("utf-8", "replace"), float(cpu), float(memory))
+                    for pid, name, cpu, memory in zip(rows["pid"][i], rows["name"][i],
+                                                      rows["cpu"][i], rows["memory"][i])
+                    if pid > 0
+                ]
+                result.append((segment_start + int(slot) * tier.resolution, entries))
+        return result
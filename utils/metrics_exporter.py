@@ -0,0 +1,265 @@
+# utils/metrics_exporter.py
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def escape_label(value, max_length=None):
+    """Quote a label value as the exposition format requires"""
+    value = str(value)
+    if max_length is not None and len(value) > max_length:
+        value = value[:max_length]
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricFamily:
+    """One metric name with its samples, rendered in either text format"""
+
+    def __init__(self, name, kind, help_text):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.samples = []
+
+    def add(self, value, labels=None):
+        self.samples.append((labels or "", value))
+        return self
+
+    def render(self, lines, openmetrics=False):
+        if not self.samples:
+            return
+        # OpenMetrics names the counter family without its _total suffix
+        family = self.name
+        if openmetrics and self.kind == "counter" and family.endswith("_total"):
+            family = family[:-len("_total")]
+        lines.append(f"# HELP {family} {self.help}")
+        lines.append(f"# TYPE {family} {self.kind}")
+        for labels, value in self.samples:
+            lines.append(f"{self.name}{{{labels}}} {format_value(value)}" if labels
+                         else f"{self.name} {format_value(value)}")
+
+
+def host_families(snapshot):
+    """Host-wide gauges and counters from one Snapshot"""
+    families = [
+        MetricFamily("taskmanager_sample_timestamp_seconds", "gauge",
+                     "Time the sample was taken").add(snapshot.timestamp),
+        MetricFamily("taskmanager_cpu_percent", "gauge",
+                     "System-wide CPU utilization").add(snapshot.cpu_percent),
+    ]
+
+    memory = snapshot.memory
+    if memory is not None:
+        family = MetricFamily("taskmanager_memory_bytes", "gauge", "Physical memory by state")
+        for state in ("total", "available", "used"):
+            family.add(getattr(memory, state), f'state="{state}"')
+        families.append(family)
+        families.append(MetricFamily("taskmanager_memory_percent", "gauge",
+                                     "Physical memory in use").add(memory.percent))
+
+    if snapshot.net_io is not None:
+        families.append(
+            MetricFamily("taskmanager_network_bytes_total", "counter", "Bytes moved by all interfaces")
+            .add(snapshot.net_io.bytes_sent, 'direction="sent"')
+            .add(snapshot.net_io.bytes_recv, 'direction="received"'))
+    families.append(
+        MetricFamily("taskmanager_network_bytes_per_second", "gauge",
+                     "Network throughput over the last sample interval")
+        .add(snapshot.net_sent_speed * 1024 * 1024, 'direction="sent"')
+        .add(snapshot.net_recv_speed * 1024 * 1024, 'direction="received"'))
+
+    disk = snapshot.disk
+    if disk is not None:
+        family = MetricFamily("taskmanager_disk_bytes", "gauge", "Space on the monitored disk by state")
+        for state in ("total", "used", "free"):
+            family.add(getattr(disk, state), f'state="{state}"')
+        families.append(family)
+        families.append(MetricFamily("taskmanager_disk_percent", "gauge",
+                                     "Space in use on the monitored disk").add(disk.percent))
+
+    if snapshot.temperature is not None:
+        families.append(MetricFamily("taskmanager_temperature_celsius", "gauge",
+                                     "First reported sensor temperature").add(snapshot.temperature))
+
+    battery = snapshot.battery
+    if battery is not None:
+        families.append(MetricFamily("taskmanager_battery_percent", "gauge",
+                                     "Battery charge").add(battery.percent))
+        families.append(MetricFamily("taskmanager_battery_plugged", "gauge",
+                                     "1 when running on external power").add(bool(battery.power_plugged)))
+
+    if snapshot.gpus:
+        load = MetricFamily("taskmanager_gpu_load_ratio", "gauge", "GPU utilization from 0 to 1")
+        used = MetricFamily("taskmanager_gpu_memory_used_bytes", "gauge", "GPU memory in use")
+        total = MetricFamily("taskmanager_gpu_memory_total_bytes", "gauge", "GPU memory size")
+        temperature = MetricFamily("taskmanager_gpu_temperature_celsius", "gauge", "GPU temperature")
+        for gpu in snapshot.gpus:
+            labels = f'gpu="{gpu.index}",name="{escape_label(gpu.name)}"'
+            if gpu.load is not None:
+                load.add(gpu.load, labels)
+            if gpu.memory_used is not None:
+                used.add(gpu.memory_used * 1024 * 1024, labels)
+            if gpu.memory_total is not None:
+                total.add(gpu.memory_total * 1024 * 1024, labels)
+            if gpu.temperature is not None:
+                temperature.add(gpu.temperature, labels)
+        families.extend([load, used, total, temperature])
+
+    return families
+
+
+def scheduler_families(scheduler):
+    """The sampler's own rate and cost"""
+    return [
+        MetricFamily("taskmanager_sample_interval_seconds", "gauge",
+                     "Interval the sampler is currently using").add(scheduler.interval),
+        MetricFamily("taskmanager_sampler_overhead_ratio", "gauge",
+                     "CPU time spent sampling, as a fraction of one core").add(scheduler.overhead),
+        MetricFamily("taskmanager_sampler_throttled", "gauge",
+                     "1 while the overhead budget holds the interval up").add(scheduler.throttled),
+    ]
+
+
+def process_families(processes, limit, max_label_length):
+    """
+    Per-process gauges for the top processes by CPU and by memory. Only
+    these get series, so churn among idle processes does not add labels.
+    """
+    families = [MetricFamily("taskmanager_processes", "gauge",
+                             "Number of processes").add(len(processes))]
+    if limit <= 0:
+        return families
+
+    top = {}
+    for sort_by in ("cpu", "memory"):
+        for info in processes.top(sort_by, True, limit):
+            top[info.pid] = info
+
+    cpu = MetricFamily("taskmanager_process_cpu_percent", "gauge",
+                       f"CPU use of the top {limit} processes by CPU or memory")
+    memory = MetricFamily("taskmanager_process_memory_bytes", "gauge",
+                          f"Resident memory of the top {limit} processes by CPU or memory")
+    for pid in sorted(top):
+        info = top[pid]
+        labels = f'pid="{pid}",name="{escape_label(info.name, max_label_length)}"'
+        cpu.add(info.cpu, labels)
+        memory.add(info.memory_raw, labels)
+    families.extend([cpu, memory])
+    return families
+
+
+class MetricsExporter:
+    """
+    Serve the engine's latest snapshot on an HTTP /metrics endpoint in the
+    Prometheus or OpenMetrics text format. Scrapes never sample the system;
+    the text is rendered once per snapshot, on the first scrape that needs
+    it, and reused until the next one. Per-process series are limited to
+    the top process_limit by CPU and by memory.
+    """
+
+    def __init__(self, engine, address=("127.0.0.1", 9101), process_limit=10, max_label_length=64):
+        self.engine = engine
+        self.address = address
+        self.process_limit = process_limit
+        self.max_label_length = max_label_length
+        self.renders = 0
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._families = None
+        self._rendered = {}
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                exporter.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(self.address, Handler)
+        self._server.daemon_threads = True
+        # Port 0 picks a free port
+        self.address = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def handle(self, request):
+        if request.path.split("?", 1)[0] != "/metrics":
+            request.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in request.headers.get("Accept", "")
+        compressed = "gzip" in request.headers.get("Accept-Encoding", "")
+        try:
+            body = self.render(openmetrics, compressed)
+        except Exception as e:
+            print(f"Error rendering metrics: {e}")
+            request.send_error(500)
+            return
+
+        request.send_response(200)
+        request.send_header("Content-Type", OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+        if compressed:
+            request.send_header("Content-Encoding", "gzip")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def render(self, openmetrics=False, compressed=False):
+        """Return the exposition body for the latest snapshot"""
+        with self._lock:
+            snapshot = self.engine.latest
+            if snapshot is not self._snapshot:
+                self._snapshot = snapshot
+                self._families = None
+                self._rendered = {}
+            body = self._rendered.get((openmetrics, compressed))
+            if body is None:
+                body = self._rendered.get((openmetrics, False))
+                if body is None:
+                    body = self._rendered[(openmetrics, False)] = self._render_text(snapshot, openmetrics)
+                if compressed:
+                    body = self._rendered[(openmetrics, True)] = gzip.compress(body, compresslevel=5)
+            return body
+
+    def _render_text(self, snapshot, openmetrics):
+        self.renders += 1
+        if self._families is None and snapshot is not None:
+            # Processes are only exported while collection is running, so a
+            # paused table never shows up as stale series
+            self._families = host_families(snapshot)
+            scheduler = getattr(self.engine, "scheduler", None)
+            if scheduler is not None:
+                self._families += scheduler_families(scheduler)
+            if snapshot.process_columns is not None:
+                self._families += process_families(
+                    snapshot.process_columns, self.process_limit, self.max_label_length)
+        lines = []
+        for family in self._families or ():
+            family.render(lines, openmetrics)
+        if openmetrics:
+            lines.append("# EOF")
+        return ("\n".join(lines) + "\n").encode("utf-8")
@@ -0,0 +1,262 @@
+# utils/proc_reader.py
+import os
+import sys
+from collections import namedtuple
+
+try:
+    import pwd
+except ImportError:  # Windows
+    pwd = None
+
+import psutil
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+HAS_PROCFS = sys.platform.startswith("linux") and os.path.isdir("/proc")
+
+# Fields a collector can be asked for; "memory" needs statm and "io"
+# /proc/<pid>/io on every tick, "exe", "cmdline" and "username" one read per
+# new process, everything else comes from stat. "io" is off by default.
+DEFAULT_FIELDS = frozenset(["name", "cpu", "memory", "status", "cmdline", "username"])
+
+# Raw per-process values returned by a collector on every tick
+ProcessRecord = namedtuple("ProcessRecord", [
+    "pid",
+    "name",
+    "create_time",
+    "cpu_time",
+    "memory_raw",
+    "status",
+    "ppid",
+    # Cumulative I/O counters, 0 unless "io" was asked for
+    "read_bytes",
+    "write_bytes",
+    "syscalls",
+], defaults=(0, 0, 0))
+
+# Single-letter states from /proc/<pid>/stat, named like psutil's STATUS_*
+PROC_STATUSES = {
+    "R": "running",
+    "S": "sleeping",
+    "D": "disk-sleep",
+    "T": "stopped",
+    "t": "tracing-stop",
+    "Z": "zombie",
+    "X": "dead",
+    "x": "dead",
+    "K": "wake-kill",
+    "W": "waking",
+    "I": "idle",
+    "P": "parked",
+}
+
+
+class ProcfsCollector:
+    """
+    Linux collector that parses /proc/<pid>/stat and statm directly into
+    reusable buffers, reading only the files the requested fields need.
+    """
+
+    def __init__(self, procfs="/proc"):
+        self.procfs = procfs
+        self.boot_time = self.read_boot_time()
+        self._buffer = bytearray(4096)
+        self._usernames = {}
+
+    def read_boot_time(self):
+        try:
+            with open(os.path.join(self.procfs, "stat"), "rb") as f:
+                for line in f:
+                    if line.startswith(b"btime"):
+                        return float(line.split()[1])
+        except OSError:
+            pass
+        return psutil.boot_time()
+
+    def pids(self):
+        return [int(name) for name in os.listdir(self.procfs) if name.isdigit()]
+
+    def read_file(self, path):
+        """Read a small file into the shared buffer and return its length"""
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.readv(fd, [self._buffer])
+        finally:
+            os.close(fd)
+
+    def collect(self, fields=DEFAULT_FIELDS):
+        """Return pid -> ProcessRecord for every live process"""
+        read_memory = "memory" in fields
+        read_io = "io" in fields
+        buffer = self._buffer
+        procfs = self.procfs
+        boot_time = self.boot_time
+        records = {}
+
+        for pid in self.pids():
+            base = f"{procfs}/{pid}/"
+            try:
+                size = self.read_file(base + "stat")
+                # The command name may contain spaces and parentheses
+                start = buffer.find(b"(", 0, size)
+                end = buffer.rfind(b")", 0, size)
+                name = buffer[start + 1:end].decode("utf-8", "replace")
+                # Fields after the name start at field 3 (state)
+                stat = buffer[end + 2:size].split()
+                status = PROC_STATUSES.get(chr(stat[0][0]), "?")
+                ppid = int(stat[1])
+                cpu_time = (int(stat[11]) + int(stat[12])) / CLOCK_TICKS
+                create_time = int(stat[19]) / CLOCK_TICKS + boot_time
+
+                memory_raw = 0
+                if read_memory:
+                    size = self.read_file(base + "statm")
+                    memory_raw = int(buffer[:size].split(None, 2)[1]) * PAGE_SIZE
+            except (OSError, IndexError, ValueError):
+                # Process exited between listdir and read, or a kernel thread
+                # with unreadable fields
+                continue
+
+            io = self.read_io(base + "io") if read_io else (0, 0, 0)
+            records[pid] = ProcessRecord(pid, name, create_time, cpu_time, memory_raw, status, ppid, *io)
+        return records
+
+    def read_io(self, path):
+        """Return (read bytes, write bytes, syscalls) from /proc/<pid>/io"""
+        # Only readable for our own processes unless running as root; the
+        # process still gets listed, with zero I/O
+        try:
+            size = self.read_file(path)
+            # "rchar: N wchar: N syscr: N syscw: N read_bytes: N write_bytes: N ..."
+            values = self._buffer[:size].split()
+            return int(values[9]), int(values[11]), int(values[5]) + int(values[7])
+        except (OSError, IndexError, ValueError):
+            return 0, 0, 0
+
+    def read_name(self, pid, name):
+        """Return the full name for names truncated to 15 chars by the kernel"""
+        if len(name) < 15:
+            return name
+        cmdline = self.read_cmdline(pid)
+        if cmdline:
+            exe_name = os.path.basename(cmdline.split(" ", 1)[0])
+            if exe_name.startswith(name):
+                return exe_name
+        return name
+
+    def read_cmdline(self, pid):
+        try:
+            with open(f"{self.procfs}/{pid}/cmdline", "rb") as f:
+                data = f.read()
+        except OSError:
+            return ""
+        return data.rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", "replace")
+
+    def read_username(self, pid):
+        try:
+            uid = os.stat(f"{self.procfs}/{pid}").st_uid
+        except OSError:
+            return ""
+        username = self._usernames.get(uid)
+        if username is None:
+            try:
+                username = pwd.getpwuid(uid).pw_name
+            except (KeyError, AttributeError):
+                username = str(uid)
+            self._usernames[uid] = username
+        return username
+
+    def read_exe(self, pid):
+        try:
+            return os.readlink(f"{self.procfs}/{pid}/exe")
+        except OSError:
+            return ""
+
+
+class PsutilCollector:
+    """
+    Portable collector built on persistent psutil.Process handles. Used on
+    platforms without procfs.
+    """
+
+    def __init__(self):
+        self._handles = {}
+
+    def collect(self, fields=DEFAULT_FIELDS):
+        """Return pid -> ProcessRecord for every live process"""
+        read_memory = "memory" in fields
+        read_io = "io" in fields
+        records = {}
+        handles = {}
+
+        for pid in psutil.pids():
+            handle = self._handles.get(pid)
+            try:
+                # A cached handle whose PID was reused reports a stale
+                # create time; replace it so the reuse becomes visible
+                if handle is None or not handle.is_running():
+                    handle = psutil.Process(pid)
+                with handle.oneshot():
+                    create_time = handle.create_time()
+                    try:
+                        name = handle.name()
+                    except psutil.AccessDenied:
+                        name = ""
+                    try:
+                        times = handle.cpu_times()
+                        cpu_time = times.user + times.system
+                    except psutil.AccessDenied:
+                        cpu_time = 0.0
+                    memory_raw = 0
+                    if read_memory:
+                        try:
+                            memory_raw = handle.memory_info().rss
+                        except psutil.AccessDenied:
+                            pass
+                    try:
+                        status = handle.status()
+                    except psutil.AccessDenied:
+                        status = "?"
+                    ppid = handle.ppid()
+                    io = (0, 0, 0)
+                    if read_io and hasattr(handle, "io_counters"):
+                        try:
+                            counters = handle.io_counters()
+                            io = (counters.read_bytes, counters.write_bytes,
+                                  counters.read_count + counters.write_count)
+                        except psutil.AccessDenied:
+                            pass
+            except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                continue
+
+            handles[pid] = handle
+            records[pid] = ProcessRecord(pid, name, create_time, cpu_time, memory_raw, status, ppid, *io)
+
+        self._handles = handles
+        return records
+
+    def read_name(self, pid, name):
+        return name
+
+    def read_exe(self, pid):
+        return self.read_handle(pid, "exe", "")
+
+    def read_cmdline(self, pid):
+        return " ".join(self.read_handle(pid, "cmdline", []))
+
+    def read_username(self, pid):
+        return self.read_handle(pid, "username", "")
+
+    def read_handle(self, pid, attr, default):
+        handle = self._handles.get(pid)
+        try:
+            return getattr(handle, attr)() if handle else default
+        except (psutil.Error, OSError):
+            return default
+
+
+def create_collector(backend="auto"):
+    """Return a process collector for "procfs", "psutil" or "auto" """
+    if backend == "procfs" or (backend == "auto" and HAS_PROCFS):
+        return ProcfsCollector()
+    return PsutilCollector()
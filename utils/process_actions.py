@@ -0,0 +1,199 @@
+# utils/process_actions.py
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+from utils.proc_reader import CLOCK_TICKS
+
+# Outcome of one action on one process
+ActionResult = namedtuple("ActionResult", ["pid", "name", "ok", "message"])
+
+# Action name -> label shown in the Processes tab
+ACTIONS = {
+    "terminate": "End",
+    "kill": "Kill",
+    "suspend": "Suspend",
+    "resume": "Resume",
+    "renice": "Set priority",
+    "ionice": "Set I/O priority",
+    "affinity": "Set CPU affinity",
+}
+
+IONICE_CLASSES = {
+    "realtime": getattr(psutil, "IOPRIO_CLASS_RT", None),
+    "best-effort": getattr(psutil, "IOPRIO_CLASS_BE", None),
+    "idle": getattr(psutil, "IOPRIO_CLASS_IDLE", None),
+}
+
+
+def parse_cpu_list(text):
+    """'0-3,6' -> [0, 1, 2, 3, 6]"""
+    cpus = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    if not cpus:
+        raise ValueError("no CPUs given")
+    return sorted(cpus)
+
+
+def parse_ionice(text):
+    """'idle', 'best-effort:4' or 'realtime:0' -> (class, level)"""
+    name, _, level = text.strip().lower().partition(":")
+    ioclass = IONICE_CLASSES.get(name)
+    if ioclass is None:
+        raise ValueError(f"I/O class must be one of {', '.join(IONICE_CLASSES)}")
+    if name == "idle":
+        return ioclass, None
+    return ioclass, int(level) if level else 4
+
+
+def parse_value(action, text):
+    """Turn the value typed for an action into what the action takes"""
+    if action == "renice":
+        return int(text)
+    if action == "ionice":
+        return parse_ionice(text)
+    if action == "affinity":
+        return parse_cpu_list(text)
+    return None
+
+
+class ProcessActions:
+    """
+    Apply one action to many processes at once. Targets are (pid,
+    create_time) pairs, checked against the live process so a reused PID
+    is never touched. Per-process calls run on a thread pool; terminate
+    signals everything first, waits for all of it together and kills what
+    is still running after grace seconds.
+    """
+
+    def __init__(self, workers=16, grace=3.0, kill_timeout=2.0):
+        self.workers = workers
+        self.grace = grace
+        self.kill_timeout = kill_timeout
+
+    def run(self, action, targets, value=None):
+        """Apply action to targets; return [ActionResult], one per target"""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = {}
+            # (psutil.Process, name) of every target still running
+            entries = []
+            resolve = lambda target: self._resolve(target, action)
+            for target, outcome in zip(targets, pool.map(resolve, targets)):
+                if isinstance(outcome, ActionResult):
+                    results[target[0]] = outcome
+                else:
+                    entries.append(outcome)
+
+            if action in ("terminate", "kill"):
+                results.update(self._end(pool, entries, action))
+            else:
+                apply = lambda entry: self._apply(entry[0], entry[1], action, value)
+                for result in pool.map(apply, entries):
+                    results[result.pid] = result
+        return [results[pid] for pid, create_time in targets]
+
+    def _resolve(self, target, action):
+        """Return (psutil.Process, name) for target, or an ActionResult if there is none"""
+        pid, create_time = target
+        # A process that is gone already is what ending it asks for
+        ended = action in ("terminate", "kill")
+        if pid == os.getpid():
+            return ActionResult(pid, "", False, "is the task manager itself")
+        try:
+            handle = psutil.Process(pid)
+            if abs(handle.create_time() - create_time) > 1.0 / CLOCK_TICKS:
+                return ActionResult(pid, "", ended, "already exited")
+        except psutil.NoSuchProcess:
+            return ActionResult(pid, "", ended, "already exited")
+        except psutil.AccessDenied:
+            return ActionResult(pid, "", False, "access denied")
+        # The name only labels the result; the action may still be allowed
+        try:
+            name = handle.name()
+        except psutil.AccessDenied:
+            name = ""
+        except psutil.NoSuchProcess:
+            return ActionResult(pid, "", ended, "already exited")
+        return handle, name
+
+    def _apply(self, handle, name, action, value):
+        pid = handle.pid
+        try:
+            if action == "suspend":
+                handle.suspend()
+                return ActionResult(pid, name, True, "suspended")
+            if action == "resume":
+                handle.resume()
+                return ActionResult(pid, name, True, "resumed")
+            if action == "renice":
+                handle.nice(value)
+                return ActionResult(pid, name, True, f"priority {value}")
+            if action == "ionice":
+                if not hasattr(handle, "ionice"):
+                    return ActionResult(pid, name, False, "not supported on this platform")
+                ioclass, level = value
+                handle.ionice(ioclass, level)
+                return ActionResult(pid, name, True, "I/O priority set")
+            if action == "affinity":
+                if not hasattr(handle, "cpu_affinity"):
+                    return ActionResult(pid, name, False, "not supported on this platform")
+                handle.cpu_affinity(value)
+                return ActionResult(pid, name, True, f"CPUs {value}")
+            return ActionResult(pid, name, False, f"unknown action {action}")
+        except psutil.NoSuchProcess:
+            return ActionResult(pid, name, False, "already exited")
+        except psutil.AccessDenied:
+            return ActionResult(pid, name, False, "access denied")
+        except (OSError, ValueError) as e:
+            return ActionResult(pid, name, False, str(e))
+
+    def _signal(self, pool, handles, names, method):
+        """Call method on every handle; return (signalled handles, failures)"""
+        def send(handle):
+            try:
+                getattr(handle, method)()
+                return None
+            except psutil.NoSuchProcess:
+                return ActionResult(handle.pid, names[handle.pid], True, "already exited")
+            except psutil.AccessDenied:
+                return ActionResult(handle.pid, names[handle.pid], False, "access denied")
+
+        sent = []
+        failures = {}
+        for handle, failure in zip(handles, pool.map(send, handles)):
+            if failure is None:
+                sent.append(handle)
+            else:
+                failures[handle.pid] = failure
+        return sent, failures
+
+    def _end(self, pool, entries, action):
+        # One wait over all processes, so a pool of workers takes one grace
+        # period in total rather than one each
+        results = {}
+        names = {handle.pid: name for handle, name in entries}
+        handles = [handle for handle, name in entries]
+        if action == "terminate":
+            sent, failures = self._signal(pool, handles, names, "terminate")
+            results.update(failures)
+            gone, alive = psutil.wait_procs(sent, timeout=self.grace)
+            for handle in gone:
+                results[handle.pid] = ActionResult(handle.pid, names[handle.pid], True, "terminated")
+            handles = alive
+
+        sent, failures = self._signal(pool, handles, names, "kill")
+        results.update(failures)
+        gone, alive = psutil.wait_procs(sent, timeout=self.kill_timeout)
+        message = "killed" if action == "kill" else f"killed after {self.grace:g} s"
+        for handle in gone:
+            results[handle.pid] = ActionResult(handle.pid, names[handle.pid], True, message)
+        for handle in alive:
+            results[handle.pid] = ActionResult(handle.pid, names[handle.pid], False,
+                                               "still running after SIGKILL")
+        return results
@@ -0,0 +1,287 @@
+# utils/process_columns.py
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+# Statuses stored as one-byte codes; anything unknown is code 0
+STATUS_NAMES = ("?", "running", "sleeping", "disk-sleep", "stopped", "tracing-stop", "zombie",
+                "dead", "wake-kill", "waking", "idle", "parked", "locked", "waiting", "suspended")
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+# Column name and dtype; "name" holds ids into a NameTable
+COLUMNS = (
+    ("pid", np.int32),
+    ("ppid", np.int32),
+    ("cpu", np.float64),
+    ("memory_raw", np.int64),
+    ("status", np.uint8),
+    ("create_time", np.float64),
+    ("name", np.int32),
+    # I/O per second; only ever shown formatted, so single precision will do
+    ("read_rate", np.float32),
+    ("write_rate", np.float32),
+    ("syscall_rate", np.float32),
+)
+
+IO_COLUMNS = ("read_rate", "write_rate", "syscall_rate")
+
+# One decoded row, built only for rows that are displayed
+ProcessRow = namedtuple("ProcessRow", ["pid", "ppid", "name", "cpu", "memory_raw", "status",
+                                       "create_time", "read_rate", "write_rate", "syscall_rate"])
+
+# Sort columns offered by the Processes tab, as keys of one process row.
+# Ties are broken by ascending PID in both directions, which is what the
+# stable sort over process_iter's PID-ordered output used to produce.
+# ProcessColumns.order sorts whole snapshots the same way; these keys
+# order the few rows FleetTop merges across hosts.
+SORT_FIELDS = {
+    "cpu": lambda p: p.cpu,
+    "memory": lambda p: p.memory_raw,
+    "name": lambda p: p.name.lower(),
+    "pid": lambda p: p.pid,
+    "read_rate": lambda p: p.read_rate,
+    "write_rate": lambda p: p.write_rate,
+    "syscall_rate": lambda p: p.syscall_rate,
+}
+
+
+class NameTable:
+    """
+    Process names interned to small integer ids. A table is shared by all
+    snapshots of a source (and by all hosts of a fleet), so each distinct
+    name is stored once.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self._lock = threading.Lock()
+        self._ranks = None
+
+    def intern(self, name):
+        name_id = self.ids.get(name)
+        if name_id is None:
+            with self._lock:
+                name_id = self.ids.get(name)
+                if name_id is None:
+                    name_id = self.ids[name] = len(self.names)
+                    self.names.append(name)
+        return name_id
+
+    def ranks(self):
+        """Case-insensitive sort rank of every id, for ordering by name"""
+        ranks = self._ranks
+        if ranks is None or len(ranks) != len(self.names):
+            names = self.names[:]
+            lowered = np.array([name.lower() for name in names], dtype=object)
+            # Names equal but for case share a rank
+            ranks = np.unique(lowered, return_inverse=True)[1] if names else np.zeros(0, np.int64)
+            self._ranks = ranks
+        return ranks
+
+    def matching(self, predicate):
+        """Ids of the names for which predicate(name) is true"""
+        return np.array([name_id for name_id, name in enumerate(self.names[:]) if predicate(name)],
+                        dtype=np.int32)
+
+
+class ProcessColumns:
+    """
+    Read-only columnar process snapshot: one typed array per field, row i
+    describing one process. Sorting and filtering work on whole arrays;
+    rows are decoded (and formatted) only when they are shown.
+    """
+
+    def __init__(self, names, pid, ppid, cpu, memory_raw, status, create_time, name,
+                 read_rate, write_rate, syscall_rate):
+        self.names = names
+        self.pid = pid
+        self.ppid = ppid
+        self.cpu = cpu
+        self.memory_raw = memory_raw
+        self.status = status
+        self.create_time = create_time
+        self.name = name
+        self.read_rate = read_rate
+        self.write_rate = write_rate
+        self.syscall_rate = syscall_rate
+
+    @classmethod
+    def from_processes(cls, processes, names=None):
+        """Build columns from a pid -> ProcessInfo mapping"""
+        table = ColumnTable(names, capacity=max(len(processes), 1))
+        table.update(list(processes.values()))
+        return table.snapshot()
+
+    def __len__(self):
+        return len(self.pid)
+
+    @property
+    def nbytes(self):
+        # I/O columns that were not collected are a view of a single zero
+        return sum(array.nbytes if array.strides[0] else array.itemsize
+                   for array in (getattr(self, name) for name, dtype in COLUMNS))
+
+    def row(self, index):
+        return ProcessRow(
+            pid=int(self.pid[index]),
+            ppid=int(self.ppid[index]),
+            name=self.names.names[self.name[index]],
+            cpu=float(self.cpu[index]),
+            memory_raw=int(self.memory_raw[index]),
+            status=STATUS_NAMES[self.status[index]],
+            create_time=float(self.create_time[index]),
+            read_rate=float(self.read_rate[index]),
+            write_rate=float(self.write_rate[index]),
+            syscall_rate=float(self.syscall_rate[index]),
+        )
+
+    def rows_for_pids(self, pids):
+        """Row indices of the given PIDs, in row order"""
+        wanted = np.fromiter(pids, dtype=np.int32, count=len(pids))
+        return np.flatnonzero(np.isin(self.pid, wanted))
+
+    def rows_for_names(self, predicate):
+        """Row indices whose name satisfies predicate, tested once per distinct name"""
+        return np.flatnonzero(np.isin(self.name, self.names.matching(predicate)))
+
+    def sort_key(self, sort_by):
+        if sort_by == "name":
+            return self.names.ranks()[self.name]
+        if sort_by == "memory":
+            return self.memory_raw
+        return getattr(self, sort_by)
+
+    def order(self, sort_by="cpu", reverse=True, limit=None, rows=None):
+        """
+        Row indices in display order, at most limit of them. Ties are
+        broken by ascending PID, as with SORT_FIELDS.
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        key = self.sort_key(sort_by)[rows]
+        if reverse:
+            key = -key.astype(np.float64) if key.dtype.kind == "f" else -key.astype(np.int64)
+        pids = self.pid[rows]
+        if limit is not None and limit < len(rows):
+            if limit <= 0:
+                return rows[:0]
+            # Keep everything up to the limit-th key, ties included, then
+            # sort only that
+            kth = np.partition(key, limit - 1)[limit - 1]
+            keep = key <= kth
+            rows, key, pids = rows[keep], key[keep], pids[keep]
+        return rows[np.lexsort((pids, key))[:limit]]
+
+    def top(self, sort_by="cpu", reverse=True, limit=None, rows=None):
+        """Decoded rows in display order"""
+        return [self.row(index) for index in self.order(sort_by, reverse, limit, rows)]
+
+
+class ColumnTable:
+    """
+    Process columns kept up to date row by row, one slot per live PID.
+    snapshot() returns a compact ProcessColumns copy of the live rows.
+    I/O columns are only written and copied while some process has a
+    non-zero rate; otherwise they stay all zero.
+    """
+
+    def __init__(self, names=None, capacity=1024):
+        self.names = names or NameTable()
+        self._slots = {}
+        self._free = []
+        self._size = 0
+        self._arrays = {name: np.zeros(capacity, dtype) for name, dtype in COLUMNS}
+        self._live = np.zeros(capacity, dtype=bool)
+        self._io = False
+        self._zeros = np.zeros(0, np.float32)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def clear(self):
+        self._slots = {}
+        self._free = []
+        self._size = 0
+        self._live[:] = False
+        self._clear_io()
+
+    def _clear_io(self):
+        for name in IO_COLUMNS:
+            self._arrays[name][:] = 0
+        self._io = False
+
+    def _allocate(self):
+        if self._free:
+            return self._free.pop()
+        if self._size == len(self._live):
+            capacity = len(self._live) * 2
+            for name, array in self._arrays.items():
+                grown = np.zeros(capacity, array.dtype)
+                grown[:len(array)] = array
+                self._arrays[name] = grown
+            live = np.zeros(capacity, dtype=bool)
+            live[:len(self._live)] = self._live
+            self._live = live
+        slot = self._size
+        self._size += 1
+        return slot
+
+    def update(self, infos, removed=()):
+        """Write ProcessInfo rows into their PIDs' slots and drop removed PIDs"""
+        slots = self._slots
+        for pid in removed:
+            slot = slots.pop(pid, None)
+            if slot is not None:
+                self._live[slot] = False
+                self._free.append(slot)
+        if not infos:
+            return
+
+        indices = []
+        added = []
+        for info in infos:
+            slot = slots.get(info.pid)
+            if slot is None:
+                slot = slots[info.pid] = self._allocate()
+                added.append(info)
+            indices.append(slot)
+        indices = np.array(indices, dtype=np.intp)
+
+        # One vectorized store per volatile column
+        arrays = self._arrays
+        values = dict(zip(infos[0]._fields, zip(*infos)))
+        arrays["ppid"][indices] = values["ppid"]
+        arrays["cpu"][indices] = values["cpu"]
+        arrays["memory_raw"][indices] = values["memory_raw"]
+        arrays["status"][indices] = [STATUS_CODES.get(status, 0) for status in values["status"]]
+        if self._io or any(any(values[name]) for name in IO_COLUMNS):
+            self._io = True
+            for name in IO_COLUMNS:
+                arrays[name][indices] = values[name]
+
+        # Static columns are written once per process, when its slot is taken
+        if added:
+            new = indices if len(added) == len(infos) else \
+                np.array([slots[info.pid] for info in added], dtype=np.intp)
+            intern = self.names.intern
+            arrays["pid"][new] = [info.pid for info in added]
+            arrays["create_time"][new] = [info.create_time for info in added]
+            arrays["name"][new] = [intern(info.name) for info in added]
+            self._live[new] = True
+
+    def snapshot(self):
+        live = np.flatnonzero(self._live[:self._size])
+        columns = {name: array[live] for name, array in self._arrays.items()
+                   if name not in IO_COLUMNS}
+        if self._io:
+            columns.update((name, self._arrays[name][live]) for name in IO_COLUMNS)
+            if not any(columns[name].any() for name in IO_COLUMNS):
+                # I/O collection was turned off and every rate is back to zero
+                self._clear_io()
+        if not self._io:
+            # One read-only view serves all three, kept while the count holds
+            if len(self._zeros) != len(live):
+                self._zeros = np.broadcast_to(np.float32(0), len(live))
+            columns.update(dict.fromkeys(IO_COLUMNS, self._zeros))
+        return ProcessColumns(self.names, **columns)
@@ -0,0 +1,174 @@
+# utils/process_details.py
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+from utils.proc_reader import CLOCK_TICKS
+from utils.system_utils import get_size
+
+# One attribute of one process, ready to show: the total number of items
+# and at most `limit` formatted lines
+Detail = namedtuple("Detail", ["name", "count", "lines", "error", "fetched_at"])
+
+
+def format_cmdline(handle):
+    return [" ".join(handle.cmdline())]
+
+
+def format_environ(handle):
+    return [f"{key}={value}" for key, value in sorted(handle.environ().items())]
+
+
+def format_open_files(handle):
+    return [f"{f.fd:>6}  {f.path}" for f in handle.open_files()]
+
+
+def format_connections(handle):
+    def address(addr):
+        return f"{addr.ip}:{addr.port}" if addr else "-"
+    return [f"{c.status:<12} {address(c.laddr):<28} {address(c.raddr)}"
+            for c in handle.net_connections(kind="all")]
+
+
+def format_threads(handle):
+    return [f"{t.id:>8}  user {t.user_time:.2f}s  system {t.system_time:.2f}s" for t in handle.threads()]
+
+
+def format_memory_maps(handle):
+    maps = sorted(handle.memory_maps(grouped=True), key=lambda m: m.rss, reverse=True)
+    return [f"{get_size(m.rss):>10}  {m.path}" for m in maps]
+
+
+def format_memory(handle):
+    info = handle.memory_full_info()
+    return [f"{field:<8} {get_size(getattr(info, field))}" for field in info._fields]
+
+
+# Attribute name -> (label, formatter, seconds a fetched value stays fresh)
+ATTRIBUTES = {
+    "cmdline": ("Command line", format_cmdline, 60.0),
+    "memory": ("Memory (USS/PSS)", format_memory, 5.0),
+    "open_files": ("Open files", format_open_files, 5.0),
+    "connections": ("Connections", format_connections, 5.0),
+    "threads": ("Threads", format_threads, 2.0),
+    "memory_maps": ("Memory maps", format_memory_maps, 10.0),
+    "environ": ("Environment", format_environ, 60.0),
+}
+
+
+class TtlCache:
+    """Values that expire ttl seconds after they were stored"""
+
+    def __init__(self, ttl, maxsize=64):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or time.monotonic() - item[0] > self.ttl:
+                return None
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                now = time.monotonic()
+                self._items = {k: item for k, item in self._items.items() if now - item[0] <= self.ttl}
+                # Still full of fresh entries: drop the oldest
+                while len(self._items) >= self.maxsize:
+                    del self._items[next(iter(self._items))]
+            self._items[key] = (time.monotonic(), value)
+
+
+class ProcessDetails:
+    """
+    Expensive per-process attributes fetched on a worker pool, each with
+    its own TTL cache. A request for another process replaces the current
+    one: its queued fetches are cancelled and the results of running ones
+    are cached but not delivered. Formatting happens on the workers too and
+    keeps at most limit lines, so a process with ten thousand open files
+    hands the UI a short list and a count.
+    """
+
+    def __init__(self, workers=4, limit=500):
+        self.limit = limit
+        self.caches = {name: TtlCache(ttl) for name, (label, formatter, ttl) in ATTRIBUTES.items()}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="details")
+        self._lock = threading.Lock()
+        self._target = None
+        self._futures = {}
+
+    def request(self, target, callback, attributes=None):
+        """
+        Fetch attributes (all by default) of target, a (pid, create_time)
+        pair. callback(target, Detail) is called once per attribute: right
+        away for cached values, from a worker thread for fetched ones.
+        Attributes still being fetched for target are not fetched again.
+        """
+        cached = []
+        with self._lock:
+            if target != self._target:
+                self._cancel()
+                self._target = target
+            for name in attributes or ATTRIBUTES:
+                detail = self.caches[name].get(target)
+                if detail is not None:
+                    cached.append(detail)
+                    continue
+                future = self._futures.get(name)
+                if future is None or future.done():
+                    self._futures[name] = self._pool.submit(self._fetch, target, name, callback)
+        for detail in cached:
+            callback(target, detail)
+
+    def cancel(self):
+        """Drop the current request, e.g. when nothing is selected"""
+        with self._lock:
+            self._cancel()
+
+    def _cancel(self):
+        self._target = None
+        for future in self._futures.values():
+            future.cancel()
+        self._futures = {}
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, target, name, callback):
+        if target != self._target:
+            return
+        pid, create_time = target
+        label, formatter, ttl = ATTRIBUTES[name]
+        lines = []
+        count = 0
+        error = None
+        try:
+            handle = psutil.Process(pid)
+            if abs(handle.create_time() - create_time) > 1.0 / CLOCK_TICKS:
+                raise psutil.NoSuchProcess(pid)
+            lines = formatter(handle)
+            count = len(lines)
+            lines = lines[:self.limit]
+        except psutil.NoSuchProcess:
+            error = "process has exited"
+        except psutil.AccessDenied:
+            error = "access denied"
+        except psutil.Error as e:
+            error = str(e) or type(e).__name__
+        except OSError as e:
+            error = str(e)
+        except Exception as e:
+            # A formatter failing must still answer, or the tab waits forever
+            error = f"{type(e).__name__}: {e}"
+        detail = Detail(name, count, lines, error, time.time())
+        self.caches[name].put(target, detail)
+        if target == self._target:
+            callback(target, detail)
@@ -0,0 +1,87 @@
+# utils/process_search.py
+import re
+
+
+def parse_query(text):
+    """
+    Turn a search string into a list of (kind, value) terms that must all
+    match. Supported forms:
+
+        chrome          substring of name or command line
+        ^chr            prefix of the name
+        pid:1234        exact PID
+        user:root       prefix of the user name
+        re:py.*3        regular expression over name and command line
+        /py.*3/         same as re:
+    """
+    terms = []
+    for token in text.split():
+        lowered = token.lower()
+        if lowered.startswith("re:") or (len(token) > 2 and token[0] == token[-1] == "/"):
+            # Compiled from the original text: lowercasing would turn \D
+            # into \d and the like
+            pattern = token[3:] if lowered.startswith("re:") else token[1:-1]
+            try:
+                terms.append(("regex", re.compile(pattern, re.IGNORECASE)))
+            except re.error:
+                terms.append(("text", pattern.lower()))
+            continue
+        token = lowered
+        if token.startswith("pid:"):
+            value = token[4:]
+            if value.isdigit():
+                terms.append(("pid", int(value)))
+        elif token.startswith("user:"):
+            if token[5:]:
+                terms.append(("user", token[5:]))
+        elif token.startswith("^") and len(token) > 1:
+            terms.append(("prefix", token[1:]))
+        else:
+            terms.append(("text", token))
+    return terms
+
+
+class ProcessSearchIndex:
+    """
+    Lowercase name, command line and user index over the process table.
+    Entries are built once per (pid, create_time) and matched without
+    touching any widgets.
+    """
+
+    def __init__(self):
+        # pid -> (create_time, name, haystack, username)
+        self._entries = {}
+
+    def update(self, processes):
+        """Index new processes and forget exited ones"""
+        entries = self._entries
+        for pid, info in processes.items():
+            entry = entries.get(pid)
+            if entry is None or entry[0] != info.create_time:
+                name = info.name.lower()
+                entries[pid] = (info.create_time, name,
+                                f"{name}\n{info.cmdline.lower()}", info.username.lower())
+        if len(entries) != len(processes):
+            for pid in [pid for pid in entries if pid not in processes]:
+                del entries[pid]
+
+    def search(self, terms):
+        """Return the set of PIDs matching every term"""
+        items = self._entries.items()
+        matches = None
+        for kind, value in terms:
+            if kind == "pid":
+                found = {value} if value in self._entries else set()
+            elif kind == "text":
+                found = {pid for pid, e in items if value in e[2]}
+            elif kind == "prefix":
+                found = {pid for pid, e in items if e[1].startswith(value)}
+            elif kind == "user":
+                found = {pid for pid, e in items if e[3].startswith(value)}
+            else:
+                search = value.search
+                found = {pid for pid, e in items if search(e[2])}
+            matches = found if matches is None else matches & found
+            if not matches:
+                break
+        return matches if matches is not None else set(self._entries)
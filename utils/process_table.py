@@ -0,0 +1,128 @@
+# utils/process_table.py
+from collections import namedtuple
+from datetime import datetime
+
+from utils.cpu_accounting import NO_IO, CpuAccountant
+from utils.proc_reader import CLOCK_TICKS, DEFAULT_FIELDS, create_collector
+from utils.process_columns import ColumnTable
+
+# One process as seen in a snapshot. Static fields are read once per process
+# lifetime; volatile fields are refreshed on every tick. Unchanged processes
+# keep the same ProcessInfo object between ticks.
+ProcessInfo = namedtuple("ProcessInfo", [
+    # static
+    "pid",
+    "name",
+    "exe",
+    "cmdline",
+    "username",
+    "create_time",
+    "created",
+    # volatile
+    "cpu",
+    "memory_raw",
+    "status",
+    "ppid",
+    # per second, 0.0 while I/O is not collected
+    "read_rate",
+    "write_rate",
+    "syscall_rate",
+])
+
+# PID sets describing what happened since the previous update
+ProcessDelta = namedtuple("ProcessDelta", ["added", "removed", "changed"])
+
+
+class ProcessTable:
+    """
+    Process list keyed by (pid, create_time) that caches static attributes
+    and refreshes only volatile ones on each update. The same rows are kept
+    in columns, updated only where something changed.
+    """
+
+    def __init__(self, collector=None, fields=DEFAULT_FIELDS, names=None):
+        self.collector = collector or create_collector()
+        self.fields = fields
+        self.processes = {}
+        self.columns = ColumnTable(names)
+        self.cpu = CpuAccountant()
+
+    def key(self, pid):
+        """Return the (pid, create_time) identity of a known process"""
+        info = self.processes.get(pid)
+        return (pid, info.create_time) if info else None
+
+    def update(self, elapsed=None):
+        """
+        Refresh the table and return a ProcessDelta. elapsed is the wall-clock
+        time since the previous update, used as the CPU% window.
+        """
+        records = self.collector.collect(self.fields)
+
+        # CPU% comes from cpu time deltas kept across ticks, not from fresh
+        # Process objects which always report 0.0 on their first call. I/O
+        # rates come from the same per-process state.
+        percents, rates = self.cpu.update(records, elapsed, io="io" in self.fields)
+
+        processes = self.processes
+        added = set()
+        removed = set()
+        changed = set()
+        tolerance = 1.0 / CLOCK_TICKS
+
+        for pid, record in records.items():
+            old = processes.get(pid)
+            if old is not None and abs(old.create_time - record.create_time) > tolerance:
+                # Same PID, different process
+                removed.add(pid)
+                old = None
+            if old is None:
+                old = self.new_info(record)
+                added.add(pid)
+
+            info = self.refresh(old, record, percents[pid], rates.get(pid, NO_IO))
+            if info is not old and pid not in added:
+                changed.add(pid)
+            processes[pid] = info
+
+        gone = [pid for pid in processes if pid not in records]
+        for pid in gone:
+            del processes[pid]
+        removed.update(gone)
+
+        self.columns.update([processes[pid] for pid in added | changed], removed)
+        return ProcessDelta(added=frozenset(added), removed=frozenset(removed),
+                            changed=frozenset(changed))
+
+    def new_info(self, record):
+        """Build the static part of a ProcessInfo once per process lifetime"""
+        pid = record.pid
+        collector = self.collector
+        fields = self.fields
+        return ProcessInfo(
+            pid=pid,
+            name=collector.read_name(pid, record.name),
+            exe=collector.read_exe(pid) if "exe" in fields else "",
+            cmdline=collector.read_cmdline(pid) if "cmdline" in fields else "",
+            username=collector.read_username(pid) if "username" in fields else "",
+            create_time=record.create_time,
+            created=datetime.fromtimestamp(record.create_time).strftime('%Y-%m-%d %H:%M:%S'),
+            cpu=0.0,
+            memory_raw=0,
+            status="",
+            ppid=0,
+            read_rate=0.0,
+            write_rate=0.0,
+            syscall_rate=0.0,
+        )
+
+    def refresh(self, info, record, cpu, io=NO_IO):
+        """Return info with fresh volatile fields, or info itself if unchanged"""
+        # The parent changes when a process is re-parented after its parent exits
+        if (cpu, record.memory_raw, record.status, record.ppid) == \
+                (info.cpu, info.memory_raw, info.status, info.ppid) and io == info[-3:]:
+            return info
+        read_rate, write_rate, syscall_rate = io
+        return info._replace(cpu=cpu, memory_raw=record.memory_raw, status=record.status,
+                             ppid=record.ppid, read_rate=read_rate, write_rate=write_rate,
+                             syscall_rate=syscall_rate)
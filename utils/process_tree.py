@@ -0,0 +1,290 @@
+# utils/process_tree.py
+
+# CPU totals are kept in hundredths of a percent so that adding and
+# subtracting deltas tick after tick never drifts
+CPU_SCALE = 100
+
+# A rollup packs CPU, memory and process count into one int, so pushing a
+# delta up the tree is a single addition. Packing is linear, so packed
+# deltas add up to the packed totals exactly, and every total is
+# non-negative and fits its field.
+MEMORY_SHIFT = 32
+COUNT_SHIFT = 96
+CPU_MASK = (1 << MEMORY_SHIFT) - 1
+MEMORY_MASK = (1 << (COUNT_SHIFT - MEMORY_SHIFT)) - 1
+
+
+def pack(cpu, memory, count):
+    return cpu + (memory << MEMORY_SHIFT) + (count << COUNT_SHIFT)
+
+
+def unpack(value):
+    """(CPU %, memory bytes, process count) of a packed rollup"""
+    return ((value & CPU_MASK) / CPU_SCALE, (value >> MEMORY_SHIFT) & MEMORY_MASK,
+            value >> COUNT_SHIFT)
+
+
+class ProcessTree:
+    """
+    Parent/child links built from ppid, with CPU, memory and process count
+    rolled up per subtree. update() diffs the process table by object
+    identity, so only processes that started, exited or changed touch the
+    tree, and each affected ancestor is updated once per call however many
+    of its descendants changed.
+    """
+
+    def __init__(self):
+        self.infos = {}      # pid -> ProcessInfo last applied
+        self.parent = {}     # pid -> parent pid, None for roots
+        self.children = {}   # pid -> set of child pids
+        self.roots = set()
+        self.own = {}        # pid -> packed rollup of the process alone
+        self.totals = {}     # pid -> packed rollup of its whole subtree
+        # Parent pids -> pids naming them that are roots for now: the parent
+        # is not (or no longer) in the table, or linking would make a cycle
+        self._waiting = {}
+        # Parent pids in the table with children waiting on a cycle
+        self._cycles = set()
+
+    def __len__(self):
+        return len(self.infos)
+
+    def update(self, processes):
+        """Apply a pid -> ProcessInfo mapping; return True if anything changed"""
+        infos = self.infos
+        added = []
+        changed = []
+        removed = []
+        for pid, info in processes.items():
+            old = infos.get(pid)
+            if old is info:
+                continue
+            if old is None:
+                added.append(info)
+            elif old.create_time != info.create_time:
+                # Same PID, different process
+                removed.append(pid)
+                added.append(info)
+            else:
+                changed.append(info)
+        if len(infos) + len(added) - len(removed) != len(processes):
+            removed.extend(pid for pid in infos if pid not in processes)
+        if not (added or changed or removed):
+            return False
+
+        moved = [info for info in changed if info.ppid != infos[info.pid].ppid]
+
+        # Take exited and re-parented subtrees out of their old ancestors
+        detached = set(removed)
+        detached.update(info.pid for info in moved)
+        if detached:
+            self._propagate(dict.fromkeys(detached, 0), detached, detach=True)
+
+        # Relink, then add the new subtrees and value changes to their new
+        # ancestors
+        attached = set()
+        for pid in removed:
+            self._remove(pid)
+        for info in moved:
+            self._unlink(info.pid)
+        for info in added:
+            attached.update(self._insert(info.pid))
+        for info in added + moved:
+            if self._link(info.pid, info.ppid):
+                attached.add(info.pid)
+        # Only a move or an exit can break a cycle
+        if self._cycles and (moved or removed):
+            attached.update(self._relink_cycles())
+
+        pending = dict.fromkeys(attached, 0)
+        own = self.own
+        for info in added + changed:
+            pid = info.pid
+            infos[pid] = info
+            value = pack(round(info.cpu * CPU_SCALE), info.memory_raw, 1)
+            delta = value - own[pid]
+            own[pid] = value
+            if delta:
+                pending[pid] = pending.get(pid, 0) + delta
+        self._propagate(pending, attached, detach=False)
+        return True
+
+    def _propagate(self, pending, moving, detach):
+        """
+        Add pending deltas to their nodes and all ancestors, visiting each
+        ancestor once, deepest first. A moving node hands its whole total
+        to its parent instead: negated when detaching, as is when attaching.
+        """
+        parent = self.parent
+        totals = self.totals
+        depth = {}
+        for pid in list(pending):
+            path = []
+            node = pid
+            while node is not None and node not in depth:
+                path.append(node)
+                node = parent[node]
+            level = depth[node] if node is not None else -1
+            for node in reversed(path):
+                level += 1
+                depth[node] = level
+
+        for node in sorted(depth, key=depth.__getitem__, reverse=True):
+            delta = pending.get(node, 0)
+            if node in moving:
+                up = -totals[node] if detach else totals[node] + delta
+            else:
+                up = delta
+            if delta:
+                totals[node] += delta
+            above = parent[node]
+            if up and above is not None:
+                pending[above] = pending.get(above, 0) + up
+
+    def _insert(self, pid):
+        """Add an empty node; return the waiting children it adopted"""
+        self.own[pid] = 0
+        self.totals[pid] = 0
+        self.parent[pid] = None
+        self.roots.add(pid)
+        adopted = self._waiting.pop(pid, set())
+        for child in adopted:
+            self.roots.discard(child)
+            self.parent[child] = pid
+        self.children[pid] = set(adopted)
+        return adopted
+
+    def _link(self, pid, ppid):
+        """Attach pid under ppid if ppid is known; return True if attached"""
+        if ppid == pid:
+            return False
+        if ppid in self.totals:
+            if not self._is_ancestor(pid, ppid):
+                self.roots.discard(pid)
+                self.parent[pid] = ppid
+                self.children[ppid].add(pid)
+                return True
+            # Retried once the cycle is gone
+            self._cycles.add(ppid)
+        # Otherwise adopted when a process with that PID shows up
+        self._waiting.setdefault(ppid, set()).add(pid)
+        return False
+
+    def _relink_cycles(self):
+        """Link roots held back by a cycle that no longer exists; return them"""
+        attached = []
+        for ppid in list(self._cycles):
+            waiting = self._waiting.get(ppid)
+            if not waiting or ppid not in self.totals:
+                # Gone, or left to _insert when the PID shows up again
+                self._cycles.discard(ppid)
+                continue
+            for pid in list(waiting):
+                if not self._is_ancestor(pid, ppid):
+                    waiting.discard(pid)
+                    self.roots.discard(pid)
+                    self.parent[pid] = ppid
+                    self.children[ppid].add(pid)
+                    attached.append(pid)
+            if not waiting:
+                del self._waiting[ppid]
+                self._cycles.discard(ppid)
+        return attached
+
+    def _is_ancestor(self, pid, node):
+        # Only a process with children can be anyone's ancestor
+        if not self.children[pid]:
+            return False
+        parent = self.parent
+        while node is not None:
+            if node == pid:
+                return True
+            node = parent[node]
+        return False
+
+    def _unlink(self, pid):
+        """Detach pid from its parent or from the roots, keeping its children"""
+        above = self.parent[pid]
+        if above is None:
+            self.roots.discard(pid)
+            ppid = self.infos[pid].ppid
+            waiting = self._waiting.get(ppid)
+            if waiting is not None:
+                waiting.discard(pid)
+                if not waiting:
+                    del self._waiting[ppid]
+        else:
+            self.children[above].discard(pid)
+        self.parent[pid] = None
+        self.roots.add(pid)
+
+    def _remove(self, pid):
+        self._unlink(pid)
+        self.roots.discard(pid)
+        # Orphans stay roots until they show up with their new parent
+        children = self.children.pop(pid)
+        for child in children:
+            self.parent[child] = None
+            self.roots.add(child)
+        if children:
+            self._waiting.setdefault(pid, set()).update(children)
+        del self.parent[pid]
+        del self.own[pid]
+        del self.totals[pid]
+        del self.infos[pid]
+
+    def rollup(self, pid):
+        """(CPU %, memory bytes, process count) of pid's subtree"""
+        return unpack(self.totals[pid])
+
+    def with_ancestors(self, pids):
+        """pids plus every ancestor of them"""
+        parent = self.parent
+        result = set()
+        for pid in pids:
+            while pid is not None and pid not in result and pid in parent:
+                result.add(pid)
+                pid = parent[pid]
+        return result
+
+    def sort_key(self, sort_by):
+        """Sibling order: CPU and memory sort by subtree totals, I/O rates by the process's own"""
+        totals = self.totals
+        if sort_by == "cpu":
+            return lambda pid: totals[pid] & CPU_MASK
+        if sort_by == "memory":
+            return lambda pid: totals[pid] >> MEMORY_SHIFT & MEMORY_MASK
+        if sort_by == "name":
+            return lambda pid: self.infos[pid].name.lower()
+        if sort_by in ("read_rate", "write_rate", "syscall_rate"):
+            return lambda pid: getattr(self.infos[pid], sort_by)
+        return lambda pid: pid
+
+    def rows(self, sort_by="cpu", reverse=True, collapsed=(), include=None, limit=None):
+        """
+        Return [(pid, depth, child count)] in depth-first display order.
+        Siblings are sorted by sort_key(sort_by), ties by ascending PID;
+        children of collapsed pids are skipped, and with include only
+        those pids are shown. Stops after limit rows, so a short list
+        only sorts the siblings it actually visits.
+        """
+        key = self.sort_key(sort_by)
+
+        def ordered(pids):
+            if include is not None:
+                pids = [pid for pid in pids if pid in include]
+            if reverse:
+                return sorted(pids, key=lambda pid: (key(pid), -pid))
+            return sorted(pids, key=lambda pid: (key(pid), pid), reverse=True)
+
+        # Sorted so that popping from the end yields display order
+        stack = [(pid, 0) for pid in ordered(self.roots)]
+        children = self.children
+        rows = []
+        while stack and (limit is None or len(rows) < limit):
+            pid, depth = stack.pop()
+            kids = children[pid]
+            rows.append((pid, depth, len(kids)))
+            if kids and pid not in collapsed:
+                stack.extend((child, depth + 1) for child in ordered(kids))
+        return rows
@@ -0,0 +1,264 @@
+# utils/remote_engine.py
+import itertools
+import socket
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from utils.collector_server import PROTOCOL_VERSION
+from utils.instrumentation import Instrumentation
+from utils.metric_analytics import MetricAnalytics
+from utils.metric_history import MetricHistory
+from utils.wire import SnapshotDecoder, available_codecs, encode, read_message
+
+# The few Snapshot fields MetricHistory.record reads, for backfilling
+HistoryRow = namedtuple("HistoryRow", ["timestamp", "cpu_percent", "memory", "temperature",
+                                       "net_sent_speed", "net_recv_speed"])
+MemoryRow = namedtuple("MemoryRow", ["percent"])
+
+
+class RemoteStore:
+    """MetricStore.query() answered by the collector's store"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def query(self, name, start, end, stat="avg", max_points=4000):
+        result = self.engine.call("query", name=name, start=start, end=end,
+                                  stat=stat, max_points=max_points)
+        return np.array(result["times"], dtype=float), np.array(result["values"], dtype=float)
+
+
+class RemoteEngine:
+    """
+    Thin client with the SamplingEngine interface, fed by a collector
+    daemon over its Unix socket. History is backfilled on connect and then
+    kept locally from the received snapshots. The daemon sets the sampling
+    rate for all its viewers.
+    """
+
+    def __init__(self, path, timeout=5.0, reconnect_max=10.0):
+        self.path = path
+        self.timeout = timeout
+        self.reconnect_max = reconnect_max
+        self.interval = 1.0
+        self.latest = None
+        self.history = MetricHistory()
+        self.analytics = MetricAnalytics(self.history)
+        self.instruments = Instrumentation()
+        self.store = None
+        self.collect_process_data = True
+        self.collect_process_io = False
+        # Counted like SamplingEngine's pins; the collector only needs to
+        # know whether there are any
+        self.process_pins = 0
+        self.connected = False
+        # Timestamp of the newest sample in the local history
+        self.last_timestamp = None
+
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._ids = itertools.count(1)
+        self._waiting = {}
+        self._sock = None
+        self._codec = "json"
+        self._decoder = SnapshotDecoder()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """Register a callable that receives every new snapshot"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Remove a previously registered callable"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def start(self):
+        """Connect to the collector and start receiving snapshots"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self.connect()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.disconnect()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def request_sample(self):
+        self.notify("request_sample")
+
+    def set_interval(self, interval):
+        # Other viewers share the collector, so its rate is not ours to change
+        self.interval = interval
+
+    def set_collect_processes(self, enabled):
+        if enabled != self.collect_process_data:
+            self.collect_process_data = enabled
+            self.notify("processes", enabled=enabled)
+
+    def pin_processes(self, pinned):
+        """Ask the collector to keep collecting processes, for exporters"""
+        was_pinned = self.process_pins > 0
+        self.process_pins = max(self.process_pins + (1 if pinned else -1), 0)
+        if (self.process_pins > 0) != was_pinned:
+            self.notify("pin_processes", pinned=not was_pinned)
+
+    def set_process_io(self, enabled):
+        if enabled != self.collect_process_io:
+            self.collect_process_io = enabled
+            self.notify("process_io", enabled=enabled)
+
+    def connect(self):
+        """Open the socket, agree on a codec and backfill history"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self._sock = sock
+        self._codec = "json"
+        self._decoder = SnapshotDecoder()
+
+        hello = self._call_direct("hello", codecs=available_codecs())
+        if hello["version"] != PROTOCOL_VERSION:
+            raise ConnectionError(f"Collector speaks protocol {hello['version']}, "
+                                  f"this viewer {PROTOCOL_VERSION}")
+        self._codec = hello["codec"]
+        self.interval = hello["interval"]
+        self.store = RemoteStore(self) if hello["store"] else None
+        self._backfill(self._call_direct("history", seconds=self.history.capacity))
+        self._call_direct("processes", enabled=self.collect_process_data)
+        self._call_direct("process_io", enabled=self.collect_process_io)
+        self._call_direct("pin_processes", pinned=self.process_pins > 0)
+        self._call_direct("subscribe")
+
+        # Replies now arrive on the reader thread
+        sock.settimeout(None)
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        with self._lock:
+            waiting, self._waiting = self._waiting, {}
+        for entry in waiting.values():
+            entry["error"] = "Disconnected from collector"
+            entry["event"].set()
+
+    def _send(self, message):
+        sock = self._sock
+        if sock is None:
+            raise ConnectionError("Not connected to collector")
+        data = encode(message, self._codec)
+        with self._send_lock:
+            sock.sendall(data)
+
+    def _call_direct(self, op, **args):
+        # Used during connect, before the reader thread takes over replies
+        request_id = next(self._ids)
+        self._send(dict(args, op=op, id=request_id))
+        reply = read_message(self._sock)
+        if reply.get("error"):
+            raise ConnectionError(reply["error"])
+        return reply["result"]
+
+    def call(self, op, **args):
+        """Send a request and wait for its result"""
+        request_id = next(self._ids)
+        entry = {"event": threading.Event(), "result": None, "error": None}
+        with self._lock:
+            self._waiting[request_id] = entry
+        try:
+            self._send(dict(args, op=op, id=request_id))
+            if not entry["event"].wait(self.timeout):
+                raise TimeoutError(f"Collector did not answer {op!r}")
+        finally:
+            with self._lock:
+                self._waiting.pop(request_id, None)
+        if entry["error"]:
+            raise ConnectionError(entry["error"])
+        return entry["result"]
+
+    def notify(self, op, **args):
+        """Send a request without waiting; a lost connection is retried by the reader"""
+        try:
+            self._send(dict(args, op=op, id=None))
+        except OSError:
+            pass
+
+    def _backfill(self, history):
+        # After a reconnect only the samples missed while away are added
+        for row in zip(history["timestamps"], history["cpu"], history["memory"],
+                       history["temperature"], history["net_sent"], history["net_recv"]):
+            timestamp, cpu, memory, temperature, sent, recv = row
+            if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+                continue
+            self.last_timestamp = timestamp
+            self.history.record(HistoryRow(timestamp, cpu, MemoryRow(memory),
+                                           None if temperature != temperature else temperature,
+                                           sent, recv))
+
+    def _run(self):
+        delay = 0.5
+        while not self._stop_event.is_set():
+            if self._sock is not None:
+                self._receive()
+                delay = 0.5
+            self.disconnect()
+            if self._stop_event.wait(delay):
+                break
+            delay = min(delay * 2, self.reconnect_max)
+            try:
+                self.connect()
+            except OSError as e:
+                print(f"Error reconnecting to collector: {e}")
+                self.disconnect()
+
+    def _receive(self):
+        try:
+            while not self._stop_event.is_set():
+                message = read_message(self._sock)
+                if message.get("event") == "snapshot":
+                    self._apply(message)
+                    continue
+                with self._lock:
+                    entry = self._waiting.get(message.get("id"))
+                if entry is not None:
+                    entry["result"] = message.get("result")
+                    entry["error"] = message.get("error")
+                    entry["event"].set()
+        except (ConnectionError, OSError, ValueError, AttributeError):
+            pass
+
+    def _apply(self, message):
+        instruments = self.instruments
+        instruments.begin_tick()
+        with instruments.measure("receive: decode"):
+            snapshot = self._decoder.decode(message)
+        self.latest = snapshot
+        self.last_timestamp = snapshot.timestamp
+        self.history.record(snapshot)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        with instruments.measure("publish"):
+            for callback in subscribers:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    print(f"Error in snapshot subscriber: {e}")
+        instruments.end_tick()
@@ -0,0 +1,38 @@
+# utils/ring_buffer.py
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-size series backed by a preallocated NumPy array. Every value is
+    written twice, so the latest capacity values are always available as
+    one contiguous view without copying.
+    """
+
+    def __init__(self, capacity, fill=0.0, dtype=np.float64):
+        self.capacity = capacity
+        self._data = np.full(capacity * 2, fill, dtype=dtype)
+        self._start = 0
+
+    def append(self, value):
+        i = self._start
+        self._data[i] = value
+        self._data[i + self.capacity] = value
+        self._start = (i + 1) % self.capacity
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def view(self):
+        """Return the values oldest to newest as a read-only view"""
+        view = self._data[self._start:self._start + self.capacity]
+        view.flags.writeable = False
+        return view
+
+    def last(self):
+        return self._data[self._start + self.capacity - 1]
+
+    def fill(self, value):
+        self._data.fill(value)
+        self._start = 0
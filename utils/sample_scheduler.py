@@ -0,0 +1,126 @@
+# utils/sample_scheduler.py
+import time
+
+MIN_INTERVAL = 0.1
+MAX_INTERVAL = 10.0
+
+
+def clamp_interval(interval):
+    return min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+
+
+class SampleScheduler:
+    """
+    Decide when the sampling engine takes its next sample. Deadlines sit on
+    a grid of the monotonic clock, so the time a sample takes does not push
+    later samples back; a sample that overruns its slot skips the missed
+    slots instead of bursting to catch up.
+
+    With adaptive, the interval shortens while CPU load is high or moving
+    quickly and lengthens while the host is idle, between a tenth and four
+    times the requested interval (within max_interval). Independently, the
+    interval never drops below what keeps sampling's own CPU time under
+    budget, as a fraction of one core.
+    """
+
+    def __init__(self, interval=1.0, adaptive=False, budget=0.02, max_interval=MAX_INTERVAL,
+                 busy_percent=60.0, change_percent=15.0, idle_percent=10.0, idle_ticks=5):
+        self.requested = clamp_interval(interval)
+        self.adaptive = adaptive
+        self.budget = budget
+        self.max_interval = clamp_interval(max_interval)
+        self.busy_percent = busy_percent
+        self.change_percent = change_percent
+        self.idle_percent = idle_percent
+        self.idle_ticks = idle_ticks
+
+        self.interval = self.requested
+        # Smoothed CPU seconds spent per sample, and that as a share of
+        # one core at the current interval
+        self.cost = 0.0
+        self.overhead = 0.0
+        self.samples = 0
+        self.skipped = 0
+        self.throttled = False
+
+        self._deadline = None
+        self._last_cpu = None
+        self._quiet = 0
+
+    def set_interval(self, interval):
+        """Change the requested interval; returns True if the schedule moved"""
+        interval = clamp_interval(interval)
+        if interval == self.requested:
+            return False
+        self.requested = interval
+        self.interval = interval
+        self._quiet = 0
+        self._deadline = None
+        return True
+
+    def timeout(self, now=None):
+        """Seconds until the next sample is due"""
+        now = time.monotonic() if now is None else now
+        if self._deadline is None:
+            self._deadline = now + self.interval
+        return max(0.0, self._deadline - now)
+
+    def advance(self, now=None):
+        """Move the deadline to the next slot once a sample starts"""
+        now = time.monotonic() if now is None else now
+        deadline = self._deadline
+        if deadline is None or now < deadline - 0.001:
+            # Woken early by a request; the grid restarts from here
+            self._deadline = now + self.interval
+            return
+        missed = max(0, int((now - deadline) // self.interval))
+        self.skipped += missed
+        self._deadline = deadline + (missed + 1) * self.interval
+
+    def record(self, cpu_seconds, cpu_percent=None):
+        """
+        Account for one finished sample that used cpu_seconds of CPU time
+        and observed the given system CPU%, and pick the next interval.
+        """
+        self.samples += 1
+        # Smooth over about ten samples; the first one seeds the average
+        weight = 0.2 if self.samples > 1 else 1.0
+        self.cost += (cpu_seconds - self.cost) * weight
+
+        interval = self.requested
+        if self.adaptive and cpu_percent is not None:
+            interval = self._adapt(cpu_percent)
+
+        # Never sample faster than the overhead budget allows
+        floor = self.cost / self.budget if self.budget else 0.0
+        self.throttled = floor > interval
+        interval = min(max(interval, floor, MIN_INTERVAL), MAX_INTERVAL)
+        if interval != self.interval:
+            # Keep the grid phase; only the step changes
+            if self._deadline is not None:
+                self._deadline += interval - self.interval
+            self.interval = interval
+        self.overhead = self.cost / self.interval
+
+    def _adapt(self, cpu_percent):
+        change = abs(cpu_percent - self._last_cpu) if self._last_cpu is not None else 0.0
+        self._last_cpu = cpu_percent
+        fastest = max(MIN_INTERVAL, self.requested / 10)
+        slowest = max(min(self.max_interval, self.requested * 4), self.requested)
+
+        if cpu_percent >= self.busy_percent or change >= self.change_percent:
+            # React at once to spikes and load
+            self._quiet = 0
+            return max(fastest, self.interval / 2)
+        if cpu_percent < self.idle_percent:
+            self._quiet += 1
+            if self._quiet >= self.idle_ticks:
+                return min(slowest, self.interval * 1.25)
+            return self.interval
+        # Moderate load: drift back to the requested rate
+        self._quiet = 0
+        if self.interval < self.requested:
+            return min(self.requested, self.interval * 1.25)
+        if self.interval > self.requested:
+            return max(self.requested, self.interval / 1.25)
+        return self.interval
@@ -0,0 +1,344 @@
+# utils/sampling.py
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+import psutil
+
+from utils.instrumentation import Instrumentation
+from utils.sample_scheduler import SampleScheduler
+
+# Immutable view of the system published once per tick. processes and
+# process_changes are None while process collection is paused, as is
+# process_columns, the same table as ProcessColumns; gpus is a tuple of
+# GpuSample, empty when no GPU telemetry is available.
+Snapshot = namedtuple("Snapshot", [
+    "timestamp",
+    "interval",
+    "cpu_percent",
+    "memory",
+    "net_io",
+    "net_sent_speed",
+    "net_recv_speed",
+    "disk",
+    "temperature",
+    "battery",
+    "processes",
+    "process_changes",
+    "gpus",
+    "process_columns",
+])
+
+
+class SamplingEngine:
+    """
+    Collect CPU, memory, network, disk, temperature and process data once
+    per tick on a background thread and publish it as a Snapshot. GPU
+    readings come from a separate GpuTelemetry worker. With a MetricStore,
+    every snapshot is also persisted to disk.
+
+    The NumPy-backed parts (history, process table, GPU buffers and a
+    store opened through store_factory) are built on first use, normally
+    by the sampling thread's first tick, so creating an engine does not
+    import NumPy.
+    """
+
+    def __init__(self, interval=1.0, disk_path="/", process_backend="auto", gpu_command=None,
+                 store=None, adaptive=False, overhead_budget=0.02, store_factory=None):
+        # Timing lives in the scheduler; interval is the requested rate and
+        # scheduler.interval the one currently in use
+        self.scheduler = SampleScheduler(interval, adaptive=adaptive, budget=overhead_budget)
+        self.interval = self.scheduler.requested
+        self.disk_path = disk_path
+        self.latest = None
+
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+        self._last_net_io = None
+        self._last_time = None
+        self._last_process_time = None
+
+        # Process collection is the expensive part; it only runs while a
+        # view needs it. Host metrics keep feeding the history.
+        self.collect_process_data = True
+        self._processes_requested = True
+        self._process_pins = 0
+        # Keep about an hour of history even at the fastest rate
+        fastest = self.interval / 10 if adaptive else self.interval
+        self._history_capacity = int(3600 / min(fastest, 1.0))
+        self._process_backend = process_backend
+        self._gpu_command = gpu_command
+        self._store = store
+        self._store_factory = store_factory
+        self._built = False
+        self._build_lock = threading.Lock()
+        self._history = self._analytics = self._process_table = self._gpu = None
+
+        # Timings of our own collection stages, shown in the Overhead tab
+        self.instruments = Instrumentation()
+
+    def _build(self):
+        if self._built:
+            return
+        with self._build_lock:
+            if self._built:
+                return
+            from utils.gpu_telemetry import GpuTelemetry
+            from utils.metric_analytics import MetricAnalytics
+            from utils.metric_history import MetricHistory
+            from utils.proc_reader import create_collector
+            from utils.process_table import ProcessTable
+
+            self._history = MetricHistory(capacity=self._history_capacity)
+            self._analytics = MetricAnalytics(self._history)
+            self._process_table = ProcessTable(create_collector(self._process_backend))
+            # nvidia-smi runs as its own long-lived process; sampling only
+            # copies its latest readings
+            self._gpu = GpuTelemetry(interval=self.interval, command=self._gpu_command)
+            if self._store_factory is not None:
+                self._store = self._store_factory()
+            self._built = True
+
+    @property
+    def history(self):
+        self._build()
+        return self._history
+
+    @property
+    def analytics(self):
+        self._build()
+        return self._analytics
+
+    @property
+    def process_table(self):
+        self._build()
+        return self._process_table
+
+    @property
+    def gpu(self):
+        self._build()
+        return self._gpu
+
+    @property
+    def store(self):
+        self._build()
+        return self._store
+
+    def subscribe(self, callback):
+        """Register a callable that receives every new snapshot"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Remove a previously registered callable"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def start(self):
+        """Start the sampling thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread and wait for it to finish"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        # Nothing to release if the engine never got as far as building
+        if self._gpu is not None:
+            self._gpu.stop()
+        if self._store is not None:
+            self._store.close()
+
+    def request_sample(self):
+        """Take the next sample now instead of waiting for the interval"""
+        self._wake_event.set()
+
+    def set_interval(self, interval):
+        """Change the time between samples, taking effect immediately"""
+        if self.scheduler.set_interval(interval):
+            self.interval = self.scheduler.requested
+            self._wake_event.set()
+
+    def set_collect_processes(self, enabled):
+        """Turn process collection on or off; turning it on samples at once"""
+        self._processes_requested = enabled
+        self._update_process_collection()
+
+    def pin_processes(self, pinned):
+        """
+        Keep process collection on whatever the views ask, for exporters
+        and the viewers of a collector. Pins are counted so that owners do
+        not release each other's: every pin_processes(True) is undone by
+        one pin_processes(False).
+        """
+        with self._lock:
+            self._process_pins = max(self._process_pins + (1 if pinned else -1), 0)
+        self._update_process_collection()
+
+    def set_process_io(self, enabled):
+        """
+        Read per-process I/O counters on each tick, for the I/O rate
+        columns. Off by default: it is one more file per process.
+        """
+        fields = self.process_table.fields
+        self.process_table.fields = fields | {"io"} if enabled else fields - {"io"}
+
+    def _update_process_collection(self):
+        enabled = self._processes_requested or self._process_pins > 0
+        if enabled != self.collect_process_data:
+            self.collect_process_data = enabled
+            if enabled:
+                self._wake_event.set()
+
+    def _run(self):
+        self._build()
+        self.gpu.start()
+        # Prime the CPU counters so the first sample has a delta window
+        psutil.cpu_percent(interval=None)
+        self._last_net_io = psutil.net_io_counters()
+        self._last_time = time.monotonic()
+
+        scheduler = self.scheduler
+        while not self._stop_event.is_set():
+            self._wake_event.wait(scheduler.timeout())
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            scheduler.advance()
+
+            # Our own CPU time per tick feeds the overhead budget
+            cpu_start = time.thread_time()
+            instruments = self.instruments
+            instruments.begin_tick()
+            try:
+                with instruments.measure("sample"):
+                    snapshot = self.sample()
+            except Exception as e:
+                instruments.end_tick()
+                print(f"Error in sampling engine: {e}")
+                continue
+
+            self.latest = snapshot
+            self.history.record(snapshot)
+            if self.store is not None:
+                try:
+                    with instruments.measure("store append"):
+                        self.store.append(snapshot)
+                except Exception as e:
+                    print(f"Error writing metric store: {e}")
+            with instruments.measure("publish"):
+                self._publish(snapshot)
+            instruments.end_tick()
+            scheduler.record(time.thread_time() - cpu_start, snapshot.cpu_percent)
+
+    def _publish(self, snapshot):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error in snapshot subscriber: {e}")
+
+    def sample(self):
+        """Collect every metric exactly once and return a Snapshot"""
+        now = time.monotonic()
+        interval = now - self._last_time if self._last_time else self.interval
+        self._last_time = now
+
+        measure = self.instruments.measure
+        with measure("sample: network"):
+            net_io, sent_speed, recv_speed = self.collect_network(interval)
+        if self.collect_process_data:
+            with measure("sample: processes"):
+                processes, process_changes, process_columns = self.collect_processes(now)
+        else:
+            processes, process_changes, process_columns = None, None, None
+        with measure("sample: cpu and memory"):
+            cpu_percent = psutil.cpu_percent(interval=None)
+            memory = psutil.virtual_memory()
+        with measure("sample: disk"):
+            disk = self.collect_disk()
+        with measure("sample: sensors"):
+            temperature = self.collect_temperature()
+            battery = self.collect_battery()
+        with measure("sample: gpu"):
+            gpus = self.gpu.latest()
+
+        return Snapshot(
+            timestamp=time.time(),
+            interval=interval,
+            cpu_percent=cpu_percent,
+            memory=memory,
+            net_io=net_io,
+            net_sent_speed=sent_speed,
+            net_recv_speed=recv_speed,
+            disk=disk,
+            temperature=temperature,
+            battery=battery,
+            processes=processes,
+            process_changes=process_changes,
+            gpus=gpus,
+            process_columns=process_columns,
+        )
+
+    def collect_network(self, interval):
+        """Return the counters and upload/download speed in MB/s"""
+        current = psutil.net_io_counters()
+        last = self._last_net_io or current
+        self._last_net_io = current
+
+        if interval <= 0:
+            return current, 0.0, 0.0
+
+        sent_speed = (current.bytes_sent - last.bytes_sent) / (1024 * 1024 * interval)
+        recv_speed = (current.bytes_recv - last.bytes_recv) / (1024 * 1024 * interval)
+        return current, sent_speed, recv_speed
+
+    def collect_disk(self):
+        try:
+            return psutil.disk_usage(self.disk_path)
+        except Exception:
+            return None
+
+    def collect_temperature(self):
+        if not hasattr(psutil, "sensors_temperatures"):
+            return None
+        try:
+            temps = psutil.sensors_temperatures()
+        except Exception:
+            return None
+        for name, entries in (temps or {}).items():
+            if entries:
+                return entries[0].current
+        return None
+
+    def collect_battery(self):
+        if not hasattr(psutil, "sensors_battery"):
+            return None
+        try:
+            return psutil.sensors_battery()
+        except Exception:
+            return None
+
+    def collect_processes(self, now):
+        """Return a read-only pid -> ProcessInfo mapping, the ProcessDelta and ProcessColumns"""
+        # The CPU% window spans back to the previous process collection,
+        # which may be several ticks ago if collection was paused
+        last = self._last_process_time
+        self._last_process_time = now
+        delta = self.process_table.update(elapsed=now - last if last is not None else None)
+        table = self.process_table
+        return MappingProxyType(dict(table.processes)), delta, table.columns.snapshot()
@@ -0,0 +1,36 @@
+# utils/startup_profiler.py
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Record how long each import and construction step takes during
+    startup. Disabled profilers cost a perf_counter() call per step.
+    """
+
+    def __init__(self, enabled=False, start=None):
+        self.enabled = enabled
+        self.start = start if start is not None else time.perf_counter()
+        self.steps = []
+
+    @contextmanager
+    def measure(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.steps.append((name, time.perf_counter() - begin))
+
+    def mark(self, name):
+        """Record the time elapsed since the profiler's start"""
+        if self.enabled:
+            self.steps.append((name, time.perf_counter() - self.start))
+
+    def report(self):
+        if not self.enabled:
+            return
+        print("Startup profile:")
+        for name, seconds in self.steps:
+            print(f"  {name:<40} {seconds * 1000:8.1f} ms")
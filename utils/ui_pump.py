@@ -0,0 +1,78 @@
+# utils/ui_pump.py
+import queue
+
+
+class UiPump:
+    """
+    Marshal work from background threads onto the Tk main loop. Threads
+    post callbacks into a bounded queue; the pump drains it on an after()
+    timer and runs only the latest callback posted under each key.
+    """
+
+    def __init__(self, widget, interval=50, maxsize=256):
+        self.widget = widget
+        self.interval = interval  # ms
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+        self._job = None
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._schedule()
+
+    def stop(self):
+        self._running = False
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def post(self, key, callback, *args, **kwargs):
+        """
+        Queue callback(*args, **kwargs) for the Tk thread. A later post with
+        the same key replaces an earlier one that has not run yet. Safe to
+        call from any thread.
+        """
+        item = (key, callback, args, kwargs)
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                # The UI fell behind; drop the oldest item instead of piling up
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def call(self, callback, *args, **kwargs):
+        """Queue a callback that is never coalesced with other posts"""
+        self.post(object(), callback, *args, **kwargs)
+
+    def subscriber(self, key, callback):
+        """Return a snapshot subscriber that forwards to callback on the Tk thread"""
+        return lambda snapshot: self.post(key, callback, snapshot)
+
+    def _schedule(self):
+        if self._running:
+            self._job = self.widget.after(self.interval, self._drain)
+
+    def _drain(self):
+        latest = {}
+        while True:
+            try:
+                key, callback, args, kwargs = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            # Move the key to the end so callbacks keep their posting order
+            latest.pop(key, None)
+            latest[key] = (callback, args, kwargs)
+
+        for callback, args, kwargs in latest.values():
+            try:
+                callback(*args, **kwargs)
+            except Exception as e:
+                print(f"Error in UI update: {e}")
+
+        self._schedule()
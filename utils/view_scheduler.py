@@ -0,0 +1,66 @@
+# utils/view_scheduler.py
+
+
+class ViewScheduler:
+    """
+    Track which tab is showing and whether the window is minimized. Only
+    the visible view renders; process collection runs only while a view
+    that needs it is showing, and a minimized window samples at a low rate.
+    """
+
+    def __init__(self, window, tabview, engine, active_interval=1.0, idle_interval=5.0):
+        self.window = window
+        self.tabview = tabview
+        self.engine = engine
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.minimized = False
+        self.views = {}
+
+        tabview.configure(command=self.update)
+        window.bind("<Unmap>", self.on_unmap, add="+")
+        window.bind("<Map>", self.on_map, add="+")
+
+    def register(self, tab, view=None, needs_processes=False, factory=None):
+        """
+        Attach a view with set_active(active) to a tab name. With a factory
+        instead of a view, the view is built the first time the tab shows.
+        """
+        self.views[tab] = {"view": view, "factory": factory, "needs_processes": needs_processes}
+
+    def view(self, tab):
+        """Return the view for a tab, or None if it has not been built yet"""
+        return self.views[tab]["view"]
+
+    def on_unmap(self, event):
+        # Child widgets report Unmap too; only the toplevel matters here
+        if event.widget is self.window:
+            self.minimized = True
+            self.update()
+
+    def on_map(self, event):
+        if event.widget is self.window:
+            self.minimized = False
+            self.update()
+
+    def update(self):
+        current = None if self.minimized else self.tabview.get()
+        needs_processes = False
+
+        for tab, entry in self.views.items():
+            active = tab == current
+            if active and entry["needs_processes"]:
+                needs_processes = True
+
+            view = entry["view"]
+            if view is None:
+                if not active:
+                    continue
+                # Activating a fresh view lets it catch up from history
+                view = entry["view"] = entry["factory"]()
+                view.set_active(True)
+            elif active != view.active:
+                view.set_active(active)
+
+        self.engine.set_collect_processes(needs_processes)
+        self.engine.set_interval(self.idle_interval if self.minimized else self.active_interval)
@@ -0,0 +1,225 @@
+# utils/wire.py
+import json
+import struct
+from collections import namedtuple
+from types import MappingProxyType
+
+from utils.gpu_telemetry import GpuSample
+from utils.process_columns import ColumnTable
+from utils.process_table import ProcessDelta, ProcessInfo
+from utils.sampling import Snapshot
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Every message is framed as a 4 byte big-endian payload length and a
+# 1 byte codec id, followed by the payload
+HEADER = struct.Struct("!IB")
+MAX_MESSAGE = 64 * 1024 * 1024
+
+CODECS = {"json": 0, "msgpack": 1}
+CODEC_NAMES = {number: name for name, number in CODECS.items()}
+
+
+def available_codecs():
+    """Codec names this side can speak, preferred first"""
+    return ["msgpack", "json"] if msgpack is not None else ["json"]
+
+
+def encode(message, codec="json"):
+    """Return one framed message"""
+    if codec == "msgpack":
+        payload = msgpack.packb(message, use_bin_type=True)
+    else:
+        payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(payload), CODECS[codec]) + payload
+
+
+def decode(payload, codec_id):
+    codec = CODEC_NAMES.get(codec_id)
+    if codec == "msgpack" and msgpack is not None:
+        return msgpack.unpackb(payload, raw=False)
+    if codec == "json":
+        return json.loads(payload.decode("utf-8"))
+    raise ValueError(f"Unsupported codec {codec_id}")
+
+
+def recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_message(sock):
+    """Read one framed message; raises ConnectionError when the peer closes"""
+    length, codec_id = HEADER.unpack(recv_exact(sock, HEADER.size))
+    if length > MAX_MESSAGE:
+        raise ConnectionError(f"Message of {length} bytes exceeds the limit")
+    return decode(recv_exact(sock, length), codec_id)
+
+
+async def read_message_async(reader):
+    """read_message() for an asyncio StreamReader"""
+    length, codec_id = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if length > MAX_MESSAGE:
+        raise ConnectionError(f"Message of {length} bytes exceeds the limit")
+    return decode(await reader.readexactly(length), codec_id)
+
+
+def record_dict(value):
+    """A psutil namedtuple as a plain dict, or None"""
+    return value._asdict() if value is not None else None
+
+
+def snapshot_message(snapshot, seq, delta=False):
+    """
+    Encode a Snapshot as plain data. With delta, only processes that were
+    added or changed since the previous snapshot are sent, plus the pids
+    that went away.
+    """
+    processes = None
+    if snapshot.processes is not None:
+        table = snapshot.processes
+        if delta:
+            changes = snapshot.process_changes
+            processes = {
+                "full": False,
+                "rows": [list(table[pid]) for pid in changes.added | changes.changed if pid in table],
+                "added": list(changes.added),
+                "removed": list(changes.removed),
+            }
+        else:
+            processes = {"full": True, "rows": [list(info) for info in table.values()]}
+
+    return {
+        "event": "snapshot",
+        "seq": seq,
+        "timestamp": snapshot.timestamp,
+        "interval": snapshot.interval,
+        "cpu_percent": snapshot.cpu_percent,
+        "memory": record_dict(snapshot.memory),
+        "net_io": record_dict(snapshot.net_io),
+        "net_sent_speed": snapshot.net_sent_speed,
+        "net_recv_speed": snapshot.net_recv_speed,
+        "disk": record_dict(snapshot.disk),
+        "temperature": snapshot.temperature,
+        "battery": record_dict(snapshot.battery),
+        "processes": processes,
+        "gpus": [list(gpu) for gpu in snapshot.gpus],
+    }
+
+
+class SnapshotDecoder:
+    """
+    Rebuild Snapshots from snapshot messages on the client side. Unchanged
+    processes keep their ProcessInfo object between snapshots, as they do
+    in the engine, so identity-based diffs in the views keep working.
+    Without keep_processes only the process columns are kept, which is all
+    a fleet view needs and a fraction of the memory.
+    """
+
+    def __init__(self, keep_processes=True, names=None):
+        self.keep_processes = keep_processes
+        self.processes = None
+        self.columns = ColumnTable(names)
+        self._types = {}
+
+    def record(self, kind, data):
+        if data is None:
+            return None
+        key = (kind, tuple(data))
+        record_type = self._types.get(key)
+        if record_type is None:
+            record_type = self._types[key] = namedtuple(kind, list(data))
+        return record_type(**data)
+
+    def decode(self, message):
+        processes = None
+        process_changes = None
+        process_columns = None
+        data = message["processes"]
+        if data is None:
+            self.columns.clear()
+        elif self.keep_processes:
+            full = data["full"] or self.processes is None
+            table, process_changes = self.apply_processes(data)
+            processes = MappingProxyType(table)
+            if full:
+                self.columns.clear()
+                self.columns.update(list(table.values()))
+            else:
+                self.columns.update([table[pid] for pid in process_changes.added | process_changes.changed],
+                                    process_changes.removed)
+            process_columns = self.columns.snapshot()
+        else:
+            self.apply_columns(data)
+            process_columns = self.columns.snapshot()
+        self.processes = processes
+
+        return Snapshot(
+            timestamp=message["timestamp"],
+            interval=message["interval"],
+            cpu_percent=message["cpu_percent"],
+            memory=self.record("svmem", message["memory"]),
+            net_io=self.record("snetio", message["net_io"]),
+            net_sent_speed=message["net_sent_speed"],
+            net_recv_speed=message["net_recv_speed"],
+            disk=self.record("sdiskusage", message["disk"]),
+            temperature=message["temperature"],
+            battery=self.record("sbattery", message["battery"]),
+            processes=processes,
+            process_changes=process_changes,
+            gpus=tuple(GpuSample(*gpu) for gpu in message["gpus"]),
+            process_columns=process_columns,
+        )
+
+    def apply_columns(self, data):
+        infos = [ProcessInfo(*row) for row in data["rows"]]
+        if data["full"] or not len(self.columns):
+            # A full table may reuse PIDs, so its rows replace everything
+            self.columns.clear()
+            self.columns.update(infos)
+        else:
+            self.columns.update(infos, data["removed"])
+
+    def apply_processes(self, data):
+        old = self.processes or {}
+        if not data["full"] and self.processes is not None:
+            table = dict(old)
+            for pid in data["removed"]:
+                table.pop(pid, None)
+            updated = set()
+            for row in data["rows"]:
+                info = ProcessInfo(*row)
+                table[info.pid] = info
+                updated.add(info.pid)
+            added = set(data["added"])
+            return table, ProcessDelta(added=frozenset(added), removed=frozenset(data["removed"]),
+                                       changed=frozenset(updated - added))
+
+        # Full table: diff against what we had so unchanged rows keep
+        # their objects
+        table = {}
+        added = set()
+        changed = set()
+        for row in data["rows"]:
+            info = ProcessInfo(*row)
+            previous = old.get(info.pid)
+            if previous is None or previous.create_time != info.create_time:
+                added.add(info.pid)
+            elif previous == info:
+                info = previous
+            else:
+                changed.add(info.pid)
+            table[info.pid] = info
+        removed = {pid for pid, info in old.items()
+                   if pid not in table or table[pid].create_time != info.create_time}
+        return table, ProcessDelta(added=frozenset(added), removed=frozenset(removed),
+                                   changed=frozenset(changed))